@@ -0,0 +1,26 @@
+"""
+Shared computation for the Attribution Tool pages.
+
+The package does not depend on Streamlit, so the same code serves the pages
+and the batch mode (``python -m attribution``). Submodules are imported on
+first use (``attribution.ratios``, ``from attribution import models``), which
+keeps ``import attribution`` cheap; plotly, openpyxl, requests and bs4 are only
+imported by the functions that need them.
+"""
+import importlib
+
+__all__ = [
+    'aggregates', 'batch', 'charts', 'columns', 'countries', 'datasets', 'decomp',
+    'dtypes', 'exports', 'fit', 'ingest', 'models', 'optimization', 'parallel',
+    'pipeline', 'precompute', 'profiling', 'ratios', 'synthetic', 'taxonomy', 'workbook',
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f'{__name__}.{name}')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,179 @@
+"""
+Channel and creative totals of a decomposition (visits / conversions) or
+spend frame, in the layouts the aggregation pages show: whole numbers with a
+Total row, per-channel contribution shares, and solID x group matrices.
+
+Every function sums the ``spend`` variables of the frame; the KPI column of
+the model (KPI_Website_Sessions / KPI_Website_Conversions) is left out.
+"""
+import re
+
+import pandas as pd
+
+from attribution import decomp, taxonomy
+
+SESSIONS_KPI = 'KPI_Website_Sessions'
+CONVERSIONS_KPI = 'KPI_Website_Conversions'
+
+
+def _spend_columns(columns, exclude):
+    return [col for col in columns if 'spend' in col.lower() and col != exclude]
+
+
+def _column_total(df, col):
+    # Non-numeric entries count as zero; float32 columns are summed in float64
+    return pd.to_numeric(df[col], errors='coerce').astype(float).sum()
+
+
+def with_total(df, value_name, **labels):
+    """df with a Total row summing value_name; labels fill the other columns."""
+    total_row = pd.DataFrame([{'Channel': 'Total', **labels, value_name: df[value_name].sum()}])
+    return pd.concat([df, total_row], ignore_index=True)
+
+
+def channel_totals(df, value_name, exclude=SESSIONS_KPI):
+    """
+    Whole-number totals per channel with a Total row. Channels are labelled by
+    taxonomy.channel_groups, like channel_totals_all_models, so one model gets
+    the same numbers either way.
+    """
+    channel_map = taxonomy.channel_groups(df.columns, exclude=[exclude])
+    channel_df = taxonomy.aggregate(df, channel_map, 'Channel', value_name, coerce=True, sort=False)
+    channel_df[value_name] = channel_df[value_name].round(0).astype(int)
+    return with_total(channel_df, value_name)
+
+
+def channel_totals_all_models(index, exclude=SESSIONS_KPI):
+    """Channel totals for every model at once (one row per solID, one column per channel)."""
+    channel_map = taxonomy.channel_groups(index.frame.columns, exclude=[exclude])
+    return decomp.aggregate_all_models(index, channel_map, 'Channel').round(0).astype(int)
+
+
+def creative_conversions(df, exclude=CONVERSIONS_KPI):
+    """Whole-number totals per channel and creative of ``Channel_Creative[_N]_Spend`` columns, with a Total row."""
+    channel_creative_data = {}
+    for col in _spend_columns(df.columns, exclude):
+        match = re.match(r'([A-Za-z\s]+)_(.*?)(?:_\d+)?_Spend', col)
+        if match:
+            channel_name = match.group(1).strip().lower()
+            # Standardize creative names by removing numeric identifiers
+            creative_name = re.sub(r'\d+', '', match.group(2).strip().lower())
+            key = f"{channel_name}_{creative_name}"
+            channel_creative_data[key] = channel_creative_data.get(key, 0) + _column_total(df, col)
+
+    channel_creative_df = pd.DataFrame(
+        [{'Channel': key.split('_')[0].title(), 'Creative': key.split('_')[1].title(), 'Conversions': value}
+         for key, value in channel_creative_data.items()]
+    )
+    channel_creative_df['Conversions'] = channel_creative_df['Conversions'].round(0).astype(int)
+    return with_total(channel_creative_df, 'Conversions', Creative='')
+
+
+def standardize_creative_name(col_name):
+    """
+    'Meta_Banner1_2_Spend' -> 'Meta Banner': drops the _Spend suffix, trailing
+    and embedded numbers, and title-cases the words.
+    """
+    col_name = re.sub(r'_Spend$', '', col_name, flags=re.IGNORECASE)
+    col_name = re.sub(r'([_-]?\d+)$', '', col_name)
+    col_name = re.sub(r'(\D)\d+(\D)', r'\1\2', col_name)
+    col_name = re.sub(r'(\D)\d+$', r'\1', col_name)
+    col_name = re.sub(r'^\d+(\D)', r'\1', col_name)
+    return col_name.replace('_', ' ').title().strip()
+
+
+def creative_visits(df, exclude=SESSIONS_KPI):
+    """Whole-number totals per channel (first word) and creative (the rest), with a Total row."""
+    channel_creative_data = {}
+    for col in _spend_columns(df.columns, exclude):
+        parts = standardize_creative_name(col).split()
+        if len(parts) >= 2:
+            key = (parts[0], ' '.join(parts[1:]))
+            channel_creative_data[key] = channel_creative_data.get(key, 0) + _column_total(df, col)
+
+    channel_creative_df = pd.DataFrame(
+        [{'Channel': channel, 'Creative': creative, 'Visits': int(round(value))}
+         for (channel, creative), value in channel_creative_data.items()]
+    )
+    return with_total(channel_creative_df, 'Visits', Creative='')
+
+
+def _group_name(col_name):
+    col_name = re.sub(r'_Spend$', '', col_name, flags=re.IGNORECASE)
+    col_name = re.sub(r'([_-]?\d+)$', '', col_name)
+    col_name = re.sub(r'(\D)\d+(\D)', r'\1\2', col_name)
+    return col_name.replace('_', ' ').title().strip()
+
+
+def column_groups(columns, by_channel_only=False, exclude=SESSIONS_KPI):
+    """Map column -> channel, or -> (channel, creative) with 'General' for channel-only names."""
+    groups = {}
+    for col in _spend_columns(columns, exclude):
+        parts = _group_name(col).split()
+        if by_channel_only:
+            groups[col] = parts[0]
+        else:
+            groups[col] = (parts[0], ' '.join(parts[1:])) if len(parts) >= 2 else (parts[0], 'General')
+    return groups
+
+
+def group_totals(df, by_channel_only=False, exclude=SESSIONS_KPI):
+    """Totals of df per column_groups key, as a dict in order of first occurrence."""
+    results = {}
+    for col, key in column_groups(df.columns, by_channel_only, exclude).items():
+        results[key] = results.get(key, 0) + _column_total(df, col)
+    return results
+
+
+def group_totals_all_models(index, by_channel_only=False, exclude=SESSIONS_KPI):
+    """group_totals for every model at once; creative columns are labelled 'Channel - Creative'."""
+    groups = column_groups(index.frame.columns, by_channel_only, exclude)
+    names = 'Channel' if by_channel_only else ['Channel', 'Creative']
+    all_models_df = decomp.aggregate_all_models(index, groups, names).round(0).astype(int)
+    if not by_channel_only:
+        all_models_df.columns = [f"{channel} - {creative}" for channel, creative in all_models_df.columns]
+    return all_models_df
+
+
+def totals_frame(results, value_name='Visits', include_total=True):
+    """Whole-number frame of group_totals results, optionally with a Total row."""
+    if isinstance(next(iter(results.keys())), tuple):
+        df = pd.DataFrame([{'Channel': k[0], 'Creative': k[1], value_name: int(round(v))} for k, v in results.items()])
+        return with_total(df, value_name, Creative='') if include_total else df
+
+    df = pd.DataFrame([{'Channel': k, value_name: int(round(v))} for k, v in results.items()])
+    return with_total(df, value_name) if include_total else df
+
+
+def placement_spend(df, consolidated_df):
+    """
+    Spend per channel and creative of columns.placement_columns names: the
+    channel is the first word, the creative the words up to the last one.
+    """
+    column_map = dict(zip(consolidated_df['Original Column Name'], consolidated_df['Consolidated Column Name']))
+    # Sum the original columns of every consolidated name in one pass
+    totals = taxonomy.aggregate(df, column_map, 'Consolidated Column Name', 'Spend', sort=False)
+
+    spend_data = []
+    for consolidated_name, total_spend in zip(totals['Consolidated Column Name'], totals['Spend']):
+        parts = re.split(r'_|(?<=[a-z])(?=[A-Z])', consolidated_name)
+        if len(parts) >= 2:
+            creative = '_'.join(parts[1:-1]) if len(parts) > 2 else parts[1]
+            spend_data.append({'Channel': parts[0].title(), 'Creative': creative.title(), 'Spend': total_spend})
+    return pd.DataFrame(spend_data)
+
+
+def channel_contribution(df, value_name):
+    """Total per channel with its whole-percent share, and a Total row at 100."""
+    channel_summary = df.groupby('Channel')[value_name].sum().reset_index()
+    total = channel_summary[value_name].sum()
+    channel_summary['Percentage Contribution'] = ((channel_summary[value_name] / total) * 100).round(0).astype(int)
+    total_row = pd.DataFrame([{'Channel': 'Total', value_name: total, 'Percentage Contribution': 100}])
+    return pd.concat([channel_summary, total_row], ignore_index=True)
+
+
+def contribution_labels(df, channel_summary_df):
+    """'Channel - N%' label of every row of df, from a channel_contribution table."""
+    shares = channel_summary_df[channel_summary_df['Channel'] != 'Total']
+    labels = {channel: f"{channel} - {int(share)}%" for channel, share in zip(shares['Channel'], shares['Percentage Contribution'])}
+    return df['Channel'].map(labels).fillna(df['Channel'])
@@ -0,0 +1,121 @@
+"""
+Headless batch mode: ``python -m attribution ROBYN_DIR --out RESULTS_DIR``.
+
+Every sub-folder of ROBYN_DIR holding Robyn output is run through
+attribution.pipeline in a pool of worker processes (one folder per task).
+The tables of a folder are written to RESULTS_DIR/<folder>/ as CSV files or
+as one workbook, and RESULTS_DIR/summary.csv lists what each run produced.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from attribution import parallel, pipeline
+
+FORMATS = ['csv', 'xlsx']
+
+
+def find_runs(root):
+    """Folders under root (root included) that contain Robyn output."""
+    runs = []
+    for folder, _, files in os.walk(root):
+        if pipeline.DECOMP_FILE in files or pipeline.AGGREGATED_FILE in files:
+            runs.append(folder)
+    return sorted(runs)
+
+
+def write_tables(tables, out_dir, fmt='csv'):
+    os.makedirs(out_dir, exist_ok=True)
+    if fmt == 'xlsx':
+        with pd.ExcelWriter(os.path.join(out_dir, 'results.xlsx'), engine='xlsxwriter') as writer:
+            for name, df in tables.items():
+                # Excel sheet names are limited to 31 characters
+                df.to_excel(writer, index=False, sheet_name=name[:31])
+    else:
+        for name, df in tables.items():
+            df.to_csv(os.path.join(out_dir, f'{name}.csv'), index=False)
+
+
+def run_folder(folder, out_dir, solID=None, kpi='conversions', fmt='csv'):
+    """Run the pipeline on one folder and write its tables; never raises, the error goes into the summary."""
+    started = time.perf_counter()
+    summary = {'run': os.path.basename(os.path.normpath(folder)), 'folder': folder}
+    try:
+        selected, tables = pipeline.run(folder, solID=solID, kpi=kpi)
+        write_tables(tables, out_dir, fmt)
+        summary.update(status='ok', solID=selected, tables=' '.join(tables), error='')
+    except Exception as e:
+        summary.update(status='failed', solID=solID, tables='', error=f"{type(e).__name__}: {e}")
+    summary['seconds'] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def run_all(root, out, solID=None, kpi='conversions', fmt='csv', processes=None):
+    """Run every folder of root, spreading folders over processes; returns the summary table."""
+    runs = find_runs(root)
+    processes = max(1, min(processes or parallel.PROCESSES, len(runs) or 1))
+
+    def out_dir(folder):
+        relative = os.path.relpath(folder, root)
+        return os.path.join(out, os.path.basename(os.path.abspath(root)) if relative == '.' else relative)
+
+    results = []
+    if processes == 1:
+        for folder in runs:
+            results.append(run_folder(folder, out_dir(folder), solID, kpi, fmt))
+            _report(results[-1], len(results), len(runs))
+    else:
+        # spawn: the same start method as the app's pool (see attribution.parallel)
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(run_folder, folder, out_dir(folder), solID, kpi, fmt) for folder in runs]
+            for future in as_completed(futures):
+                results.append(future.result())
+                _report(results[-1], len(results), len(runs))
+
+    summary = pd.DataFrame(results, columns=['run', 'folder', 'status', 'solID', 'tables', 'error', 'seconds'])
+    summary = summary.sort_values('folder').reset_index(drop=True)
+    os.makedirs(out, exist_ok=True)
+    summary.to_csv(os.path.join(out, 'summary.csv'), index=False)
+    return summary
+
+
+def _report(result, done, total):
+    detail = result['error'] or result['tables']
+    print(f"[{done}/{total}] {result['run']}: {result['status']} ({result['seconds']}s) {detail}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m attribution',
+        description="Run the attribution pipeline on every Robyn output folder under a directory.",
+    )
+    parser.add_argument('input', help="directory of Robyn output folders (or a single output folder)")
+    parser.add_argument('--out', default='results', help="directory the result tables are written to (default: results)")
+    parser.add_argument('--solid', help="model (solID) to report on where no <solID>_reallocated.csv is present")
+    parser.add_argument('--kpi', choices=list(pipeline.KPIS), default='conversions',
+                        help="dependent variable of the models (default: conversions)")
+    parser.add_argument('--format', dest='fmt', choices=FORMATS, default='csv',
+                        help="one CSV per table, or one workbook per run (default: csv)")
+    parser.add_argument('--processes', type=int,
+                        help="worker processes (default: ATTRIBUTION_PROCESSES or the CPU count)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not os.path.isdir(args.input):
+        print(f"error: {args.input} is not a directory", file=sys.stderr)
+        return 2
+
+    summary = run_all(args.input, args.out, args.solid, args.kpi, args.fmt, args.processes)
+    if summary.empty:
+        print(f"error: no Robyn output found under {args.input}", file=sys.stderr)
+        return 1
+    failed = (summary['status'] != 'ok').sum()
+    print(f"{len(summary) - failed} of {len(summary)} runs written to {args.out}", file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,138 @@
+"""
+Plotly figures for model diagnostics and budget scenarios.
+
+Long daily series are downsampled with Largest-Triangle-Three-Buckets (LTTB)
+before plotting, which keeps the peaks and troughs that a plain stride would
+drop, and drawn with WebGL (Scattergl) traces. plotly is imported by the
+figure builders only, so lttb works without it.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 1500
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of the points kept by LTTB downsampling of (x, y) to threshold points.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    keep = np.empty(threshold, dtype=int)
+    keep[0] = a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[stop:edges[i + 2]].mean()
+            next_y = y[stop:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (next_y - y[a])
+        )
+        a = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        keep[i + 1] = a
+    keep[-1] = n - 1
+    return keep
+
+
+def _numeric_x(x):
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.astype('int64').to_numpy(dtype=float)
+    return pd.to_numeric(x, errors='coerce').to_numpy(dtype=float)
+
+
+def actual_vs_predicted(df, title, x='ds', actual='dep_var', predicted='depVarHat', max_points=MAX_POINTS):
+    """Line chart (with markers) of the actual and predicted series of one model, downsampled for display."""
+    import plotly.graph_objects as go
+
+    df = df.sort_values(x)
+    xs = _numeric_x(df[x])
+
+    fig = go.Figure()
+    for column, name in [(actual, 'Actual'), (predicted, 'Predicted')]:
+        values = df[column].to_numpy(dtype=float)
+        keep = lttb(xs, np.nan_to_num(values), max_points)
+        fig.add_trace(go.Scattergl(
+            x=df[x].iloc[keep], y=values[keep], name=name, mode='lines+markers',
+        ))
+
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title="Values",
+                      legend_title_text="Legend", xaxis_tickangle=-45)
+    return fig
+
+
+def budget_scenarios(sweep, title="Budget Scenarios"):
+    """Response and CPA change against the budget change of a scenario sweep, with the allocator's plan (factor 1) marked."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for column, name in [('response_change', 'Response Change'), ('cpa_change', 'CPA Change')]:
+        fig.add_trace(go.Scatter(
+            x=sweep['budget_change'], y=sweep[column], name=name, mode='lines',
+            customdata=sweep['factor'], hovertemplate="×%{customdata:.2f} budget: %{y:.1f}%<extra>" + name + "</extra>",
+        ))
+
+    plan = sweep.iloc[[int(np.abs(sweep['factor'].to_numpy() - 1).argmin())]]
+    fig.add_trace(go.Scatter(
+        x=plan['budget_change'].tolist() * 2, y=[plan['response_change'].iloc[0], plan['cpa_change'].iloc[0]],
+        name='Optimized plan', mode='markers', marker=dict(size=10, symbol='diamond'),
+    ))
+    fig.update_layout(title=title, xaxis_title="Budget Change (%)", yaxis_title="Change (%)",
+                      legend_title_text="Legend", hovermode='x unified')
+    return fig
+
+
+def pareto_front(ranking, x, y, title="Pareto Fronts", connect=False):
+    """
+    WebGL scatter of a pareto_ranking over two of its objectives: one trace per
+    front, and the models beyond the ranked fronts in grey behind them. connect
+    draws the first front as a line (when x and y are its only objectives).
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    hover = "%{text}<br>" + x + ": %{x:,.4g}<br>" + y + ": %{y:,.4g}<extra>%{fullData.name}</extra>"
+    rest = ranking[ranking['Front'].isna()]
+    if not rest.empty:
+        fig.add_trace(go.Scattergl(
+            x=rest[x], y=rest[y], text=rest['solID'], name='Dominated', mode='markers',
+            marker=dict(color='lightgrey', size=4), hovertemplate=hover,
+        ))
+    for front, models in ranking.dropna(subset=['Front']).groupby('Front', sort=True):
+        models = models.sort_values(x)
+        fig.add_trace(go.Scattergl(
+            x=models[x], y=models[y], text=models['solID'], name=f'Front {front}',
+            mode='lines+markers' if connect and front == 1 else 'markers', marker=dict(size=9 if front == 1 else 6),
+            line=dict(width=1, dash='dot'), hovertemplate=hover,
+        ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text="Legend")
+    return fig
+
+
+def to_png(fig, width=1000, height=500):
+    """
+    PNG bytes of a figure via kaleido. WebGL traces are exported as their SVG
+    equivalents, which render the same without a GPU context.
+    """
+    import plotly.graph_objects as go
+
+    traces = []
+    for trace in fig.data:
+        spec = trace.to_plotly_json()
+        if spec.pop('type', None) == 'scattergl':
+            traces.append(go.Scatter(spec))
+        else:
+            traces.append(trace)
+    static = go.Figure(data=traces, layout=fig.layout)
+    return static.to_image(format='png', width=width, height=height)
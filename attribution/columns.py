@@ -0,0 +1,55 @@
+"""
+Column-name consolidation: the "Original -> Consolidated Column Name" tables
+the spend pages show and offer for download.
+
+Each page strips a different set of suffixes (adstock numbers, ``_Spend``,
+numeric prefixes), so the pattern is passed in; see the *_PATTERN constants.
+"""
+import re
+
+import pandas as pd
+
+ADSTOCK_PATTERN = r'([_-]\d+)'
+UNDERSCORE_ADSTOCK_PATTERN = r'(_\d+)'
+CREATIVE_PATTERN = r'(?i)([_-]\d+|_Spend)'
+CREATIVE_PREFIX_PATTERN = r'(?i)([_-]\d+|_Spend|^\d+_)'
+
+
+def filter_columns(columns, contains='spend'):
+    """Columns whose name contains `contains` (case-insensitive); all of them when it is None."""
+    if contains is None:
+        return list(columns)
+    return [col for col in columns if contains in col.lower()]
+
+
+def consolidate_columns(columns, pattern=ADSTOCK_PATTERN, contains='spend'):
+    """
+    Original and consolidated name (pattern removed) of every filtered column,
+    and the consolidated names in order of first occurrence.
+    """
+    filtered_columns = filter_columns(columns, contains)
+    consolidated_columns = [re.sub(pattern, '', col) for col in filtered_columns]
+
+    consolidated_df = pd.DataFrame({
+        'Original Column Name': filtered_columns,
+        'Consolidated Column Name': consolidated_columns
+    })
+    unique_columns_df = pd.DataFrame({'Consolidated Column Names': list(dict.fromkeys(consolidated_columns))})
+    return consolidated_df, unique_columns_df
+
+
+def placement_columns(columns):
+    """
+    Original and lower-cased base name of every spend column, with trailing
+    numbers dropped (also those glued to a word, e.g. DisplayBanner1).
+    """
+    column_mapping = {}
+    for col in filter_columns(columns):
+        base_name = re.sub(r'(\d+)(?=_Spend|$)', '', col)
+        base_name = re.sub(r'([_-]\d+)(?=_Spend|$)', '', base_name)
+        column_mapping[col] = base_name.rstrip('_').lower()
+
+    return pd.DataFrame({
+        'Original Column Name': list(column_mapping.keys()),
+        'Consolidated Column Name': list(column_mapping.values())
+    })
@@ -0,0 +1,195 @@
+"""
+Country codes supported by the ``holidays`` package (used for Robyn's
+``dt_holidays`` country), available offline.
+
+The table ships as a snapshot in attribution/data/country_codes.csv, generated
+from ``holidays.list_supported_countries()`` (its first line records the
+holidays version). A newer copy can be fetched from the holidays README on
+GitHub and is kept on disk; it replaces the snapshot until it is older than
+the TTL. Lookups go through a prebuilt CountryIndex and never touch the
+network.
+
+    python -m attribution.countries --snapshot
+"""
+import argparse
+import os
+import re
+import time
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "data", "country_codes.csv")
+SOURCE_URL = "https://github.com/vacanza/holidays"
+REFRESH_DIR = os.environ.get("ATTRIBUTION_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "attribution")
+REFRESH_PATH = os.path.join(REFRESH_DIR, "country_codes.csv")
+TTL_SECONDS = float(os.environ.get("ATTRIBUTION_COUNTRY_CODES_TTL_DAYS", "30")) * 86400
+
+
+def scrape_country_codes(timeout=10):
+    """Fetch the 'Available Countries' table from GitHub (raises on network or layout errors)."""
+    import requests
+    from bs4 import BeautifulSoup
+
+    response = requests.get(SOURCE_URL, timeout=timeout)
+    response.raise_for_status()
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    heading = soup.find("h2", string="Available Countries")
+    if not heading:
+        raise ValueError("Could not find 'Available Countries' section.")
+    table = heading.find_next("table")
+    if not table:
+        raise ValueError("Table not found after 'Available Countries' heading.")
+
+    countries, codes = [], []
+    for row in table.find_all("tr")[1:]:
+        columns = row.find_all("td")
+        if len(columns) >= 2:
+            countries.append(columns[0].get_text(strip=True))
+            codes.append(columns[1].get_text(strip=True))
+    return pd.DataFrame({"Country": countries, "Code": codes})
+
+
+def _entity_name(entity):
+    # The English name opens the docstring of the entity's class ("Bouvet Island holidays.")
+    for cls in type(entity).__mro__:
+        match = re.match(r"\s*(.+?) holidays\.", cls.__doc__ or "")
+        if match:
+            return match.group(1)
+    return type(entity).__name__
+
+
+def supported_countries():
+    """The countries of the installed holidays package (its version, and the table)."""
+    import holidays
+
+    codes = holidays.list_supported_countries(include_aliases=False)
+    df = pd.DataFrame({
+        "Country": [_entity_name(holidays.country_holidays(code)) for code in codes],
+        "Code": list(codes),
+    })
+    return holidays.__version__, df
+
+
+def write_snapshot(path=SNAPSHOT_PATH):
+    """Regenerate the bundled snapshot from the installed holidays package."""
+    version, df = supported_countries()
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        fh.write(f"# holidays {version}: holidays.list_supported_countries()\n")
+        df.to_csv(fh, index=False, lineterminator="\n")
+    return version, df
+
+
+def refresh(timeout=10):
+    """Download the current table and keep it on disk as the active copy."""
+    df = scrape_country_codes(timeout)
+    if df.empty:
+        raise ValueError("The 'Available Countries' table is empty.")
+    os.makedirs(REFRESH_DIR, exist_ok=True)
+    tmp_path = REFRESH_PATH + ".tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, REFRESH_PATH)
+    return df
+
+
+def source_path():
+    """The refreshed copy while it is younger than the TTL, otherwise the bundled snapshot."""
+    try:
+        if time.time() - os.path.getmtime(REFRESH_PATH) < TTL_SECONDS:
+            return REFRESH_PATH
+    except OSError:
+        pass
+    return SNAPSHOT_PATH
+
+
+def normalize(text):
+    """Lower-case ASCII words: accents folded, punctuation turned into spaces."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+
+class CountryIndex:
+    """Prefix / substring search over normalized country names and codes."""
+
+    def __init__(self, df):
+        self.frame = df.reset_index(drop=True)
+        self.names = [normalize(name) for name in self.frame["Country"]]
+        self.codes = [str(code).lower() for code in self.frame["Code"]]
+
+        # Every prefix, and every substring, of every name word and of the code -> row ids
+        self.prefixes = {}
+        self.substrings = {}
+        for row, (name, code) in enumerate(zip(self.names, self.codes)):
+            for token in set(name.split()) | {code}:
+                for start in range(len(token)):
+                    for end in range(start + 1, len(token) + 1):
+                        if start == 0:
+                            self.prefixes.setdefault(token[:end], set()).add(row)
+                        self.substrings.setdefault(token[start:end], set()).add(row)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def search(self, query):
+        """
+        Rows matching query, best first: exact code, name starting with the
+        query, every query word prefixing a name word (or the code), then
+        plain substrings of the name.
+        """
+        query = normalize(query)
+        if not query:
+            return self.frame
+
+        # A match contains every query word inside one of its words, so only those rows are ranked
+        words = query.split()
+        candidates = set.intersection(*(self.substrings.get(word, set()) for word in words))
+        prefix_rows = set.intersection(*(self.prefixes.get(word, set()) for word in words))
+
+        ranked = []
+        for row in candidates:
+            name = self.names[row]
+            if self.codes[row] == query:
+                rank = 0
+            elif name.startswith(query):
+                rank = 1
+            elif row in prefix_rows:
+                rank = 2
+            elif query in name:
+                rank = 3
+            else:
+                continue
+            ranked.append((rank, row))
+        return self.frame.iloc[[row for _, row in sorted(ranked)]]
+
+
+@lru_cache(maxsize=4)
+def _load_index(path, mtime):
+    # '#' lines: the provenance of the snapshot
+    return CountryIndex(pd.read_csv(path, keep_default_na=False, comment="#"))
+
+
+def get_index():
+    """The CountryIndex of the active table, rebuilt only when that file changes."""
+    path = source_path()
+    return _load_index(path, os.path.getmtime(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m attribution.countries',
+                                     description="Search the country codes, or regenerate the bundled snapshot.")
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('--snapshot', action='store_true',
+                        help="rewrite attribution/data/country_codes.csv from the installed holidays package")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        version, df = write_snapshot()
+        print(f"{len(df)} countries of holidays {version} written to {SNAPSHOT_PATH}")
+        return
+    print(get_index().search(args.query).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Session-scoped registry of parsed uploads.
+
+A Dataset wraps one uploaded file and derives what the pages need from it
+(the parsed frame, spend/impression column lists, the Date window) once.
+The registry keeps the datasets of a session by content digest and under
+named slots such as ``processed_data``, so every tab and page asks the
+registry instead of re-parsing the raw upload.
+"""
+from functools import cached_property
+
+import pandas as pd
+
+from attribution import ingest, workbook
+
+SESSION_KEY = "datasets"
+
+
+class Dataset:
+    """One uploaded file with its parsed frame and derived metadata, computed lazily."""
+
+    def __init__(self, file):
+        self.file = file
+        self.name = getattr(file, 'name', str(file))
+        self.digest = ingest.CACHE.digest(file)
+
+    @property
+    def is_excel(self):
+        return not ingest.is_csv(self.file)
+
+    @cached_property
+    def frame(self):
+        """The parsed first sheet, shared between pages: copy it before modifying."""
+        return ingest.read_table(self.file, copy=False)
+
+    def _loaded(self):
+        return 'frame' in self.__dict__
+
+    @cached_property
+    def columns(self):
+        if self.is_excel and not self._loaded():
+            return workbook.header(self.file)
+        return list(self.frame.columns)
+
+    def column(self, name):
+        """A single column, streamed from the workbook when the frame is not parsed yet."""
+        if self.is_excel and not self._loaded():
+            return workbook.column(self.file, name)
+        return self.frame[name]
+
+    @cached_property
+    def spend_columns(self):
+        return [col for col in self.columns if 'Spend' in col]
+
+    @cached_property
+    def impression_columns(self):
+        return [col for col in self.columns if 'Impressions' in col]
+
+    @cached_property
+    def date_bounds(self):
+        """(first, last) valid Date as Timestamps, or None without a Date column."""
+        if 'Date' not in self.columns:
+            return None
+        dates = pd.to_datetime(self.column('Date'), errors='coerce').dropna()
+        return dates.min(), dates.max()
+
+    def preview(self, nrows=5):
+        if self._loaded() or not self.is_excel:
+            return self.frame.head(nrows)
+        return workbook.preview(self.file, nrows)
+
+
+class DatasetRegistry:
+    """Datasets of one session, keyed by content digest and by slot name."""
+
+    def __init__(self):
+        self._datasets = {}
+        self._slots = {}
+
+    def register(self, file, slot=None):
+        """Return the dataset for file (reusing it for identical bytes), optionally filling a slot."""
+        digest = ingest.CACHE.digest(file)
+        dataset = self._datasets.get(digest)
+        if dataset is None:
+            dataset = self._datasets[digest] = Dataset(file)
+        if slot is not None:
+            previous = self._slots.get(slot)
+            self._slots[slot] = digest
+            if previous is not None and previous != digest:
+                self._release(previous)
+        return dataset
+
+    def get(self, slot):
+        digest = self._slots.get(slot)
+        return self._datasets.get(digest) if digest is not None else None
+
+    def clear(self, slot):
+        digest = self._slots.pop(slot, None)
+        if digest is not None:
+            self._release(digest)
+
+    def _release(self, digest):
+        # Datasets no longer referenced by any slot are dropped with their frames
+        if digest not in self._slots.values():
+            self._datasets.pop(digest, None)
+
+    def __len__(self):
+        return len(self._datasets)
+
+
+def from_session(state):
+    """The registry stored in a session state mapping (st.session_state), created on first use."""
+    if SESSION_KEY not in state:
+        state[SESSION_KEY] = DatasetRegistry()
+    return state[SESSION_KEY]
@@ -0,0 +1,162 @@
+"""
+Helpers for the Robyn decomposition tables (pareto_alldecomp_matrix and
+pareto_aggregated), which stack the rows of every candidate model keyed by
+``solID``.
+"""
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from attribution import ingest, workbook
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+class SolIDIndex:
+    """
+    A decomposition table partitioned by solID.
+
+    Rows are ordered so every model is one contiguous block, and the block
+    offsets are kept, so selecting a model is a positional slice instead of a
+    boolean scan over the whole table.
+    """
+
+    def __init__(self, df, key='solID'):
+        codes, models = pd.factorize(df[key], sort=False)
+        if len(codes) and not (np.diff(codes) >= 0).all():
+            # Stable sort keeps the original row order (e.g. dates) within each model
+            order = np.argsort(codes, kind='stable')
+            df = df.take(order)
+            codes = codes[order]
+
+        counts = np.bincount(codes[codes >= 0], minlength=len(models))
+        stops = np.cumsum(counts) + (codes < 0).sum()
+        starts = stops - counts
+
+        self.key = key
+        self.frame = df
+        self.models = np.asarray(models)
+        self.offsets = dict(zip(self.models, zip(starts.tolist(), stops.tolist())))
+
+    def __len__(self):
+        return len(self.models)
+
+    def __contains__(self, model):
+        return model in self.offsets
+
+    def __sizeof__(self):
+        return int(self.frame.memory_usage(deep=True).sum())
+
+    def get(self, model):
+        """Rows of a single model (an empty frame for unknown models)."""
+        start, stop = self.offsets.get(model, (0, 0))
+        return self.frame.iloc[start:stop]
+
+
+def load_partitioned(file, key='solID'):
+    """Parse a decomposition file once and return its cached solID index."""
+    return ingest.cached(file, f'{key}_index', lambda: SolIDIndex(ingest.read_table(file, copy=False), key))
+
+
+def read_header(file):
+    """Column names of a decomposition file, read without parsing any rows."""
+    def load():
+        if ingest.is_csv(file):
+            return list(pd.read_csv(BytesIO(ingest.file_bytes(file)), nrows=0).columns)
+        return workbook.header(file)
+    return ingest.cached(file, 'header', load)
+
+
+def read_model_ids(file, key='solID'):
+    """The solIDs of a decomposition file in order of appearance, parsing only that column."""
+    def load():
+        if ingest.is_csv(file):
+            ids = pd.read_csv(BytesIO(ingest.file_bytes(file)), usecols=[key], dtype={key: str})[key]
+        else:
+            ids = ingest.read_excel(file, copy=False)[key].astype(str)
+        return pd.unique(ids.dropna())
+    return ingest.cached(file, f'{key}_ids', load)
+
+
+def read_models(file, models, columns=None, key='solID', chunksize=DEFAULT_CHUNKSIZE, copy=True):
+    """
+    Rows of the given solID(s) only, optionally restricted to some columns.
+
+    The header is read first so only the key and the requested columns are
+    parsed, and CSV files are streamed in chunks keeping just the matching
+    rows, so memory is bounded by the selected models instead of the whole
+    Robyn run. columns is a list of names or a predicate on the column name.
+    Excel files cannot be streamed and are filtered after a full (cached) read.
+    """
+    if isinstance(models, str):
+        models = [models]
+    models = tuple(str(model) for model in models)
+
+    header = read_header(file)
+    if key not in header:
+        raise KeyError(f"'{key}' column is missing")
+    if columns is None:
+        usecols = header
+    elif callable(columns):
+        usecols = [col for col in header if col == key or columns(col)]
+    else:
+        wanted = set(columns) | {key}
+        usecols = [col for col in header if col in wanted]
+
+    def load():
+        if not ingest.is_csv(file):
+            df = ingest.read_excel(file, copy=False)[usecols]
+            return df[df[key].astype(str).isin(models)]
+        reader = pd.read_csv(
+            BytesIO(ingest.file_bytes(file)), usecols=usecols, dtype={key: str}, chunksize=chunksize
+        )
+        parts = [chunk[chunk[key].isin(models)] for chunk in reader]
+        return ingest.compact(pd.concat(parts)) if parts else pd.DataFrame(columns=usecols)
+
+    df = ingest.cached(file, (f'{key}_rows', models, tuple(usecols)), load)
+    return df.copy() if copy else df
+
+
+def numeric_values(df, columns):
+    """Columns as a float array, with non-numeric entries counted as zero."""
+    values = df[columns]
+    non_numeric = [col for col in columns if not pd.api.types.is_numeric_dtype(values[col])]
+    if non_numeric:
+        values = values.assign(**{col: pd.to_numeric(values[col], errors='coerce') for col in non_numeric})
+    return np.nan_to_num(values.to_numpy(dtype=float))
+
+
+def aggregate_all_models(index, mapping, names):
+    """
+    Column-group totals for every model in one pass.
+
+    Each mapped column is summed per solID block, then the columns are folded
+    into their groups with a column -> group indicator matrix. Returns a
+    solID x group frame (MultiIndex columns when grouping on several names).
+    """
+    if isinstance(names, str):
+        names = [names]
+    columns = list(mapping)
+    values = numeric_values(index.frame, columns)
+
+    starts = [index.offsets[model][0] for model in index.models]
+    if starts:
+        block_sums = np.add.reduceat(values, starts, axis=0)
+    else:
+        block_sums = np.zeros((0, len(columns)))
+
+    labels = [mapping[col] if isinstance(mapping[col], tuple) else (mapping[col],) for col in columns]
+    codes, groups = pd.factorize(pd.Series(labels, dtype=object), sort=True)
+    indicator = np.zeros((len(columns), len(groups)))
+    indicator[np.arange(len(columns)), codes] = 1
+
+    if len(names) > 1:
+        group_index = pd.MultiIndex.from_tuples(list(groups), names=names)
+    else:
+        group_index = pd.Index([group[0] for group in groups], name=names[0])
+    return pd.DataFrame(
+        block_sums @ indicator,
+        index=pd.Index(index.models, name=index.key),
+        columns=group_index,
+    )
@@ -0,0 +1,113 @@
+"""
+Memory-lean dtypes for the parsed Robyn tables.
+
+Robyn tables repeat a handful of strings on every row (``solID``, ``rn``, the
+``ds`` dates, the allocator's ``channels`` and ``periods``), which cost one
+Python object each as object / string columns. They are stored as categoricals
+instead: one copy of every distinct label plus small integer codes, so
+``df['solID'].cat.codes`` are the integer model codes. The decomposition matrix (one row per model and date)
+also keeps a variable column as float32 when its sums survive the narrowing:
+float32 holds about 7 significant digits, so the check is on what the pages
+export (the column's total per model and over all models, to SUM_ATOL), not
+value by value. The actual / fitted series stay float64 for the fit metrics.
+
+The parse cache applies ``compact`` to every parsed file (ATTRIBUTION_COMPACT=0
+turns it off), so the pages, the batch mode and the benchmarks all get the
+compacted frames. Sums over float32 columns are taken in float64 by the
+aggregation helpers.
+
+    python -m attribution.dtypes pareto_alldecomp_matrix.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+ENABLED = os.environ.get("ATTRIBUTION_COMPACT", "1").lower() not in ("0", "false", "no")
+
+CATEGORY_COLUMNS = ['solID', 'rn', 'ds', 'channels', 'periods']
+# Columns that mark a decomposition matrix, and its columns kept in float64
+DECOMP_COLUMNS = ['solID', 'ds']
+FLOAT64_COLUMNS = ['dep_var', 'depVarHat']
+# Largest change of a per-model column sum that float32 storage may cause (the pages round totals to units)
+SUM_ATOL = 1e-3
+
+
+def is_decomp_matrix(df):
+    return all(col in df.columns for col in DECOMP_COLUMNS)
+
+
+def _fits_float32(values, codes):
+    # Values outside the float32 range stay float64, and so do columns whose per-model sums
+    # (codes: the model of every row) or total move by more than SUM_ATOL
+    with np.errstate(over='ignore', invalid='ignore'):
+        narrow = values.astype(np.float32).astype(np.float64)
+    if not (np.isfinite(narrow) == np.isfinite(values)).all():
+        return False
+    change = np.bincount(codes, weights=np.nan_to_num(narrow) - np.nan_to_num(values))
+    return np.abs(change).max(initial=0) <= SUM_ATOL and abs(change.sum()) <= SUM_ATOL
+
+
+def float32_columns(df):
+    """The float64 variable columns of a decomposition matrix that can be stored as float32."""
+    if not is_decomp_matrix(df):
+        return []
+    # Rows without a solID form a group of their own
+    codes = pd.factorize(df['solID'])[0] + 1
+    return [
+        col for col in df.columns
+        if col not in FLOAT64_COLUMNS and df[col].dtype == np.float64 and _fits_float32(df[col].to_numpy(), codes)
+    ]
+
+
+def category_columns(df):
+    return [
+        col for col in CATEGORY_COLUMNS
+        if col in df.columns and (df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype))
+    ]
+
+
+def compact(df):
+    """df with categorical label columns and, for a decomposition matrix, float32 variables."""
+    changes = {col: df[col].astype('category') for col in category_columns(df)}
+    changes.update({col: df[col].astype(np.float32) for col in float32_columns(df)})
+    if not changes:
+        return df
+    # Assembled in one go: per-column assignment would copy the frame's blocks repeatedly
+    return pd.DataFrame({col: changes.get(col, df[col]) for col in df.columns}, index=df.index)
+
+
+def report(before, after):
+    """Deep memory of every column before and after compaction (MB), with the totals last."""
+    rows = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str),
+        'mb_before': before.memory_usage(deep=True, index=False) / 1024 ** 2,
+        'mb_after': after.memory_usage(deep=True, index=False) / 1024 ** 2,
+    })
+    rows.loc['Total'] = ['', '', rows['mb_before'].sum(), rows['mb_after'].sum()]
+    rows['ratio'] = rows['mb_after'] / rows['mb_before']
+    return rows.rename_axis('column').reset_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m attribution.dtypes',
+                                     description="Report the memory saved by compacting a Robyn CSV / Excel file.")
+    parser.add_argument('file')
+    parser.add_argument('--all', action='store_true', help="list every column, not only the changed ones")
+    args = parser.parse_args(argv)
+
+    if args.file.lower().endswith('.csv'):
+        before = pd.read_csv(args.file)
+    else:
+        before = pd.read_excel(args.file)
+    table = report(before, compact(before))
+    if not args.all:
+        table = table[(table['dtype_before'] != table['dtype_after']) | (table['column'] == 'Total')]
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.float_format', '{:.2f}'.format):
+        print(table.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
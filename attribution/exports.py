@@ -0,0 +1,64 @@
+"""
+Deferred download payloads.
+
+st.download_button accepts a zero-argument callable as ``data`` and only runs
+it when the user clicks. deferred() wraps a page's export function (Excel
+writer, PNG renderer) that way and memoizes the bytes in the parse cache by
+(input hash, export kind), so reruns that nobody downloads from never build
+a workbook, and repeated downloads of the same table build it once. Even the
+input hash is taken on the click, so an idle rerun costs nothing per button.
+Callable ``data`` needs Streamlit 1.52 or later.
+"""
+import hashlib
+
+import pandas as pd
+
+from attribution import ingest, profiling
+
+
+def frame_digest(df):
+    """Content hash of a frame (values, index and column names)."""
+    h = hashlib.sha256(repr(list(df.columns)).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Unhashable cells (e.g. lists of variable names)
+        h.update(df.to_csv().encode())
+    return h.hexdigest()
+
+
+def _as_bytes(payload):
+    if isinstance(payload, (bytes, str)):
+        return payload
+    payload.seek(0)
+    return payload.read()
+
+
+def _export_kind(build, args, kwargs):
+    code = getattr(build, '__code__', None)
+    origin = (code.co_filename, code.co_firstlineno) if code else repr(build)
+    return (origin, getattr(build, '__qualname__', ''), repr(args), repr(sorted(kwargs.items())))
+
+
+def deferred(build, df, *args, key=None, **kwargs):
+    """
+    Callable for st.download_button(data=...) that runs build(df, *args, **kwargs)
+    on the first download only. key replaces the frame hash when the caller
+    already knows what identifies the input (e.g. upload digest and solID).
+    """
+    kind = _export_kind(build, args, kwargs)
+    # The click runs outside the page rerun, so a profiled page gets its own record for the export
+    profiled = profiling.current()
+
+    def export():
+        if profiled is None:
+            return _as_bytes(build(df, *args, **kwargs))
+        with profiling.run(profiled.page, profiled.memory), profiling.span('export', step=build.__name__) as record:
+            profiling.note(record, df)
+            return _as_bytes(build(df, *args, **kwargs))
+
+    def payload():
+        # Hashed on the click: reruns without a download never touch the frame
+        cache_key = ('export', key if key is not None else frame_digest(df), kind)
+        return ingest.CACHE.get_or_compute(cache_key, export)
+    return payload
@@ -0,0 +1,85 @@
+"""
+Goodness-of-fit metrics for every model of a decomposition matrix.
+
+The matrix is partitioned by solID (see decomp.SolIDIndex), so each model is
+a contiguous block of rows and every metric reduces to per-block sums taken
+with np.add.reduceat in one pass over the actual / fitted columns.
+"""
+import numpy as np
+import pandas as pd
+
+from attribution import decomp, ingest
+
+FIT_COLUMNS = ['ds', 'dep_var', 'depVarHat']
+
+
+def _block_sums(values, starts):
+    if not len(starts):
+        return np.zeros(0)
+    return np.add.reduceat(values, starts)
+
+
+def fit_metrics(index, actual='dep_var', predicted='depVarHat', order='ds'):
+    """
+    One row per solID with n, RMSE, MAPE (%), R², bias (mean of fitted - actual)
+    and the lag-1 autocorrelation of the residuals (rows in `order` within each
+    model). Rows where either series is missing are left out of every metric.
+    """
+    frame = index.frame
+    counts = np.array([index.offsets[m][1] - index.offsets[m][0] for m in index.models], dtype=int)
+    block = np.repeat(np.arange(len(counts)), counts)
+    # Model blocks are contiguous and follow any rows without a solID
+    first = index.offsets[index.models[0]][0] if len(counts) else 0
+    rows = np.arange(first, first + counts.sum())
+
+    if order in frame.columns:
+        # Order rows by date inside each model (a no-op for Robyn's usual layout)
+        dates = pd.to_datetime(frame[order].iloc[rows], errors='coerce').to_numpy()
+        by_date = np.lexsort((dates, block))
+        if (by_date != np.arange(len(rows))).any():
+            rows = rows[by_date]
+
+    values = frame.iloc[rows][[actual, predicted]].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    ok = np.isfinite(values).all(axis=1)
+    valid = ok.astype(float)
+    y, y_hat = np.where(ok[:, None], values, 0).T
+
+    local_starts = np.concatenate([[0], np.cumsum(counts)[:-1]]) if len(counts) else counts
+    error = (y_hat - y) * valid
+    n = _block_sums(valid, local_starts)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sse = _block_sums(error ** 2, local_starts)
+        sum_y = _block_sums(y * valid, local_starts)
+        sst = _block_sums(y ** 2 * valid, local_starts) - sum_y ** 2 / n
+
+        nonzero = valid * (y != 0)
+        ape = np.divide(np.abs(error), np.abs(y), out=np.zeros_like(y), where=nonzero > 0)
+        mape = _block_sums(ape, local_starts) / _block_sums(nonzero, local_starts) * 100
+
+        bias = _block_sums(error, local_starts) / n
+
+        # Lag-1 autocorrelation of the residuals, only over pairs inside the same model
+        centered = (error - np.repeat(bias, counts)) * valid
+        same_model = (block[1:] == block[:-1]) & (valid[1:] > 0) & (valid[:-1] > 0)
+        lagged = np.bincount(block[1:], weights=centered[1:] * centered[:-1] * same_model, minlength=len(counts))
+        autocorr = lagged / _block_sums(centered ** 2, local_starts)
+
+        result = pd.DataFrame({
+            index.key: index.models,
+            'n': n.astype(int),
+            'RMSE': np.sqrt(sse / n),
+            'MAPE': mape,
+            'R2': 1 - sse / sst,
+            'Bias': bias,
+            'Residual_Autocorr': autocorr,
+        })
+    return result.replace([np.inf, -np.inf], np.nan)
+
+
+def leaderboard(file, key='solID'):
+    """Fit metrics of every model of an uploaded decomposition matrix, parsing only the columns they need."""
+    def compute():
+        df = ingest.read_table(file, copy=False, usecols=[key] + FIT_COLUMNS)
+        return fit_metrics(decomp.SolIDIndex(df, key))
+    return ingest.cached(file, (f'{key}_fit_metrics',), compute)
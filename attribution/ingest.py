@@ -0,0 +1,253 @@
+"""
+Shared ingestion layer for uploaded Robyn files.
+
+Uploaded files are keyed by a hash of their bytes, parsed once and kept in a
+size-bounded LRU cache so every rerun (and every page) gets the already-parsed
+frame back instead of re-reading the file. Parsed frames are compacted first
+(see attribution.dtypes).
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from attribution import dtypes, profiling
+
+DEFAULT_MAX_BYTES = int(os.environ.get("ATTRIBUTION_CACHE_MAX_MB", "1024")) * 1024 * 1024
+DEFAULT_CACHE_DIR = os.environ.get("ATTRIBUTION_CACHE_DIR")
+
+
+def file_bytes(file):
+    """Return the raw bytes of an UploadedFile, file-like object or path."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as fh:
+            return fh.read()
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    file.seek(0)
+    data = file.read()
+    file.seek(0)
+    return data
+
+
+def _sizeof(value, seen=None):
+    # Deep size in bytes; containers and objects are measured through what they hold
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(_sizeof(item, seen) for item in value.ravel())
+        return value.nbytes
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return sys.getsizeof(value) + sum(_sizeof(item, seen) for item in value)
+    if hasattr(value, 'to_plotly_json'):
+        # plotly figures: their data and layout, not the validators behind them
+        return sys.getsizeof(value) + _sizeof(value.to_plotly_json(), seen)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + _sizeof(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class ParseCache:
+    """Size-bounded LRU cache of parsed files and derived tables."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, cache_dir=DEFAULT_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._digests = OrderedDict()
+        # Futures of the keys being computed, so concurrent misses compute once
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def digest(self, file):
+        """Content hash of a file, memoized per Streamlit upload id."""
+        file_id = getattr(file, 'file_id', None)
+        if file_id is not None:
+            with self._lock:
+                if file_id in self._digests:
+                    return self._digests[file_id]
+        digest = hashlib.sha256(file_bytes(file)).hexdigest()
+        if file_id is not None:
+            with self._lock:
+                self._digests[file_id] = digest
+                if len(self._digests) > 1024:
+                    self._digests.popitem(last=False)
+        return digest
+
+    def get_or_compute(self, key, compute, persist=True):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        Callers that miss while the same key is being computed wait for it.
+        persist=False keeps the value out of the cache directory.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            pending = self._pending.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._pending[key] = Future()
+                owner = True
+            else:
+                self.hits += 1
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            value = self._read_disk(key) if persist else None
+            if value is None:
+                value = compute()
+                if persist:
+                    self._write_disk(key, value)
+            else:
+                self.disk_hits += 1
+            self._store(key, value)
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        pending.set_result(value)
+        return value
+
+    def _store(self, key, value):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def _disk_path(self, key):
+        name = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.parquet")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except (OSError, ValueError, ImportError):
+            return None
+
+    def _write_disk(self, key, value):
+        # Only plain frames are spilled; derived objects stay in memory only
+        if not self.cache_dir or not isinstance(value, pd.DataFrame):
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            value.to_parquet(self._disk_path(key))
+        except (OSError, ValueError, TypeError, ImportError):
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+CACHE = ParseCache()
+
+
+def _options_key(kwargs):
+    return repr(sorted(kwargs.items()))
+
+
+def cached(file, kind, compute):
+    """Cache a value derived from a file under (file digest, kind)."""
+    return CACHE.get_or_compute((CACHE.digest(file), kind), compute)
+
+
+def compact(df):
+    """dtypes.compact, timed (with the memory it saves) when the page is profiled."""
+    if not dtypes.ENABLED:
+        return df
+    if profiling.current() is None:
+        return dtypes.compact(df)
+    with profiling.span('load', step='compact_dtypes') as record:
+        compacted = dtypes.compact(df)
+        record['mb_before'] = _sizeof(df) / 1024 ** 2
+        record['mb_after'] = _sizeof(compacted) / 1024 ** 2
+    return compacted
+
+
+def read_csv(file, copy=False, **kwargs):
+    """
+    Parse a CSV upload once; later calls with the same bytes hit the cache.
+    The cached frame is shared: callers that modify it in place pass copy=True.
+    """
+    key = (CACHE.digest(file), 'csv', _options_key(kwargs))
+    df = CACHE.get_or_compute(key, lambda: compact(pd.read_csv(BytesIO(file_bytes(file)), **kwargs)))
+    return df.copy() if copy else df
+
+
+def read_excel(file, copy=False, **kwargs):
+    """Parse an Excel upload once; later calls with the same bytes hit the cache (see read_csv for copy)."""
+    key = (CACHE.digest(file), 'excel', _options_key(kwargs))
+    df = CACHE.get_or_compute(key, lambda: compact(pd.read_excel(BytesIO(file_bytes(file)), **kwargs)))
+    return df.copy() if copy else df
+
+
+def is_csv(file):
+    """True when the upload (or path) has a .csv name."""
+    return getattr(file, 'name', str(file)).lower().endswith('.csv')
+
+
+def read_table(file, copy=False, **kwargs):
+    """Parse a CSV or Excel upload based on its file name."""
+    if is_csv(file):
+        return read_csv(file, copy=copy, **kwargs)
+    return read_excel(file, copy=copy, **kwargs)
+
+
+def stats():
+    return CACHE.stats()
@@ -0,0 +1,442 @@
+"""
+Per-model (solID) metrics over the Robyn pareto_aggregated table, used to
+rank and screen candidate models.
+
+Every per-model statistic the pages show comes from one catalog of the table
+(see catalog): the rows are coded by model once and every count, sum, mean and
+the max channel CPA is a weighted bincount over those codes, so there is no
+Python call per model. The screening tables are views of the catalog.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from attribution import ingest, parallel
+
+IGNORE_VARS = ['(Intercept)', 'trend', 'season', 'weekday', 'monthly', 'holiday']
+OWN_PREFIX = 'own_'
+METRIC_COLS = ['rsq_train', 'rsq_val', 'rsq_test', 'nrmse', 'decomp.rssd']
+MIN_EFFECT = 1e-6
+
+
+def standardize_channel_names(names):
+    """
+    Transforms names like 'Media_Digital_..._1_Impressions' to 'Media Digital ... Impressions'.
+    """
+    # Remove '_N' adstock suffixes, then replace the remaining underscores with spaces
+    return names.str.replace(r'_\d+($|_)', '', regex=True).str.replace('_', ' ').str.strip()
+
+
+def _numeric(df, col):
+    # Missing columns count as missing values
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+
+def _sums(codes, values, mask, n):
+    # Per-model sum over the masked rows, NaN counted as zero (like a pandas sum)
+    return np.bincount(codes[mask], weights=np.nan_to_num(values[mask]), minlength=n)
+
+
+def _means(codes, values, mask, n):
+    # Per-model mean over the masked rows, skipping NaN (NaN for models without any)
+    mask = mask & ~np.isnan(values)
+    counts = np.bincount(codes[mask], minlength=n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.bincount(codes[mask], weights=values[mask], minlength=n) / counts
+
+
+def _names(codes, names, mask, n):
+    # The masked variable names of every model as lists, in row order
+    rows = np.flatnonzero(mask)
+    rows = rows[np.argsort(codes[rows], kind='stable')]
+    ends = np.cumsum(np.bincount(codes[rows], minlength=n)).tolist()
+    names = names[rows].tolist()
+    return [names[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+
+def _factorize(values):
+    # Integer codes (-1 for missing) and the labels; a compacted column already holds them
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.is_monotonic_increasing:
+        values = values.cat.remove_unused_categories()
+        return values.cat.codes.to_numpy(dtype=np.intp), values.cat.categories
+    return pd.factorize(values, sort=True)
+
+
+def _metrics(df, codes, n):
+    # Fit metrics from the first intercept row of each model, or from the first row when the table has none
+    rows = (df['rn'] == '(Intercept)').to_numpy() & (codes >= 0)
+    if not rows.any():
+        rows = codes >= 0
+    first = np.full(n, -1)
+    picked = np.flatnonzero(rows)[::-1]
+    first[codes[picked]] = picked
+    return {
+        col: np.where(first >= 0, _numeric(df, col)[np.maximum(first, 0)], np.nan)
+        for col in METRIC_COLS
+    }
+
+
+def _max_channel_cpa(codes, rn_codes, rn_names, spend, effect, mask, n):
+    # Channel = standardized variable name; spend and effect are summed per model and channel first
+    channels, channel_codes = np.unique(standardize_channel_names(pd.Series(rn_names, dtype=object)).to_numpy(dtype=str),
+                                        return_inverse=True)
+    pair = codes[mask] * len(channels) + channel_codes[rn_codes[mask]]
+    pairs, pair_codes = np.unique(pair, return_inverse=True)
+    pair_spend = np.bincount(pair_codes, weights=np.nan_to_num(spend[mask]), minlength=len(pairs))
+    pair_effect = np.bincount(pair_codes, weights=np.nan_to_num(effect[mask]), minlength=len(pairs))
+
+    # Channel CPA = Spend / Effect, undefined for zero/near zero effect
+    cpa = np.divide(pair_spend, pair_effect, out=np.full(len(pairs), np.nan), where=pair_effect > MIN_EFFECT)
+    model = pairs // len(channels) if len(channels) else pairs
+    max_cpa = np.full(n, np.nan)
+    np.fmax.at(max_cpa, model, cpa)
+    has_channels = np.bincount(model, minlength=n) > 0
+    return max_cpa, has_channels
+
+
+def catalog(df, processes=None):
+    """
+    One row per solID (in solID order) with everything the screening tables need:
+
+    - the fit metrics (METRIC_COLS) and their means over the relevant
+      variables (rsq_train_avg, decomp_rssd_avg), over its zero-coefficient
+      variables (zero_*) and over its zero-coefficient own_ variables (own_zero_*);
+    - n_vars, zero_count, total_spend_on_zeros and zero_vars over the relevant
+      variables (IGNORE_VARS left out);
+    - own_count, own_zero_count, total_spend_on_all_own,
+      total_spend_on_own_zeros, pct_spend_on_own_zeros and own_zero_vars;
+    - Max_Channel_CPA, the max spend / effect over the model's own_ channels
+      with a non-zero coefficient (has_cpa_channels: it has such channels).
+
+    Large tables are split into solID partitions that are cataloged in the
+    process pool of attribution.parallel (processes overrides its size).
+    """
+    return parallel.map_partitions(_catalog, df, processes=processes)
+
+
+def _catalog(df):
+    # The catalog of one partition (every row of a model is in the same one)
+    codes, solIDs = _factorize(df['solID'])
+    n = len(solIDs)
+    rn_codes, rn_names = _factorize(df['rn'])
+    rn_names = np.asarray(rn_names, dtype=object)
+    keyed = codes >= 0
+
+    ignored = np.isin(rn_names, IGNORE_VARS)[rn_codes] & (rn_codes >= 0)
+    relevant = keyed & ~ignored
+    coef = _numeric(df, 'coef')
+    zero = relevant & (coef == 0)
+    own = relevant & df['rn'].str.contains(OWN_PREFIX, case=False, na=False).to_numpy(dtype=bool)
+    own_zero = own & (coef == 0)
+
+    spend = _numeric(df, 'total_spend')
+    rsq_train = _numeric(df, 'rsq_train')
+    rssd = _numeric(df, 'decomp.rssd')
+    names = np.where(rn_codes >= 0, rn_names[np.maximum(rn_codes, 0)], None)
+
+    max_cpa, has_cpa_channels = _max_channel_cpa(codes, rn_codes, rn_names, spend, _numeric(df, 'xDecompAgg'),
+                                                 own & (coef != 0), n)
+    total_spend_on_all_own = _sums(codes, spend, own, n)
+    total_spend_on_own_zeros = _sums(codes, spend, own_zero, n)
+    return pd.DataFrame({
+        'solID': np.asarray(solIDs),
+        **_metrics(df, codes, n),
+        'rsq_train_avg': _means(codes, rsq_train, relevant, n),
+        'decomp_rssd_avg': _means(codes, rssd, relevant, n),
+        'n_vars': np.bincount(codes[relevant], minlength=n),
+        'zero_count': np.bincount(codes[zero], minlength=n),
+        'total_spend_on_zeros': _sums(codes, spend, zero, n),
+        'zero_rsq_train_avg': _means(codes, rsq_train, zero, n),
+        'zero_decomp_rssd_avg': _means(codes, rssd, zero, n),
+        'zero_vars': _names(codes, names, zero, n),
+        'own_count': np.bincount(codes[own], minlength=n),
+        'own_zero_count': np.bincount(codes[own_zero], minlength=n),
+        'total_spend_on_all_own': total_spend_on_all_own,
+        'total_spend_on_own_zeros': total_spend_on_own_zeros,
+        'pct_spend_on_own_zeros': np.divide(total_spend_on_own_zeros * 100, total_spend_on_all_own,
+                                            out=np.zeros(n), where=total_spend_on_all_own != 0),
+        'own_zero_rsq_train_avg': _means(codes, rsq_train, own_zero, n),
+        'own_zero_decomp_rssd_avg': _means(codes, rssd, own_zero, n),
+        'own_zero_vars': _names(codes, names, own_zero, n),
+        'Max_Channel_CPA': max_cpa,
+        'has_cpa_channels': has_cpa_channels,
+    })
+
+
+def load_catalog(file, df=None):
+    """The catalog of an uploaded pareto_aggregated file, built once per upload (from df when already parsed)."""
+    return ingest.cached(file, 'model_catalog', lambda: catalog(ingest.read_table(file, copy=False) if df is None else df))
+
+
+def max_channel_cpa(models):
+    """
+    The max 'own_' channel CPA of each model (solID), EXCLUDING variables with
+    a zero coefficient, with the model metrics used as tie-breakers.
+    """
+    ranking = models.loc[models['has_cpa_channels'], ['solID', 'Max_Channel_CPA'] + METRIC_COLS]
+    return ranking.replace([np.inf, -np.inf], np.nan).reset_index(drop=True)
+
+
+def non_zero_summary(models):
+    """Average rsq_train / decomp.rssd of the models whose relevant variables all have non-zero coefficients."""
+    non_zero = models[(models['n_vars'] > 0) & (models['zero_count'] == 0)]
+    return non_zero[['solID', 'rsq_train_avg', 'decomp_rssd_avg']].reset_index(drop=True)
+
+
+def zero_coef_summary(models):
+    """Zero-coefficient variables of each model (ignored variables excluded)."""
+    zeros = models[models['zero_count'] > 0]
+    return pd.DataFrame({
+        'solID': zeros['solID'].to_numpy(),
+        'zero_count': zeros['zero_count'].to_numpy(),
+        'total_spend_on_zeros': zeros['total_spend_on_zeros'].to_numpy(),
+        'zero_vars': zeros['zero_vars'].to_numpy(),
+        'rsq_train_avg': zeros['zero_rsq_train_avg'].to_numpy(),
+        'decomp_rssd_avg': zeros['zero_decomp_rssd_avg'].to_numpy(),
+    })
+
+
+def own_zero_summary(models):
+    """
+    Models where 'own_' paid media variables were given a zero coefficient,
+    with the share of 'own_' spend they account for. Empty when there are none.
+    """
+    own_zeros = models[models['own_zero_count'] > 0]
+    if own_zeros.empty:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        'solID': own_zeros['solID'].to_numpy(),
+        'rsq_train_avg': own_zeros['own_zero_rsq_train_avg'].to_numpy(),
+        'decomp_rssd_avg': own_zeros['own_zero_decomp_rssd_avg'].to_numpy(),
+        'own_zero_count': own_zeros['own_zero_count'].to_numpy(),
+        'total_spend_on_own_zeros': own_zeros['total_spend_on_own_zeros'].to_numpy(),
+        'total_spend_on_all_own': own_zeros['total_spend_on_all_own'].to_numpy(),
+        'pct_spend_on_own_zeros': own_zeros['pct_spend_on_own_zeros'].to_numpy(),
+        'own_zero_vars': own_zeros['own_zero_vars'].to_numpy(),
+    })
+
+
+def standardize_spend_names(names):
+    """Transforms names like 'Meta_Video_2_Spend' to 'Meta Video'."""
+    # Drop the '_Spend' suffix, then any trailing number, then replace underscores with spaces
+    names = names.str.replace(r'_Spend$', '', regex=True).str.replace(r'(_\d+|\d+)$', '', regex=True)
+    return names.str.replace('_', ' ').str.strip()
+
+
+def effect_spend_share(df):
+    """
+    Effect and spend share of one model's Spend variables per standardized
+    name, with effect - spend as 'difference', ordered by effect share.
+    """
+    df = df[df['rn'].str.contains("Spend", case=False)]
+    df = df.assign(rn=standardize_spend_names(df['rn']))
+
+    consolidated_df = df.groupby('rn').agg({
+        'spend_share': 'sum',
+        'effect_share': 'sum'
+    }).reset_index()
+    consolidated_df['difference'] = consolidated_df['effect_share'] - consolidated_df['spend_share']
+    consolidated_df = consolidated_df[['rn', 'effect_share', 'spend_share', 'difference']]
+    return consolidated_df.sort_values(by='effect_share', ascending=True).reset_index(drop=True)
+
+
+def rank_by_max_cpa(ranking):
+    """
+    The models of a max_channel_cpa table that have a CPA, lowest first (ties:
+    highest rsq_train), with a Rank column.
+    """
+    ranking = ranking.dropna(subset=['Max_Channel_CPA'])
+    ranking = ranking.sort_values(by=['Max_Channel_CPA', 'rsq_train'], ascending=[True, False]).reset_index(drop=True)
+    ranking['Rank'] = ranking.index + 1
+    return ranking
+
+
+# Catalog columns a Pareto ranking can trade off, with the direction that is better
+OBJECTIVES = {
+    'Max_Channel_CPA': 'min',
+    'rsq_train': 'max',
+    'nrmse': 'min',
+    'decomp.rssd': 'min',
+    'pct_spend_on_own_zeros': 'min',
+}
+DEFAULT_OBJECTIVES = ['Max_Channel_CPA', 'rsq_train', 'decomp.rssd']
+SKYLINE_BLOCK = 256
+SKYLINE_CELLS = 2 ** 24
+
+
+def _dominated(points, by):
+    # Rows of points dominated by any row of by (no worse everywhere, better somewhere; all minimized)
+    dominated = np.zeros(len(points), dtype=bool)
+    step = max(1, SKYLINE_CELLS // max(1, len(points)))
+    for start in range(0, len(by), step):
+        block = by[start:start + step]
+        # One objective at a time: reductions over a short last axis are slow
+        no_worse = np.ones((len(points), len(block)), dtype=bool)
+        better = np.zeros((len(points), len(block)), dtype=bool)
+        for j in range(points.shape[1]):
+            no_worse &= block[:, j] <= points[:, j, None]
+            better |= block[:, j] < points[:, j, None]
+        dominated |= (no_worse & better).any(axis=1)
+    return dominated
+
+
+def skyline(points):
+    """
+    Positions of the non-dominated rows of points (every column minimized).
+
+    Sort-filter-skyline: the rows are visited by the sum of their min-max
+    normalized values, so a row can only be dominated by rows before it. They
+    are taken in blocks, a block keeps the rows that none of its rows
+    dominates, and those skyline rows then drop every later row they dominate
+    in one pass. Dominated rows need no test of their own: their dominators
+    are dominated by an earlier skyline row.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0:
+        return np.arange(0)
+    low, high = points.min(axis=0), points.max(axis=0)
+    scaled = (points - low) / np.where(high > low, high - low, 1)
+    pending = np.lexsort(list(points.T[::-1]) + [scaled.sum(axis=1)])
+
+    found = []
+    while len(pending):
+        rows, pending = pending[:SKYLINE_BLOCK], pending[SKYLINE_BLOCK:]
+        block = points[rows]
+        keep = ~_dominated(block, block)
+        found.append(rows[keep])
+        pending = pending[~_dominated(points[pending], block[keep])]
+    return np.sort(np.concatenate(found))
+
+
+def _fronts_2d(values):
+    # Two objectives: every front in one pass in (x, y) order. A point is dominated by a front
+    # iff the front's lowest y so far is at or below its y, so it joins the first front above it.
+    points, inverse = np.unique(values, axis=0, return_inverse=True)
+    lowest = []
+    fronts = np.empty(len(points), dtype=int)
+    for i, y in enumerate(points[:, 1].tolist()):
+        front = bisect.bisect_right(lowest, y)
+        if front == len(lowest):
+            lowest.append(y)
+        else:
+            lowest[front] = y
+        fronts[i] = front + 1
+    return fronts[inverse.ravel()]
+
+
+def pareto_fronts(models, objectives, max_fronts=None):
+    """
+    The Pareto front of every model (1 = non-dominated) over the objectives,
+    catalog columns of OBJECTIVES. Each front is the skyline of the models
+    left after removing the fronts before it. Models with a missing objective,
+    or beyond max_fronts, get NaN.
+    """
+    values = np.column_stack([
+        models[col].to_numpy(dtype=float) * (-1 if OBJECTIVES[col] == 'max' else 1) for col in objectives
+    ])
+    fronts = np.full(len(models), np.nan)
+    remaining = np.flatnonzero(np.isfinite(values).all(axis=1))
+    if len(objectives) == 2:
+        found = _fronts_2d(values[remaining])
+        found = np.where(found <= (max_fronts or np.inf), found, np.nan)
+        fronts[remaining] = found
+        return pd.Series(fronts, index=models.index, name='Front')
+    front = 1
+    while len(remaining) and (max_fronts is None or front <= max_fronts):
+        members = remaining[skyline(values[remaining])]
+        fronts[members] = front
+        remaining = np.setdiff1d(remaining, members, assume_unique=True)
+        front += 1
+    return pd.Series(fronts, index=models.index, name='Front')
+
+
+def pareto_ranking(models, objectives, max_fronts=5):
+    """
+    The models of a catalog that have a max channel CPA with their Pareto
+    Front over the objectives (missing beyond max_fronts), best front first
+    and, within a front, lowest Max_Channel_CPA first.
+    """
+    ranking = models.loc[models['has_cpa_channels'], ['solID'] + list(OBJECTIVES)]
+    ranking = ranking.replace([np.inf, -np.inf], np.nan)
+    ranking['Front'] = pareto_fronts(ranking, objectives, max_fronts).astype('Int64')
+    return ranking.sort_values(by=['Front', 'Max_Channel_CPA']).reset_index(drop=True)
+
+
+# Default weights of the OBJECTIVES in the weighted model score
+SCORE_WEIGHTS = {
+    'Max_Channel_CPA': 1.0,
+    'rsq_train': 1.0,
+    'nrmse': 0.5,
+    'decomp.rssd': 0.5,
+    'pct_spend_on_own_zeros': 0.5,
+}
+
+
+class ModelScores:
+    """
+    Weighted scores of the models of a catalog, for weights that change often.
+
+    Every OBJECTIVES metric is turned into a percentile once (1 = best model,
+    missing = 0, so a heavy CPA tail does not squash the rest), which makes
+    scoring a matrix-vector product and the top k an argpartition of it.
+    """
+
+    def __init__(self, models):
+        self.models = models[['solID'] + list(OBJECTIVES)].reset_index(drop=True)
+        self.metrics = list(OBJECTIVES)
+        self.matrix = np.column_stack([
+            self.models[col].replace([np.inf, -np.inf], np.nan)
+            .rank(pct=True, ascending=OBJECTIVES[col] == 'max').fillna(0).to_numpy()
+            for col in self.metrics
+        ])
+
+    def __len__(self):
+        return len(self.models)
+
+    def scores(self, weights):
+        """Score of every model in [0, 1]: the weighted mean of its percentiles."""
+        w = np.array([max(float(weights.get(col, 0)), 0.0) for col in self.metrics])
+        if w.sum() == 0:
+            return np.zeros(len(self))
+        return self.matrix @ (w / w.sum())
+
+    def top(self, weights, k=20):
+        """The k best models for the weights with their Rank and Score (ties: catalog order)."""
+        scores = self.scores(weights)
+        k = max(0, min(int(k), len(self)))
+        best = np.arange(0)
+        if k:
+            # Partial sort: the k-th best score, then the models above it and the first models tied with it
+            cutoff = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            above = np.flatnonzero(scores > cutoff)
+            best = np.concatenate([above, np.flatnonzero(scores == cutoff)[:k - len(above)]])
+            best = best[np.lexsort((best, -scores[best]))]
+        top = self.models.iloc[best].reset_index(drop=True)
+        top.insert(0, 'Score', scores[best])
+        top.insert(0, 'Rank', np.arange(1, k + 1))
+        return top
+
+
+def load_scores(file, models):
+    """ModelScores of the catalog of an upload, built once per upload."""
+    return ingest.cached(file, 'model_scores', lambda: ModelScores(models))
+
+
+def submodel_tables(models):
+    """
+    The submodel screening tables of a catalog: models whose relevant
+    variables are all non-zero (best rsq_train first), and the zero-coefficient
+    summary (fewest zeros first).
+    """
+    non_zero = non_zero_summary(models)
+    if not non_zero.empty:
+        non_zero = non_zero.sort_values(by='rsq_train_avg', ascending=False)
+
+    zeros = zero_coef_summary(models)
+    if not zeros.empty:
+        zeros = zeros[['solID', 'rsq_train_avg', 'decomp_rssd_avg', 'zero_count', 'total_spend_on_zeros', 'zero_vars']]
+        zeros = zeros.sort_values(by='zero_count', ascending=True)
+    return non_zero, zeros
@@ -0,0 +1,283 @@
+"""
+Budget reallocation tables built from Robyn's allocator output.
+
+Combines the per-channel response of one model (pareto_alldecomp_matrix),
+the per-channel spend (Processed / Raw Data) and the allocator's
+reallocation CSV into the old vs new budget table of the Optimization page,
+sweeps that reallocation over total budgets (see scenario_sweep) and
+compares the reallocations of several models (see compare_reallocations).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from attribution import decomp, ingest, precompute, taxonomy
+
+RESPONSE_EXCLUDE = ['KPI_Website_Conversions']
+REALLOCATED_SUFFIX = '_reallocated.csv'
+
+AGGREGATIONS = {
+    'initSpendUnit': 'sum',
+    'optmSpendUnit': 'sum',
+    'initResponseTotal': 'min',
+    'optmResponseTotal': 'min',
+    'initResponseUnit': 'sum',
+    'optmResponseUnit': 'sum',
+    'period_number': 'mean'
+}
+
+TABLE_COLUMNS = {
+    'Channel': 'channel',
+    'Spend': 'old_budget',
+    'Sum_optmSpendUnit': 'new_budget',
+    'Conversions': 'old_response',
+    'New Response': 'new_response',
+    'Change': 'budget change',
+    'Response_Change': 'resp change',
+    'Absolute Budget Change': 'abs budg change'
+}
+
+
+def _is_spend(col):
+    return 'spend' in col.lower()
+
+
+def _channel_response(df):
+    channel_map = taxonomy.channel_groups(df.columns, exclude=RESPONSE_EXCLUDE)
+    return taxonomy.aggregate(df, channel_map, 'Channel', 'Conversions', coerce=True, sort=False)
+
+
+def load_conversions(file, solID_value):
+    """Response of the spend variables of one model, summed per channel."""
+    # Only parse the spend columns, and only the rows of the selected solID
+    return _channel_response(decomp.read_models(file, solID_value, columns=_is_spend))
+
+
+def load_spends(file):
+    """Total spend per channel of a Processed / Raw Data upload."""
+    df = ingest.read_table(file, copy=False)
+    channel_map = taxonomy.channel_groups(df.columns)
+    return taxonomy.aggregate(df, channel_map, 'Channel', 'Spend', coerce=True, sort=False)
+
+
+def load_preprocessed(file):
+    """Aggregate the reallocation CSV per channel, with totals over its periods."""
+    # Modified below, so a private copy of the cached frame
+    df = ingest.read_csv(file, copy=True)
+
+    # First number of e.g. '52 weeks' (NaN when there is none)
+    df['period_number'] = pd.to_numeric(df['periods'].astype(str).str.extract(r'(\d+)', expand=False))
+    channel_split = df['channels'].str.extract(r'([^_]+)_([^_]+)_(.+)')
+    channel_split.columns = ['Channel', 'channel_type', 'channel_metric']
+    df = pd.concat([df, channel_split], axis=1)
+    grouped_df = df.groupby(['Channel']).agg(AGGREGATIONS).reset_index()
+
+    for unit in ['initSpendUnit', 'optmSpendUnit', 'initResponseUnit', 'optmResponseUnit']:
+        grouped_df[f'Sum_{unit}'] = (grouped_df[unit] * grouped_df['period_number']).round(1)
+    grouped_df['Change'] = round((grouped_df['Sum_optmSpendUnit'] - grouped_df['Sum_initSpendUnit']) / grouped_df['Sum_initSpendUnit'], 3)
+    grouped_df['Response_Change'] = round(grouped_df['Sum_optmResponseUnit'] / grouped_df['Sum_initResponseUnit'], 3)
+    return grouped_df.drop(columns=['initSpendUnit', 'optmSpendUnit', 'initResponseUnit', 'optmResponseUnit'])
+
+
+def reallocation_solID(file):
+    """The solID of a reallocation CSV: its solID column, else the <solID>_reallocated.csv file name."""
+    df = ingest.read_csv(file, copy=False)
+    if 'solID' in df.columns and df['solID'].notna().any():
+        return str(df['solID'].dropna().iloc[0])
+    name = os.path.basename(getattr(file, 'name', str(file)))
+    return name[:-len(REALLOCATED_SUFFIX)] if name.endswith(REALLOCATED_SUFFIX) else os.path.splitext(name)[0]
+
+
+def merge_data(conversions_df, spends_df, preprocessed_df):
+    """Merge the three DataFrames on the 'Channel' column."""
+    merged_df = pd.merge(conversions_df, spends_df, on='Channel', how='outer')
+    merged_df = pd.merge(merged_df, preprocessed_df, on='Channel', how='outer')
+    return merged_df
+
+
+def reallocation(conversions_df, spends_df, preprocessed_df):
+    """
+    Old vs new budget and response per channel, and the overall budget,
+    response and CPA changes (in %).
+    """
+    final_df = merge_data(conversions_df, spends_df, preprocessed_df)
+
+    final_df['New Response'] = final_df['Conversions'] * final_df['Response_Change']
+    final_df['Budget Change'] = ((final_df['Sum_optmSpendUnit'] - final_df['Spend']) / final_df['Spend'])
+    final_df['Absolute Budget Change'] = (final_df['Sum_optmSpendUnit'] - final_df['Spend']).round(1)
+
+    total_new_response = final_df['New Response'].sum()
+    total_old_response = final_df['Conversions'].sum()
+    total_new_budget = final_df['Sum_optmSpendUnit'].sum()
+    total_old_budget = final_df['Spend'].sum()
+
+    # Avoid division by zero
+    response_change_kpi = ((total_new_response / total_old_response) - 1) * 100 if total_old_response != 0 else 0
+    budget_change_kpi = ((total_new_budget - total_old_budget) / total_old_budget) * 100 if total_old_budget != 0 else 0
+    cpa_change = ((total_new_budget / total_new_response) / (total_old_budget / total_old_response) - 1) * 100 if total_new_response != 0 and total_old_response != 0 and total_old_budget != 0 else 0
+
+    final_df = final_df.rename(columns=TABLE_COLUMNS)[list(TABLE_COLUMNS.values())]
+    final_df['old_response'] = final_df['old_response'].fillna(0)
+    final_df['new_response'] = final_df['new_response'].fillna(0)
+
+    kpis = {
+        'budget_change': budget_change_kpi,
+        'response_change': response_change_kpi,
+        'cpa_change': cpa_change,
+    }
+    return final_df, kpis
+
+
+def budget_factors(low=0.5, high=2.0, points=301):
+    """points evenly spaced total budget factors from low to high (inclusive)."""
+    return np.linspace(low, high, int(points))
+
+
+DEFAULT_FACTORS = budget_factors()
+
+
+def elasticities(init_spend, optm_spend, init_response, optm_response):
+    """
+    Per-channel exponent b of a response curve response ~ spend ** b between
+    the allocator's initial and optimized points, clipped to [0, 1]
+    (diminishing returns). Channels whose spend did not move get the mean
+    exponent of the others (0 when there are none).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b = np.log(optm_response / init_response) / np.log(optm_spend / init_spend)
+    b = np.where(np.isfinite(b), np.clip(b, 0, 1), np.nan)
+    fallback = np.nanmean(b) if np.isfinite(b).any() else 0.0
+    return np.where(np.isnan(b), fallback, b)
+
+
+def allocate(shares, totals, caps):
+    """
+    Split every total over the channels in proportion to shares, without
+    exceeding the channel caps: capped channels are fixed at their cap and
+    the rest of the budget is spread over the others (water-filling), for all
+    totals at once. Returns a totals x channels array; a row sums to less
+    than its total only when every channel is capped.
+    """
+    totals = np.asarray(totals, dtype=float)[:, None]
+    shares = np.broadcast_to(np.asarray(shares, dtype=float), (len(totals), len(shares)))
+    capped = np.zeros(shares.shape, dtype=bool)
+    spend = np.zeros(shares.shape)
+    # Every pass caps at least one more channel of the rows that still overflow
+    for _ in range(shares.shape[1]):
+        free = np.where(capped, 0.0, shares)
+        remaining = totals - np.where(capped, caps, 0.0).sum(axis=1, keepdims=True)
+        free_total = free.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spread = np.where(free_total > 0, remaining * free / free_total, 0.0)
+        spend = np.where(capped, caps, np.maximum(spread, 0.0))
+        over = ~capped & (spend > caps)
+        if not over.any():
+            break
+        capped |= over
+    return np.minimum(spend, caps)
+
+
+def scenario_sweep(conversions_df, spends_df, preprocessed_df, factors=DEFAULT_FACTORS, caps=None):
+    """
+    The budget, response and CPA changes of reallocation() for many total budgets.
+
+    For a factor k the allocator's optimized budget (sum over channels) is
+    scaled by k and split in the optimized proportions, each channel capped
+    at caps[channel] times its initial spend (no cap when missing or None).
+    A channel's response is its response in the decomposition matrix times
+    Response_Change * (spend / optimized spend) ** b: a constant-elasticity
+    curve through the optimized point (see elasticities for b), so k = 1
+    without caps gives the KPIs of reallocation(). Returns one row per
+    factor, changes in %.
+    """
+    merged = merge_data(conversions_df, spends_df, preprocessed_df)
+    init_spend = merged['Sum_initSpendUnit'].to_numpy(dtype=float)
+    optm_spend = merged['Sum_optmSpendUnit'].to_numpy(dtype=float)
+    b = elasticities(init_spend, optm_spend,
+                     merged['Sum_initResponseUnit'].to_numpy(dtype=float),
+                     merged['Sum_optmResponseUnit'].to_numpy(dtype=float))
+    old_budget = np.nansum(merged['Spend'].to_numpy(dtype=float))
+    old_response = merged['Conversions'].to_numpy(dtype=float)
+    channel_response_change = merged['Response_Change'].to_numpy(dtype=float)
+
+    # Channels missing from the allocator keep no new budget or response, as in reallocation()
+    planned = np.isfinite(optm_spend) & np.isfinite(init_spend) & np.isfinite(channel_response_change) & (optm_spend > 0)
+    caps = caps or {}
+    cap_multiples = np.array([np.inf if caps.get(channel) is None else caps[channel] for channel in merged['Channel']], dtype=float)
+    channel_caps = np.zeros(len(merged))
+    channel_caps[planned] = cap_multiples[planned] * init_spend[planned]
+
+    factors = np.asarray(factors, dtype=float)
+    shares = np.where(planned, optm_spend, 0.0)
+    spend = allocate(shares, factors * shares.sum(), channel_caps)
+
+    ratio = np.full(spend.shape, np.nan)
+    ratio[:, planned] = channel_response_change[planned] * (spend[:, planned] / optm_spend[planned]) ** b[planned]
+    new_budget = spend.sum(axis=1)
+    new_response = np.nansum(old_response * ratio, axis=1)
+    total_old_response = np.nansum(old_response)
+
+    # Avoid division by zero (the changes are 0 then, as in reallocation())
+    zeros = np.zeros(len(factors))
+    budget_change = (new_budget - old_budget) / old_budget * 100 if old_budget else zeros
+    response_change = (new_response / total_old_response - 1) * 100 if total_old_response else zeros
+    cpa_change = zeros
+    if old_budget and total_old_response:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cpa_change = np.where(new_response != 0, ((new_budget / new_response) / (old_budget / total_old_response) - 1) * 100, 0.0)
+
+    return pd.DataFrame({
+        'factor': factors,
+        'budget': new_budget,
+        'response': new_response,
+        'budget_change': budget_change,
+        'response_change': response_change,
+        'cpa_change': cpa_change,
+    })
+
+
+COMPARISON_COLUMNS = ['solID', 'old_budget', 'new_budget', 'old_response', 'new_response',
+                      'budget_change', 'response_change', 'cpa_change', 'error']
+
+
+def compare_reallocations(conversions_file, spends_file, reallocation_files, max_workers=None):
+    """
+    The reallocation() totals and KPIs of several models, one row per solID.
+
+    reallocation_files maps solID -> that model's reallocation CSV. The rows
+    of all the models are read from the decomposition matrix in one streamed
+    parse and the spends once; the per-model merges then run on a thread
+    pool. A model missing from the matrix or with an unreadable file gets
+    its error in the error column instead of failing the comparison.
+    """
+    solIDs = list(reallocation_files)
+    if not solIDs:
+        return pd.DataFrame(columns=COMPARISON_COLUMNS)
+    index = decomp.SolIDIndex(decomp.read_models(conversions_file, solIDs, columns=_is_spend))
+    spends_df = load_spends(spends_file)
+
+    def compare(solID):
+        row = {'solID': solID}
+        if solID not in index:
+            return {**row, 'error': "solID not found in the decomposition matrix"}
+        try:
+            final_df, kpis = reallocation(_channel_response(index.get(solID)), spends_df,
+                                          load_preprocessed(reallocation_files[solID]))
+        except (KeyError, ValueError) as e:
+            return {**row, 'error': f"{type(e).__name__}: {e}"}
+        return {
+            **row,
+            'old_budget': final_df['old_budget'].sum(),
+            'new_budget': final_df['new_budget'].sum(),
+            'old_response': final_df['old_response'].sum(),
+            'new_response': final_df['new_response'].sum(),
+            **kpis,
+            'error': None,
+        }
+
+    workers = min(max_workers or precompute.MAX_WORKERS, len(solIDs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reallocation") as executor:
+        rows = list(executor.map(compare, solIDs))
+    return pd.DataFrame(rows, columns=COMPARISON_COLUMNS)
@@ -0,0 +1,80 @@
+"""
+solID-partitioned execution over a process pool.
+
+Per-model metrics only ever look at the rows of one solID, so a table can be
+split into hash partitions of whole models, processed in separate processes
+and concatenated back. Small tables (or ATTRIBUTION_PROCESSES=1) run the same
+function in-process, where the pool start-up would cost more than it saves.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+
+import pandas as pd
+
+PROCESSES = int(os.environ.get("ATTRIBUTION_PROCESSES", os.cpu_count() or 1))
+MIN_ROWS = int(os.environ.get("ATTRIBUTION_PARALLEL_MIN_ROWS", "200000"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking the multi-threaded Streamlit server is not safe
+            _pool = ProcessPoolExecutor(max_workers=PROCESSES, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(_reset_pool)
+
+
+def partitions(df, n, key='solID'):
+    """Split df into at most n frames so that every solID lands in exactly one of them."""
+    buckets = pd.util.hash_pandas_object(df[key], index=False).to_numpy() % n
+    return [part for _, part in df.groupby(buckets, sort=True)]
+
+
+def concat_by_key(results, key='solID'):
+    """Concatenate per-partition results back into key order, as a single groupby would return them."""
+    combined = pd.concat([result for result in results if not result.empty] or results[:1], ignore_index=True)
+    return combined.sort_values(key, kind='stable').reset_index(drop=True)
+
+
+def map_partitions(func, df, key='solID', combine=concat_by_key, processes=None, min_rows=None):
+    """
+    Run func on solID partitions of df in the process pool and combine the results.
+
+    func must be a module-level function (it is pickled to the workers). The
+    table is processed in-process when it is smaller than min_rows, when only
+    one process is configured or all rows fall in one partition, or when the
+    pool cannot be used.
+    """
+    processes = PROCESSES if processes is None else processes
+    min_rows = MIN_ROWS if min_rows is None else min_rows
+    if processes <= 1 or len(df) < min_rows:
+        return combine([func(df)], key)
+
+    parts = partitions(df, processes, key)
+    if len(parts) <= 1:
+        return combine([func(df)], key)
+    try:
+        results = list(_get_pool().map(func, parts))
+    except (BrokenProcessPool, PicklingError, OSError):
+        _reset_pool()
+        results = [func(part) for part in parts]
+    return combine(results, key)
@@ -0,0 +1,135 @@
+"""
+The attribution pipeline for one Robyn output folder, without a UI.
+
+A folder holds what the pages are fed by hand: pareto_alldecomp_matrix.csv,
+pareto_aggregated.csv, the allocator's ``<solID>_reallocated.csv`` and the
+Raw / Processed Data (an .xlsx file or Robyn's raw_data.csv). Every table
+whose inputs are present is computed; the rest are skipped.
+"""
+import glob
+import os
+
+import pandas as pd
+
+from attribution import aggregates, decomp, fit, ingest, models, optimization, ratios, taxonomy
+
+DECOMP_FILE = 'pareto_alldecomp_matrix.csv'
+AGGREGATED_FILE = 'pareto_aggregated.csv'
+RAW_DATA_FILE = 'raw_data.csv'
+REALLOCATED_SUFFIX = optimization.REALLOCATED_SUFFIX
+
+# KPI -> (response column, unit cost column, KPI column left out of the response)
+KPIS = {
+    'conversions': ('Conversions', 'Cost per Conversion', 'KPI_Website_Conversions'),
+    'visits': ('Visits', 'Cost per Visit', 'KPI_Website_Sessions'),
+}
+
+
+def find_inputs(folder):
+    """Paths of the pipeline inputs found in folder (None when missing) and the allocator's solID."""
+    def existing(name):
+        path = os.path.join(folder, name)
+        return path if os.path.isfile(path) else None
+
+    workbooks = sorted(p for p in glob.glob(os.path.join(folder, '*.xlsx')) if not os.path.basename(p).startswith('~$'))
+    reallocated = sorted(glob.glob(os.path.join(folder, f'*{REALLOCATED_SUFFIX}')))
+    return {
+        'decomp': existing(DECOMP_FILE),
+        'aggregated': existing(AGGREGATED_FILE),
+        'spends': workbooks[0] if workbooks else existing(RAW_DATA_FILE),
+        'reallocated': reallocated[0] if reallocated else None,
+        'solID': os.path.basename(reallocated[0])[:-len(REALLOCATED_SUFFIX)] if reallocated else None,
+        'reallocations': {os.path.basename(path)[:-len(REALLOCATED_SUFFIX)]: path for path in reallocated},
+    }
+
+
+def spend_tables(spends_file):
+    """Total spend by channel and by channel and creative."""
+    df = ingest.read_table(spends_file, copy=False)
+    return {
+        'spend_by_channel': taxonomy.aggregate(df, taxonomy.channel_groups(df.columns), 'Channel', 'Spend', coerce=True),
+        'spend_by_channel_creative': taxonomy.aggregate(
+            df, taxonomy.channel_creative_groups(df.columns), ['Channel', 'Creative'], 'Spend', coerce=True),
+    }
+
+
+def response_tables(decomp_file, solID, kpi='conversions'):
+    """Response of one model by channel and by channel and creative, rounded as in the page downloads."""
+    response_col, _, kpi_col = KPIS[kpi]
+    df = decomp.read_models(decomp_file, solID, columns=lambda col: 'spend' in col.lower())
+    if df.empty:
+        raise KeyError(f"solID {solID!r} not found in {decomp_file}")
+
+    by_channel = taxonomy.aggregate(
+        df, taxonomy.channel_groups(df.columns, exclude=[kpi_col]), 'Channel', response_col, coerce=True, sort=False)
+    by_creative = taxonomy.aggregate(
+        df, taxonomy.channel_creative_groups(df.columns, exclude=[kpi_col]), ['Channel', 'Creative'], response_col, coerce=True)
+    by_channel[response_col] = by_channel[response_col].round(0).astype(int)
+    by_creative[response_col] = by_creative[response_col].round(0).astype(int)
+    return {
+        f'{kpi}_by_channel': by_channel,
+        f'{kpi}_by_channel_creative': by_creative,
+    }
+
+
+def all_models_table(decomp_file, kpi='conversions'):
+    """Response by channel of every model (one row per solID)."""
+    _, _, kpi_col = KPIS[kpi]
+    index = decomp.load_partitioned(decomp_file)
+    return aggregates.channel_totals_all_models(index, exclude=kpi_col).reset_index()
+
+
+def model_ranking(aggregated_file):
+    """Models ranked by their max 'own_' channel CPA, as on the CPA page."""
+    return models.rank_by_max_cpa(models.max_channel_cpa(models.load_catalog(aggregated_file)))
+
+
+def run(folder, solID=None, kpi='conversions'):
+    """
+    Every result table of one Robyn output folder, by name.
+
+    The selected model is the allocator's solID when a reallocation file is
+    present, otherwise solID; without either the per-model tables are skipped.
+    """
+    inputs = find_inputs(folder)
+    solID = inputs['solID'] or solID
+    response_col, ratio_col, _ = KPIS[kpi]
+    tables = {}
+
+    if inputs['spends']:
+        tables.update(spend_tables(inputs['spends']))
+
+    if inputs['decomp']:
+        tables[f'{kpi}_by_channel_all_models'] = all_models_table(inputs['decomp'], kpi)
+        tables['fit_leaderboard'] = fit.leaderboard(inputs['decomp'])
+        if solID:
+            tables.update(response_tables(inputs['decomp'], solID, kpi))
+            if inputs['spends']:
+                tables[ratio_col.lower().replace(' ', '_')] = ratios.cost_table(
+                    tables['spend_by_channel'], tables[f'{kpi}_by_channel'], 'Spend', response_col, ratio_col)
+
+    if inputs['aggregated']:
+        tables['model_ranking'] = model_ranking(inputs['aggregated'])
+        ranking = models.pareto_ranking(models.load_catalog(inputs['aggregated']), models.DEFAULT_OBJECTIVES)
+        tables['model_pareto_fronts'] = ranking.dropna(subset=['Front'])
+        if solID:
+            index = decomp.load_partitioned(inputs['aggregated'])
+            if solID in index:
+                tables['effect_spend_share'] = models.effect_spend_share(index.get(solID))
+
+    if inputs['decomp'] and inputs['spends'] and inputs['reallocated'] and solID:
+        sources = (
+            optimization.load_conversions(inputs['decomp'], solID),
+            optimization.load_spends(inputs['spends']),
+            optimization.load_preprocessed(inputs['reallocated']),
+        )
+        budget_df, kpis = optimization.reallocation(*sources)
+        tables['optimization'] = budget_df
+        tables['optimization_kpis'] = pd.DataFrame([kpis])
+        tables['budget_scenarios'] = optimization.scenario_sweep(*sources)
+
+    if inputs['decomp'] and inputs['spends'] and len(inputs['reallocations']) > 1:
+        tables['reallocation_comparison'] = optimization.compare_reallocations(
+            inputs['decomp'], inputs['spends'], inputs['reallocations'])
+
+    return solID, tables
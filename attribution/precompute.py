@@ -0,0 +1,88 @@
+"""
+Background precomputation of the derived tables of an upload.
+
+As soon as a file is parsed, a page submits every table it offers (channel,
+creative, all-models views, ...) as one job. The tables are computed
+concurrently on a shared thread pool and stored in the parse cache, so
+switching tabs, toggles or pages picks up results that are already there.
+A page only waits for the tables it shows (``Job.result``) and picks up the
+others once ``Job.ready`` says they are there.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from attribution import ingest
+
+MAX_WORKERS = int(os.environ.get("ATTRIBUTION_WORKERS", min(8, (os.cpu_count() or 1) + 2)))
+MAX_JOBS = 32
+
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="precompute")
+
+_jobs = OrderedDict()
+_lock = threading.Lock()
+
+
+class Job:
+    """The derived tables of one upload, each computed in its own future."""
+
+    def __init__(self, futures):
+        self.futures = futures
+
+    def __len__(self):
+        return len(self.futures)
+
+    def completed(self):
+        return sum(future.done() for future in self.futures.values())
+
+    @property
+    def done(self):
+        return self.completed() == len(self.futures)
+
+    def failed(self):
+        """True when a table raised or was cancelled; such jobs are recomputed on resubmit."""
+        return any(
+            future.cancelled() or (future.done() and future.exception() is not None)
+            for future in self.futures.values()
+        )
+
+    def ready(self, name):
+        return self.futures[name].done()
+
+    def result(self, name, timeout=None):
+        """The table called name, waiting for it if it is still being computed."""
+        return self.futures[name].result(timeout)
+
+
+def _task_key(digest, name, compute):
+    # The producing function is part of the key, so a changed task never gets an old table back
+    return (digest, 'derived', name, getattr(compute, '__module__', None), getattr(compute, '__qualname__', None))
+
+
+def submit(file, tasks):
+    """
+    Compute tasks (name -> zero-argument callable) for file in the background.
+
+    Each table is cached in memory under the file digest, its name and the
+    task function, so resubmitting the same upload on a rerun returns the
+    running or finished job instead of starting the work again. Derived tables
+    are never written to the cache directory: they depend on the code that
+    produced them, not only on the file.
+    """
+    digest = ingest.CACHE.digest(file)
+    key = (digest, tuple(tasks))
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and not job.failed():
+            _jobs.move_to_end(key)
+            return job
+
+        futures = {
+            name: EXECUTOR.submit(ingest.CACHE.get_or_compute, _task_key(digest, name, compute), compute, persist=False)
+            for name, compute in tasks.items()
+        }
+        job = _jobs[key] = Job(futures)
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+        return job
@@ -0,0 +1,249 @@
+"""
+Lightweight timing and memory spans for page reruns.
+
+home.py opens a Run around every page rerun; inside it pages mark their
+steps with ``span('load')`` / ``span('transform')`` (or the ``timed``
+decorator) and exports are timed when the download is built. Time in the page
+outside those spans (widgets, Styler formatting, charts) is reported as
+'render'. Without an open Run every span is a no-op.
+
+Memory is measured with tracemalloc, only when a Run asks for it.
+tracemalloc is process-wide: it is started by the first Run that tracks
+memory and stopped when the last one finishes, and while several sessions
+track memory at once their peaks are process-wide (no span resets the peak
+under another). Finished runs are appended as JSON lines to LOG_PATH;
+``load_log`` reads them back for aggregation.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+ENABLED = os.environ.get("ATTRIBUTION_PROFILE", "").lower() in ("1", "true", "yes")
+LOG_DIR = os.environ.get("ATTRIBUTION_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "attribution")
+LOG_PATH = os.environ.get("ATTRIBUTION_PROFILE_LOG") or os.path.join(LOG_DIR, "profile.jsonl")
+
+STEPS = ['load', 'transform', 'render', 'export']
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+# Runs currently tracking memory, and whether one of them started tracemalloc
+_memory_lock = threading.Lock()
+_memory_runs = 0
+_started_tracing = False
+
+
+def _is_upload(value):
+    # Streamlit UploadedFile or another named in-memory buffer
+    return hasattr(value, 'getvalue') and hasattr(value, 'name')
+
+
+def _upload_digest(value):
+    # Uploads are identified by their content hash (memoized per upload by the parse cache)
+    if _is_upload(value):
+        from attribution import ingest
+        return ingest.CACHE.digest(value)
+    return None
+
+
+def _shape(value):
+    frame = getattr(value, 'frame', value)
+    if isinstance(frame, pd.DataFrame):
+        return frame.shape
+    if isinstance(value, tuple) and value and isinstance(value[0], pd.DataFrame):
+        return value[0].shape
+    return None
+
+
+class Run:
+    """The spans of one page rerun."""
+
+    def __init__(self, page, memory=False):
+        self.page = page
+        self.memory = memory
+        self.started = time.time()
+        self.seconds = None
+        self.peak_bytes = None
+        self.spans = []
+        self.files = []
+        self._clock = time.perf_counter()
+        # Running peak of the run and of every open span (innermost last)
+        self._peaks = [0]
+
+    def _tracing(self):
+        return self.memory and tracemalloc.is_tracing()
+
+    def _start_memory(self):
+        global _memory_runs, _started_tracing
+        if not self.memory:
+            return
+        with _memory_lock:
+            if _memory_runs == 0:
+                _started_tracing = not tracemalloc.is_tracing()
+                if _started_tracing:
+                    tracemalloc.start()
+            _memory_runs += 1
+
+    def _stop_memory(self):
+        global _memory_runs
+        if not self.memory:
+            return
+        with _memory_lock:
+            if tracemalloc.is_tracing():
+                self.peak_bytes = max(self._peaks[0], tracemalloc.get_traced_memory()[1])
+            _memory_runs -= 1
+            if _memory_runs == 0 and _started_tracing and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    def _reset_peak(self):
+        # Only a Run tracing alone may reset the process-wide peak
+        with _memory_lock:
+            if _memory_runs == 1:
+                tracemalloc.reset_peak()
+
+    @contextmanager
+    def span(self, name, **info):
+        record = {'name': name, 'depth': len(self._peaks) - 1,
+                  'offset': time.perf_counter() - self._clock, **info}
+        if self._tracing():
+            # Close the enclosing window, then measure this span from a fresh peak
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            self._reset_peak()
+        self._peaks.append(0)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            peak = self._peaks.pop()
+            if self._tracing():
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                record['peak_mb'] = peak / 1024 ** 2
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self.spans.append(record)
+
+    def add_file(self, digest):
+        if digest and digest not in self.files:
+            self.files.append(digest)
+
+    def steps(self):
+        """Seconds per step (top-level spans only); 'render' also gets the unmarked time."""
+        totals = dict.fromkeys(STEPS, 0.0)
+        for record in self.spans:
+            if record['depth'] == 0:
+                totals[record['name']] = totals.get(record['name'], 0.0) + record['seconds']
+        if self.seconds is not None:
+            totals['render'] += max(0.0, self.seconds - sum(totals.values()))
+        return totals
+
+    def table(self):
+        """The spans as a frame, in start order."""
+        columns = ['name', 'step', 'seconds', 'peak_mb', 'rows', 'columns', 'depth', 'offset']
+        # Memory saved by the dtype compaction of a parse, when one happened in this run
+        columns += [col for col in ('mb_before', 'mb_after') if any(col in record for record in self.spans)]
+        spans = pd.DataFrame(self.spans, columns=columns)
+        return spans.sort_values('offset').drop(columns='offset').reset_index(drop=True)
+
+    def to_record(self):
+        rows = [record['rows'] for record in self.spans if record.get('rows') is not None]
+        cols = [record['columns'] for record in self.spans if record.get('columns') is not None]
+        return {
+            'page': self.page,
+            'started': self.started,
+            'seconds': self.seconds,
+            'peak_mb': self.peak_bytes / 1024 ** 2 if self.peak_bytes is not None else None,
+            'files': self.files,
+            'rows': max(rows) if rows else None,
+            'columns': max(cols) if cols else None,
+            'steps': self.steps(),
+            'spans': self.spans,
+        }
+
+
+def current():
+    """The Run open on this thread (the page script's), or None."""
+    return getattr(_local, 'run', None)
+
+
+@contextmanager
+def run(page, memory=False, log=True, path=None):
+    """Open a Run for the duration of the block and log it when the block exits."""
+    previous = current()
+    active = Run(page, memory)
+    _local.run = active
+    active._start_memory()
+    try:
+        yield active
+    finally:
+        active.seconds = time.perf_counter() - active._clock
+        active._stop_memory()
+        _local.run = previous
+        if log:
+            write(active.to_record(), path)
+
+
+@contextmanager
+def span(name, file=None, **info):
+    """Time a step of the current Run (file: the upload(s) it reads); a no-op when there is none."""
+    active = current()
+    if active is None:
+        yield None
+        return
+    for upload in file if isinstance(file, (list, tuple)) else [file]:
+        if upload is not None:
+            active.add_file(_upload_digest(upload))
+    with active.span(name, **info) as record:
+        yield record
+
+
+def note(record, value):
+    """Store the rows / columns of a loaded or computed table on a span record."""
+    shape = _shape(value)
+    if record is not None and shape is not None:
+        record['rows'], record['columns'] = shape
+
+
+def timed(name):
+    """Decorator: run the function inside span(name), noting its upload arguments and result shape."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            uploads = [arg for arg in args if _is_upload(arg)]
+            with span(name, file=uploads, step=func.__name__) as record:
+                result = func(*args, **kwargs)
+                note(record, result)
+                return result
+        return wrapper
+    return decorator
+
+
+def write(record, path=None):
+    """Append one record to the JSON-lines log; logging never breaks a page."""
+    path = path or LOG_PATH
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        line = json.dumps(record, default=str)
+        with _log_lock, open(path, 'a') as fh:
+            fh.write(line + '\n')
+    except OSError:
+        pass
+
+
+def load_log(path=None):
+    """The logged runs as a frame, one row per run with a column per step."""
+    path = path or LOG_PATH
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with open(path) as fh:
+        records = [json.loads(line) for line in fh if line.strip()]
+    df = pd.json_normalize(records)
+    df.columns = [col.replace('steps.', '') for col in df.columns]
+    return df.drop(columns=['spans'], errors='ignore')
@@ -0,0 +1,110 @@
+"""
+Unit-cost helpers (cost per visit, cost per conversion) shared by the CPV and
+cost-per-conversion pages: row ratios, per-channel subtotals and grand totals,
+and the merged tables those pages show (cost_table, creative_cost_table,
+calculate_cpv).
+"""
+import numpy as np
+import pandas as pd
+
+
+def unit_cost(cost, units, decimals=2):
+    """cost / units for every row, rounded; 0 where there are no units."""
+    cost = np.asarray(cost, dtype=float)
+    units = np.asarray(units, dtype=float)
+    ratio = np.zeros(np.broadcast(cost, units).shape)
+    np.divide(cost, units, out=ratio, where=units > 0)
+    return ratio.round(decimals)
+
+
+def subtotals(df, by, cost_col, unit_col, ratio_col, sort=True):
+    """Cost and unit totals per group with their unit cost, in one grouped pass."""
+    totals = df.groupby(by, as_index=False, sort=sort)[[cost_col, unit_col]].sum()
+    totals[ratio_col] = unit_cost(totals[cost_col], totals[unit_col])
+    return totals
+
+
+def grand_total(df, cost_col, unit_col, ratio_col, **labels):
+    """One-row frame with the overall totals and unit cost; labels fill the key columns."""
+    cost = df[cost_col].sum()
+    units = df[unit_col].sum()
+    return pd.DataFrame([{**labels, cost_col: cost, unit_col: units, ratio_col: unit_cost(cost, units).item()}])
+
+
+def cost_table(cost_df, units_df, cost_col, unit_col, ratio_col, key='Channel'):
+    """
+    Cost and units merged on key with their unit cost, cheapest first, and a
+    TOTAL row at the end.
+    """
+    merged_df = pd.merge(cost_df, units_df, on=key, how="inner")
+    merged_df[cost_col] = pd.to_numeric(merged_df[cost_col], errors='coerce').fillna(0)
+    merged_df[unit_col] = pd.to_numeric(merged_df[unit_col], errors='coerce').fillna(0)
+    merged_df[ratio_col] = unit_cost(merged_df[cost_col], merged_df[unit_col])
+
+    total_row = grand_total(merged_df, cost_col, unit_col, ratio_col, **{key: 'TOTAL'})
+    return pd.concat([merged_df.sort_values(by=ratio_col), total_row], ignore_index=True)
+
+
+def standardize_names(df):
+    """Lower-case, stripped Channel / Creative names for consistent matching."""
+    if 'Channel' in df.columns:
+        df['Channel'] = df['Channel'].str.lower().str.strip()
+    if 'Creative' in df.columns:
+        df['Creative'] = df['Creative'].str.lower().str.strip()
+    return df
+
+
+def creative_cost_table(cost_df, units_df, cost_col, unit_col, ratio_col):
+    """
+    Cost and units merged per channel and creative (names matched
+    case-insensitively) with their unit cost, then a 'Total' creative row per
+    channel and a grand Total row.
+    """
+    # Copies: the names of the inputs are standardized in place
+    cost_df = standardize_names(cost_df.copy())
+    units_df = standardize_names(units_df.copy())
+
+    merged_df = pd.merge(cost_df, units_df, on=['Channel', 'Creative'], how="outer")
+    merged_df[cost_col] = pd.to_numeric(merged_df[cost_col], errors='coerce').fillna(0)
+    merged_df[unit_col] = pd.to_numeric(merged_df[unit_col], errors='coerce').fillna(0)
+    merged_df[ratio_col] = unit_cost(merged_df[cost_col], merged_df[unit_col])
+
+    channel_totals = subtotals(merged_df, 'Channel', cost_col, unit_col, ratio_col, sort=False)
+    channel_totals['Channel'] = channel_totals['Channel'].str.title()
+    channel_totals.insert(1, 'Creative', 'Total')
+
+    overall_total = grand_total(merged_df, cost_col, unit_col, ratio_col, Channel='Total', Creative='-')
+    return pd.concat([merged_df, channel_totals, overall_total], ignore_index=True)
+
+
+def calculate_cpv(spend_df, visits_df, by_creative=False):
+    """
+    Spend and visits merged per channel (and creative) with the cost per
+    visit, channel subtotals when by_creative, and a grand Total row.
+    """
+    # Standardize column names first
+    spend_df = spend_df.rename(columns={'Creation': 'Spend', 'Vista': 'Visits'})
+    visits_df = visits_df.rename(columns={'Speed': 'Visits', 'Vista': 'Visits'})
+
+    spend_df = standardize_names(spend_df)
+    visits_df = standardize_names(visits_df)
+
+    merge_cols = ['Channel'] if not by_creative else ['Channel', 'Creative']
+    merged = pd.merge(spend_df, visits_df, on=merge_cols, how='outer').fillna(0)
+    merged['CPV'] = unit_cost(merged['Spend'], merged['Visits'])
+
+    # Capitalize first letters for presentation
+    merged['Channel'] = merged['Channel'].str.title()
+    if 'Creative' in merged.columns:
+        merged['Creative'] = merged['Creative'].str.title()
+
+    if by_creative:
+        channel_totals = subtotals(merged, 'Channel', 'Spend', 'Visits', 'CPV')
+        channel_totals['Creative'] = 'Total'
+        total = grand_total(merged, 'Spend', 'Visits', 'CPV', Channel='Total', Creative='-')
+        final_df = pd.concat([merged, channel_totals, total], ignore_index=True)
+    else:
+        total = grand_total(merged, 'Spend', 'Visits', 'CPV', Channel='Total')
+        final_df = pd.concat([merged, total], ignore_index=True)
+
+    return final_df.sort_values(by='Channel')
@@ -0,0 +1,162 @@
+"""
+Synthetic Robyn output for benchmarks and demos.
+
+Generates the four inputs of the pipeline with realistic names and shapes:
+pareto_alldecomp_matrix, pareto_aggregated, the allocator's reallocation CSV
+and the Processed Data workbook. Variables are named
+``Channel_Creative_N_Spend`` with N the adstock suffix (as in the real files),
+so every page and attribution.pipeline accept them.
+
+    python -m attribution.synthetic OUT_DIR --models 2000 --dates 365
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CHANNELS = ['Meta', 'Google', 'TikTok', 'Snap', 'YouTube', 'Display', 'Pinterest', 'Reddit', 'LinkedIn', 'Twitter']
+CREATIVES = ['Video', 'Static', 'Carousel', 'Search', 'Banner', 'Stories', 'Reels', 'Shopping']
+BASELINE_VARS = ['(Intercept)', 'trend', 'season', 'holiday']
+KPI_COLUMN = 'KPI_Website_Conversions'
+
+
+def _names(pool, n, prefix):
+    return [pool[i] if i < len(pool) else f'{prefix}{i + 1}' for i in range(n)]
+
+
+def variable_names(channels=4, creatives=2, adstocks=1, metric='Spend'):
+    """Channel_Creative_N_Metric names, N running over the adstock suffixes (omitted when adstocks is 0)."""
+    names = []
+    for channel in _names(CHANNELS, channels, 'Channel'):
+        for creative in _names(CREATIVES, creatives, 'Creative'):
+            if adstocks:
+                names.extend(f'{channel}_{creative}_{n}_{metric}' for n in range(1, adstocks + 1))
+            else:
+                names.append(f'{channel}_{creative}_{metric}')
+    return names
+
+
+def model_ids(models):
+    """Robyn-style solIDs: <trial>_<iteration>_<index>."""
+    return [f'{1 + i // 500}_{100 + (i // 10) % 50}_{1 + i % 10}' for i in range(models)]
+
+
+def dates(n, freq='D', start='2022-01-03'):
+    return pd.date_range(start, periods=n, freq=freq)
+
+
+def decomp_matrix(models=100, n_dates=365, channels=4, creatives=2, adstocks=1, seed=0):
+    """One row per model and date: dep_var, depVarHat, the baseline terms and the decomposed media variables."""
+    rng = np.random.default_rng(seed)
+    media = variable_names(channels, creatives, adstocks)
+    n = models * n_dates
+
+    df = pd.DataFrame({
+        'ds': np.tile(dates(n_dates).strftime('%Y-%m-%d'), models),
+        'dep_var': np.tile(rng.gamma(20, 50, n_dates), models).round(2),
+    })
+    for name in BASELINE_VARS:
+        df[name] = rng.normal(100, 20, n)
+    contributions = rng.gamma(1.5, 10, (n, len(media))) * (rng.random((models, len(media))) > 0.1).repeat(n_dates, axis=0)
+    df[media] = contributions
+    df[KPI_COLUMN] = 0.0
+    df['solID'] = np.repeat(model_ids(models), n_dates)
+    df['depVarHat'] = df['dep_var'] * rng.normal(1, 0.08, n)
+    return df
+
+
+def aggregated(models=100, channels=4, creatives=2, adstocks=1, seed=0):
+    """pareto_aggregated: one row per model and variable (paid media as own_ variables) with the model metrics."""
+    rng = np.random.default_rng(seed)
+    rn = BASELINE_VARS + ['own_' + name for name in variable_names(channels, creatives, adstocks)]
+    n_vars = len(rn)
+    n = models * n_vars
+
+    media = np.tile(np.arange(n_vars) >= len(BASELINE_VARS), models)
+    spend = np.where(media, rng.gamma(2, 5000, n), 0)
+    effect = rng.gamma(2, 800, n)
+    coef = rng.gamma(2, 0.5, n) * (rng.random(n) > 0.08)
+    effect = np.where(coef > 0, effect, 0)
+
+    df = pd.DataFrame({
+        'solID': np.repeat(model_ids(models), n_vars),
+        'rn': np.tile(rn, models),
+        'coef': coef,
+        'xDecompAgg': effect,
+        'total_spend': spend,
+        'mean_spend': spend / 52,
+    })
+    model = np.repeat(np.arange(models), n_vars)
+    spend_total = np.bincount(model, weights=spend, minlength=models)[model]
+    effect_total = np.bincount(model, weights=np.where(media, effect, 0), minlength=models)[model]
+    df['spend_share'] = np.divide(spend, spend_total, out=np.zeros(n), where=spend_total > 0)
+    df['effect_share'] = np.where(media, np.divide(effect, effect_total, out=np.zeros(n), where=effect_total > 0), 0)
+    for metric, low, high in [('rsq_train', 0.6, 0.95), ('rsq_val', 0.4, 0.9), ('rsq_test', 0.4, 0.9),
+                              ('nrmse', 0.05, 0.3), ('decomp.rssd', 0.01, 0.4), ('mape', 0, 0)]:
+        df[metric] = np.repeat(rng.uniform(low, high, models), n_vars)
+    return df
+
+
+def reallocation(solID, channels=4, creatives=2, adstocks=1, periods=52, seed=0):
+    """The allocator's reallocation CSV of one model: per-period spend and response, initial and optimized."""
+    rng = np.random.default_rng(seed)
+    names = variable_names(channels, creatives, adstocks)
+    n = len(names)
+    init_spend = rng.gamma(2, 500, n)
+    optm_spend = init_spend * rng.uniform(0.7, 1.3, n)
+    init_response = init_spend / rng.uniform(5, 40, n)
+    optm_response = init_response * (optm_spend / init_spend) ** rng.uniform(0.3, 0.8, n)
+    return pd.DataFrame({
+        'solID': solID,
+        'channels': names,
+        'initSpendUnit': init_spend,
+        'optmSpendUnit': optm_spend,
+        'initResponseUnit': init_response,
+        'optmResponseUnit': optm_response,
+        'initResponseTotal': init_response.sum() * periods,
+        'optmResponseTotal': optm_response.sum() * periods,
+        'periods': f'{periods} weeks',
+    })
+
+
+def processed_data(n_dates=365, channels=4, creatives=2, adstocks=1, seed=0):
+    """Processed Data: a Date column and the spend and impression variables."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'Date': dates(n_dates)})
+    spend = variable_names(channels, creatives, adstocks)
+    impressions = variable_names(channels, creatives, adstocks, metric='Impressions')
+    df[spend] = rng.gamma(2, 250, (n_dates, len(spend))).round(2)
+    df[impressions] = rng.poisson(20000, (n_dates, len(impressions)))
+    df[KPI_COLUMN] = rng.poisson(300, n_dates)
+    return df
+
+
+def write_run(folder, models=100, n_dates=365, channels=4, creatives=2, adstocks=1, seed=0):
+    """Write a complete Robyn output folder (the layout attribution.pipeline reads); returns its solIDs."""
+    os.makedirs(folder, exist_ok=True)
+    shape = dict(channels=channels, creatives=creatives, adstocks=adstocks, seed=seed)
+    decomp_matrix(models, n_dates, **shape).to_csv(os.path.join(folder, 'pareto_alldecomp_matrix.csv'), index=False)
+    aggregated(models, **shape).to_csv(os.path.join(folder, 'pareto_aggregated.csv'), index=False)
+    processed_data(n_dates, **shape).to_excel(os.path.join(folder, 'Processed Data.xlsx'), index=False)
+    solIDs = model_ids(models)
+    if solIDs:
+        reallocation(solIDs[0], **shape).to_csv(os.path.join(folder, f'{solIDs[0]}_reallocated.csv'), index=False)
+    return solIDs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m attribution.synthetic', description="Write a synthetic Robyn output folder.")
+    parser.add_argument('out', help="folder to write")
+    parser.add_argument('--models', type=int, default=100)
+    parser.add_argument('--dates', type=int, default=365)
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--creatives', type=int, default=2)
+    parser.add_argument('--adstocks', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    write_run(args.out, args.models, args.dates, args.channels, args.creatives, args.adstocks, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Column-name taxonomy for Processed Data and decomposition files.
+
+Robyn variable names follow ``Channel_Creative[_Placement...][_N]_Metric``
+(e.g. ``Meta_Video_Awareness_2_Spend``). Each name is parsed once into a
+ColumnRecord, and pages aggregate through column -> group mappings built from
+those records instead of re-running regexes for every consolidated name.
+
+Grouping rules: ``[_-]N`` adstock suffixes are dropped, a leading ``N_``
+prefix is dropped (``1_Meta_Video_Spend`` counts under Meta, on the channel
+pages as well as the creative pages), only the last metric token is the metric
+(``Google_Search_Clicks_Spend`` shows as creative Search_Clicks) and digits inside
+the creative are dropped (Banner1 -> Banner).
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import pandas as pd
+
+ColumnRecord = namedtuple('ColumnRecord', ['name', 'channel', 'creative', 'placement', 'metric', 'adstock'])
+
+ADSTOCK_RE = re.compile(r'[_-](\d+)')
+PREFIX_RE = re.compile(r'^\d+_')
+CHANNEL_RE = re.compile(r'[A-Za-z]+')
+METRIC_RE = re.compile(r'_(Spend|Impressions|Clicks|Sessions|Visits|Conversions)(?=_|$)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def parse_column(name):
+    """Parse a single column name into a ColumnRecord."""
+    adstock = ADSTOCK_RE.findall(name)
+    stem = PREFIX_RE.sub('', ADSTOCK_RE.sub('', name))
+
+    # Only the last metric token is the metric; earlier ones belong to the creative
+    metric = None
+    for metric in METRIC_RE.finditer(stem):
+        pass
+    if metric:
+        stem = stem[:metric.start()] + stem[metric.end():]
+
+    channel = CHANNEL_RE.match(stem)
+    creative = placement = None
+    if channel and stem[channel.end():channel.end() + 1] == '_':
+        # Numeric identifiers inside the creative part (Banner1 -> Banner) are not part of the name
+        rest = stem[channel.end() + 1:]
+        parts = (re.sub(r'\d+', '', rest) if rest else 'General').split('_')
+        creative = parts[0]
+        placement = '_'.join(parts[1:]) if len(parts) > 1 else None
+
+    return ColumnRecord(
+        name=name,
+        channel=channel.group() if channel else None,
+        creative=creative,
+        placement=placement,
+        metric=metric.group(1).title() if metric else None,
+        adstock=int(adstock[-1]) if adstock else None,
+    )
+
+
+def creative_label(record):
+    """Creative name as shown in the pages: creative and placement joined."""
+    if record.placement is None:
+        return record.creative
+    return f"{record.creative}_{record.placement}"
+
+
+@lru_cache(maxsize=32)
+def _records(columns, contains, exclude):
+    word = contains.lower() if contains else ''
+    return tuple(
+        parse_column(col) for col in columns
+        if isinstance(col, str) and word in col.lower() and col not in exclude
+    )
+
+
+def records(columns, contains='spend', exclude=()):
+    """Parsed records for the columns whose name contains `contains` (case-insensitive)."""
+    return _records(tuple(columns), contains, tuple(exclude))
+
+
+def channel_groups(columns, contains='spend', exclude=()):
+    """Map column -> channel."""
+    return {rec.name: rec.channel for rec in records(columns, contains, exclude) if rec.channel}
+
+
+def channel_creative_groups(columns, contains='spend', exclude=()):
+    """Map column -> (channel, creative) for columns that carry a creative."""
+    return {
+        rec.name: (rec.channel, creative_label(rec))
+        for rec in records(columns, contains, exclude)
+        if rec.creative is not None
+    }
+
+
+def aggregate(df, mapping, names, value_name, coerce=False, sort=True):
+    """
+    Sum the mapped columns of df per group in one pass.
+
+    mapping is column -> group label (a tuple when grouping on several names);
+    the result has one row per group with the names and value_name columns.
+    """
+    columns = list(mapping)
+    if isinstance(names, str):
+        names = [names]
+    if not columns:
+        return pd.DataFrame(columns=names + [value_name])
+
+    values = df[columns]
+    if coerce:
+        # float32 (compacted) columns are summed in float64
+        values = values.apply(pd.to_numeric, errors='coerce').astype(float)
+
+    labels = [mapping[col] if isinstance(mapping[col], tuple) else (mapping[col],) for col in columns]
+    totals = pd.DataFrame(labels, columns=names)
+    totals[value_name] = values.sum().to_numpy()
+    return totals.groupby(names, as_index=False, sort=sort)[value_name].sum()
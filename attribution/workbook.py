@@ -0,0 +1,72 @@
+"""
+Streaming scanners for .xlsx uploads.
+
+The config generators only need the header row (variable lists) or a single
+column (the Date window) of the Processed Data workbook. These helpers read
+the first sheet with openpyxl in read-only mode and stop at what they need,
+instead of parsing the whole workbook into a DataFrame.
+"""
+from io import BytesIO
+
+import pandas as pd
+
+from attribution import ingest
+
+
+def _rows(file, **bounds):
+    """Yield the value tuples of the first sheet, closing the workbook afterwards."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(BytesIO(ingest.file_bytes(file)), read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True, **bounds)
+    finally:
+        wb.close()
+
+
+def _column_names(row):
+    # Same naming as pd.read_excel: blank headers become "Unnamed: i", repeats get ".1", ".2", ...
+    row = list(row)
+    while row and row[-1] is None:
+        row.pop()
+    names, seen = [], {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def header(file):
+    """Column names of the first sheet, reading only the first row."""
+    def scan():
+        for row in _rows(file):
+            return _column_names(row)
+        return []
+    return ingest.cached(file, 'xlsx_header', scan)
+
+
+def column(file, name):
+    """A single column of the first sheet as a Series, streaming over the rows."""
+    names = header(file)
+    if name not in names:
+        raise KeyError(name)
+    position = names.index(name)
+
+    def scan():
+        rows = _rows(file, min_row=2, min_col=position + 1, max_col=position + 1)
+        values = [row[0] if row else None for row in rows]
+        # Trailing blank rows are not part of the data
+        while values and values[-1] is None:
+            values.pop()
+        return pd.Series(values, name=name, dtype=object)
+    return ingest.cached(file, ('xlsx_column', name), scan).copy()
+
+
+def preview(file, nrows=5):
+    """The first rows of the first sheet, parsed without reading the rest."""
+    return ingest.read_excel(file, nrows=nrows)
@@ -0,0 +1,46 @@
+"""
+Compare two benchmark reports written by benchmarks/run.py.
+
+    python benchmarks/compare.py before.json after.json
+
+Prints the best time and peak memory of every case found in both reports,
+with the after / before ratio (below 1 is faster or leaner).
+"""
+import argparse
+import json
+
+import pandas as pd
+
+KEY = ['size', 'case']
+
+
+def load(path):
+    with open(path) as fh:
+        report = json.load(fh)
+    return report, pd.DataFrame(report['results'])
+
+
+def compare(before, after):
+    merged = pd.merge(before[KEY + ['best_s', 'peak_mb']], after[KEY + ['best_s', 'peak_mb']],
+                      on=KEY, suffixes=('_before', '_after'))
+    merged['time_ratio'] = merged['best_s_after'] / merged['best_s_before']
+    merged['memory_ratio'] = merged['peak_mb_after'] / merged['peak_mb_before']
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports.")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    args = parser.parse_args(argv)
+
+    before_report, before = load(args.before)
+    after_report, after = load(args.after)
+    print(f"before: {before_report.get('revision')} ({before_report.get('created')})")
+    print(f"after:  {after_report.get('revision')} ({after_report.get('created')})")
+    with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.float_format', '{:.4g}'.format):
+        print(compare(before, after).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
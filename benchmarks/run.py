@@ -0,0 +1,188 @@
+"""
+Benchmarks of the core computation of the pages on synthetic Robyn output.
+
+    python benchmarks/run.py --sizes small medium --out bench.json
+
+Every case is timed over several repeats (best and median wall time) and
+profiled once with tracemalloc for its peak allocation (Python objects and
+NumPy buffers; the C CSV parser's scratch memory is not traced). File-reading cases
+start from an empty parse cache, so they include parsing. Results are written
+as JSON; compare two runs with benchmarks/compare.py.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from attribution import (aggregates, columns, decomp, dtypes, fit, ingest, models, optimization, ratios,
+                         synthetic, taxonomy)
+
+SIZES = {
+    'small': dict(models=50, n_dates=104, channels=4, creatives=2, adstocks=1),
+    'medium': dict(models=500, n_dates=365, channels=6, creatives=3, adstocks=2),
+    'large': dict(models=2000, n_dates=365, channels=8, creatives=3, adstocks=3),
+}
+
+
+def upload(df, name, excel=False):
+    """An in-memory upload of df, like Streamlit's UploadedFile."""
+    buffer = BytesIO()
+    if excel:
+        df.to_excel(buffer, index=False)
+    else:
+        df.to_csv(buffer, index=False)
+    buffer.name = name
+    buffer.seek(0)
+    return buffer
+
+
+def make_inputs(size):
+    shape = {k: v for k, v in size.items() if k not in ('models', 'n_dates')}
+    decomp_df = synthetic.decomp_matrix(size['models'], size['n_dates'], **shape)
+    aggregated_df = synthetic.aggregated(size['models'], **shape)
+    spends_df = synthetic.processed_data(size['n_dates'], **shape)
+    solID = synthetic.model_ids(size['models'])[0]
+    return {
+        'solID': solID,
+        'raw_decomp_df': decomp_df,
+        # The in-memory cases get the frames the pages get: compacted by the parse cache
+        'decomp_df': dtypes.compact(decomp_df),
+        'aggregated_df': dtypes.compact(aggregated_df),
+        'spends_df': spends_df,
+        'decomp_file': upload(decomp_df, 'pareto_alldecomp_matrix.csv'),
+        'aggregated_file': upload(aggregated_df, 'pareto_aggregated.csv'),
+        'spends_file': upload(spends_df, 'Processed Data.xlsx', excel=True),
+        'reallocated_file': upload(synthetic.reallocation(solID, **shape), f'{solID}_reallocated.csv'),
+    }
+
+
+def cases(data):
+    """name -> (callable, reads files); each callable runs one page's core step."""
+    spends_df, decomp_df, aggregated_df = data['spends_df'], data['decomp_df'], data['aggregated_df']
+    index = decomp.SolIDIndex(decomp_df)
+    model_df = index.get(data['solID'])
+    catalog = models.catalog(aggregated_df)
+    scores = models.ModelScores(catalog)
+    spend_by_channel = taxonomy.aggregate(spends_df, taxonomy.channel_groups(spends_df.columns), 'Channel', 'Spend')
+    conversions = aggregates.channel_totals(model_df, 'Conversions', exclude=aggregates.CONVERSIONS_KPI)
+    conversions = conversions[conversions['Channel'] != 'Total']
+    sources = (optimization.load_conversions(data['decomp_file'], data['solID']),
+               optimization.load_spends(data['spends_file']),
+               optimization.load_preprocessed(data['reallocated_file']))
+
+    return {
+        'compact_dtypes': (lambda: dtypes.compact(data['raw_decomp_df']), False),
+        'consolidate_columns': (lambda: columns.consolidate_columns(spends_df.columns), False),
+        'aggregate_spend_by_channel': (lambda: taxonomy.aggregate(
+            spends_df, taxonomy.channel_groups(spends_df.columns), 'Channel', 'Spend'), False),
+        'aggregate_spend_by_channel_and_creative': (lambda: taxonomy.aggregate(
+            spends_df, taxonomy.channel_creative_groups(spends_df.columns), ['Channel', 'Creative'], 'Spend'), False),
+        'load_partitioned': (lambda: decomp.load_partitioned(data['decomp_file']), True),
+        'read_models': (lambda: decomp.read_models(data['decomp_file'], data['solID']), True),
+        'aggregate_website_conversions': (lambda: aggregates.channel_totals(
+            model_df, 'Conversions', exclude=aggregates.CONVERSIONS_KPI), False),
+        'aggregate_website_visits_by_creative': (lambda: aggregates.group_totals(model_df), False),
+        'aggregate_all_models': (lambda: aggregates.channel_totals_all_models(index), False),
+        'clean_and_merge': (lambda: ratios.cost_table(
+            spend_by_channel, conversions, 'Spend', 'Conversions', 'Cost per Conversion'), False),
+        'model_catalog': (lambda: models.catalog(aggregated_df), False),
+        'calculate_max_channel_cpa': (lambda: models.max_channel_cpa(models.catalog(aggregated_df)), False),
+        'own_zero_summary': (lambda: models.own_zero_summary(models.catalog(aggregated_df)), False),
+        'submodel_tables': (lambda: models.submodel_tables(models.catalog(aggregated_df)), False),
+        'pareto_fronts': (lambda: models.pareto_fronts(catalog, models.DEFAULT_OBJECTIVES, max_fronts=5), False),
+        'score_top_k': (lambda: scores.top(models.SCORE_WEIGHTS, 20), False),
+        'effect_spend_share': (lambda: models.effect_spend_share(aggregated_df[aggregated_df['solID'] == data['solID']]), False),
+        'fit_leaderboard': (lambda: fit.leaderboard(data['decomp_file']), True),
+        'load_preprocessed': (lambda: optimization.load_preprocessed(data['reallocated_file']), True),
+        'optimization': (lambda: optimization.reallocation(
+            optimization.load_conversions(data['decomp_file'], data['solID']),
+            optimization.load_spends(data['spends_file']),
+            optimization.load_preprocessed(data['reallocated_file'])), True),
+        'scenario_sweep': (lambda: optimization.scenario_sweep(*sources, factors=np.linspace(0.5, 2.0, 1000)), False),
+    }
+
+
+def measure(func, reads_files, repeat):
+    timings = []
+    for _ in range(repeat):
+        if reads_files:
+            ingest.CACHE.clear()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    if reads_files:
+        ingest.CACHE.clear()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'best_s': min(timings),
+        'median_s': statistics.median(timings),
+        'repeat': repeat,
+        'peak_mb': peak / 1024 ** 2,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(sizes, repeat=5, only=None):
+    results = []
+    for size_name in sizes:
+        size = SIZES[size_name]
+        data = make_inputs(size)
+        for name, (func, reads_files) in cases(data).items():
+            if only and name not in only:
+                continue
+            result = {'case': name, 'size': size_name, **size,
+                      'decomp_rows': len(data['decomp_df']), 'aggregated_rows': len(data['aggregated_df'])}
+            result.update(measure(func, reads_files, repeat))
+            results.append(result)
+            print(f"{size_name:>6} {name:<40} {result['best_s'] * 1000:10.1f} ms {result['peak_mb']:10.1f} MB", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the core functions of the pages on synthetic data.")
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--case', nargs='+', help="only run these cases")
+    parser.add_argument('--out', default='bench.json', help="JSON file the results are written to (default: bench.json)")
+    args = parser.parse_args(argv)
+
+    report = {
+        'revision': git_revision(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': run(args.sizes, args.repeat, args.case),
+    }
+    with open(args.out, 'w') as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {len(report['results'])} results to {args.out}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import streamlit as st
 from pathlib import Path
 from st_pages import add_page_title, get_nav_from_toml
+from attribution import profiling
 
 
 st.set_page_config(page_title="Attribution Multipage App", layout='wide')
@@ -15,7 +16,22 @@ pg = st.navigation(nav)
 
 add_page_title(pg)
 
-pg.run()
-
-
-
+def performance_panel(run):
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        peak_mb = run.to_record()['peak_mb']
+        st.caption(f"Rerun: {run.seconds:.2f}s" + (f" · peak {peak_mb:.1f} MB" if peak_mb is not None else ""))
+        st.bar_chart({step: [seconds] for step, seconds in run.steps().items()}, horizontal=True, height=160)
+        if run.spans:
+            st.dataframe(run.table(), hide_index=True, use_container_width=True)
+        st.caption(f"Logged to `{profiling.LOG_PATH}`")
+
+# Optional timing / memory instrumentation of the page rerun
+profile = st.sidebar.toggle("Performance panel", value=profiling.ENABLED, key="performance_panel")
+track_memory = profile and st.sidebar.checkbox("Track memory (slower)", key="performance_memory")
+
+if profile:
+    with profiling.run(pg.title, memory=track_memory) as run:
+        pg.run()
+    performance_panel(run)
+else:
+    pg.run()
@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import matplotlib.pyplot as plt
-import io
+from attribution import charts, decomp, exports, ingest, profiling
 
 # Streamlit App Title
 st.title("Actual vs Predicted Values")
@@ -11,49 +9,31 @@ st.title("Actual vs Predicted Values")
 uploaded_file = st.file_uploader("Upload the pareto_alldecomp_matrix.csv file", type=["csv"])
 
 if uploaded_file is not None:
-    # Load the dataset
-    df = pd.read_csv(uploaded_file)
-    df['ds'] = pd.to_datetime(df['ds'])  # Ensure ds column is datetime
-
-    # User input for selecting solID
-    solID_list = df['solID'].unique()
+    # User input for selecting solID (only the solID column is parsed for the list)
+    with profiling.span('load', file=uploaded_file, step='read_model_ids'):
+        solID_list = decomp.read_model_ids(uploaded_file)
     selected_solID = st.selectbox("Select Model Number (solID):", solID_list)
 
-    # Filter data for the selected solID
-    filtered_df = df[df['solID'] == selected_solID]
-
-    # Reshape data for Plotly (long format) and rename legend values
-    melted_df = filtered_df.melt(id_vars=['ds'], value_vars=['dep_var', 'depVarHat'],
-                                 var_name='Type', value_name='Value')
-    melted_df['Type'] = melted_df['Type'].replace({'dep_var': 'Actual', 'depVarHat': 'Predicted'})
-
-    # Create a Plotly line chart with markers
+    # Figures are cached per solID: only the selected model and the plotted columns are
+    # loaded, and long series are downsampled (LTTB) and drawn with WebGL traces
     plot_title = f"Actual vs Predicted for Model {selected_solID}"
-    fig = px.line(melted_df, x='ds', y='Value', color='Type',
-                  labels={'ds': 'Date', 'Value': 'Values', 'Type': 'Legend'},
-                  title=plot_title, markers=True)
+    figure_key = (ingest.CACHE.digest(uploaded_file), selected_solID)
+
+    def build_figure():
+        with profiling.span('load', step='read_models') as record:
+            filtered_df = decomp.read_models(uploaded_file, selected_solID, columns=['ds', 'dep_var', 'depVarHat'], copy=False)
+            profiling.note(record, filtered_df)
+        filtered_df = filtered_df.assign(ds=pd.to_datetime(filtered_df['ds']))
+        return charts.actual_vs_predicted(filtered_df, plot_title)
 
-    # Update layout for better visualization
-    fig.update_layout(xaxis_title="Date", yaxis_title="Values",
-                      xaxis_tickangle=-45)
+    fig = ingest.CACHE.get_or_compute(figure_key + ('actual_vs_predicted',), build_figure)
 
     # Display the plot
     st.plotly_chart(fig)
     
-    # Save the figure using Matplotlib
+    # The PNG is exported from the cached figure (kaleido) only when the user downloads it
     file_name = f"{plot_title}.png".replace(" ", "_")
-    img_bytes = io.BytesIO()
-    plt.figure(figsize=(10, 5))
-    for label, data in melted_df.groupby("Type"):
-        plt.plot(data["ds"], data["Value"], marker='o', label=label)
-    plt.xlabel("Date")
-    plt.ylabel("Values")
-    plt.title(plot_title)
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.tight_layout()
-    plt.savefig(img_bytes, format="png")
-    img_bytes.seek(0)
+    img_bytes = exports.deferred(charts.to_png, fig, key=figure_key)
     
     # Provide download button
     st.download_button(label="Download Plot", 
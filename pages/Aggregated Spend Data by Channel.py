@@ -1,45 +1,21 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import columns, exports, ingest, profiling, taxonomy
 from io import BytesIO
 
+@profiling.timed('transform')
 def consolidate_spend_columns(df):
-    # Filter columns that contain "spend"
-    spend_columns = [col for col in df.columns if "spend" in col.lower()]
-    
-    consolidated_columns = []
-    seen_columns = set()
-    ordered_unique_columns = []
-
-    # Consolidate column names
-    for col in spend_columns:
-        new_col = re.sub(r'([_-]\d+)', '', col)
-        consolidated_columns.append(new_col)
-
-        if new_col not in seen_columns:
-            ordered_unique_columns.append(new_col)
-            seen_columns.add(new_col)
-
-    consolidated_df = pd.DataFrame({
-        'Original Column Name': spend_columns,
-        'Consolidated Column Name': consolidated_columns
-    })
-
-    unique_columns_df = pd.DataFrame({'Consolidated Column Names': ordered_unique_columns})
-    return consolidated_df, unique_columns_df
+    # Consolidate the spend column names by dropping the adstock numbers
+    return columns.consolidate_columns(df.columns, columns.ADSTOCK_PATTERN)
 
+@profiling.timed('transform')
 def aggregate_spend_by_channel(df, consolidated_df):
-    spend_data = []
-    for consolidated_name in consolidated_df['Consolidated Column Name'].unique():
-        match = re.match(r'([A-Za-z]+)', consolidated_name)
-        if match:
-            channel = match.group(1)
-            matching_columns = [col for col in df.columns if re.sub(r'([_-]\d+)', '', col) == consolidated_name]
-            spend_sum = df[matching_columns].sum(axis=1).sum()
-            spend_data.append({'Channel': channel, 'Spend': spend_sum})
-    spend_df = pd.DataFrame(spend_data).groupby('Channel', as_index=False).sum()
+    # Map every spend column to its channel once, then sum the columns per channel
+    channel_map = taxonomy.channel_groups(consolidated_df['Original Column Name'])
+    spend_df = taxonomy.aggregate(df, channel_map, 'Channel', 'Spend')
     return spend_df
 
+@profiling.timed('transform')
 def create_final_output_table(spend_df):
     # Create a version with TOTAL row for display
     display_df = spend_df.copy()
@@ -65,7 +41,9 @@ def main():
     uploaded_file = st.file_uploader("Choose an Excel file", type="xlsx")
     
     if uploaded_file is not None:
-        df = pd.read_excel(uploaded_file)
+        with profiling.span('load', file=uploaded_file) as record:
+            df = ingest.read_excel(uploaded_file)
+            profiling.note(record, df)
         
         # Consolidate spend columns only
         consolidated_df, unique_columns_df = consolidate_spend_columns(df)
@@ -88,7 +66,7 @@ def main():
             st.write(final_display_df)
 
         # Prepare the version without TOTAL row for download
-        excel_data_final_output = download_excel(final_download_df, sheet_name='Final Output')
+        excel_data_final_output = exports.deferred(download_excel, final_download_df, sheet_name='Final Output')
         st.download_button(
             label="Download Final Output Table as Excel",
             data=excel_data_final_output,
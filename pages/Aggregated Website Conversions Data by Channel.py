@@ -1,39 +1,24 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import aggregates, decomp, exports, profiling
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(uploaded_file):
-    return pd.read_csv(uploaded_file)
+    return decomp.load_partitioned(uploaded_file)
 
-def filter_by_model(df, selected_model):
-    return df[df['solID'] == selected_model]
+@profiling.timed('transform')
+def filter_by_model(index, selected_model):
+    return index.get(selected_model)
 
+@profiling.timed('transform')
 def aggregate_website_conversions(df):
-    channel_data = {}
-    
-    for col in df.columns:
-        if 'spend' not in col.lower() or col == 'KPI_Website_Conversions':
-            continue
-            
-        channel = re.match(r'([A-Za-z]+)', col)
-        if channel:
-            channel_name = channel.group(1)
-            
-            if channel_name not in channel_data:
-                channel_data[channel_name] = 0
-            
-            column_sum = pd.to_numeric(df[col], errors='coerce').sum()
-            channel_data[channel_name] += column_sum
-    
-    channel_df = pd.DataFrame(list(channel_data.items()), columns=['Channel', 'Conversions'])
-    channel_df['Conversions'] = channel_df['Conversions'].round(0).astype(int)
-    
-    total_conversions = channel_df['Conversions'].sum()
-    total_row = pd.DataFrame([{'Channel': 'Total', 'Conversions': total_conversions}])
-    channel_df = pd.concat([channel_df, total_row], ignore_index=True)
-    
-    return channel_df
+    return aggregates.channel_totals(df, 'Conversions', exclude=aggregates.CONVERSIONS_KPI)
+
+@profiling.timed('transform')
+def aggregate_all_models(index):
+    # Channel totals for every model at once (one row per solID, one column per channel)
+    return aggregates.channel_totals_all_models(index, exclude=aggregates.CONVERSIONS_KPI)
 
 def download_excel(df, sheet_name='Sheet1'):
     output = BytesIO()
@@ -49,12 +34,12 @@ def main():
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
     
     if uploaded_file is not None:
-        df = load_data(uploaded_file)
+        index = load_data(uploaded_file)
 
-        models = df['solID'].unique()
+        models = index.models
         selected_model = st.selectbox("Select Model (solID)", options=models)
 
-        filtered_df = filter_by_model(df, selected_model)
+        filtered_df = filter_by_model(index, selected_model)
         st.write(f"Data for Model {selected_model}:", filtered_df)
 
         channel_conversions_df_with_total = aggregate_website_conversions(filtered_df)
@@ -63,7 +48,7 @@ def main():
 
         channel_conversions_df_without_total = channel_conversions_df_with_total[channel_conversions_df_with_total['Channel'] != 'Total']
 
-        excel_data = download_excel(channel_conversions_df_without_total, sheet_name='Channel Conversions')
+        excel_data = exports.deferred(download_excel, channel_conversions_df_without_total, sheet_name='Channel Conversions')
         st.download_button(
             label="Download Channel Conversions as Excel (without Total)",
             data=excel_data,
@@ -71,5 +56,18 @@ def main():
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
+        if st.checkbox("Compare all models (solID x Channel)"):
+            all_models_df = aggregate_all_models(index)
+            st.subheader("Website Conversions by Channel for All Models")
+            st.write(all_models_df)
+
+            excel_data = exports.deferred(download_excel, all_models_df.reset_index(), sheet_name='All Models')
+            st.download_button(
+                label="Download All Models as Excel",
+                data=excel_data,
+                file_name="Website Conversions by Channel - All Models.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
 if __name__ == "__main__":
     main()
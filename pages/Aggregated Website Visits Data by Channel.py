@@ -1,53 +1,27 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import aggregates, decomp, exports, profiling
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(uploaded_file):
-    # Load the uploaded CSV file
-    return pd.read_csv(uploaded_file)
+    # Load the uploaded CSV file, partitioned by solID
+    return decomp.load_partitioned(uploaded_file)
 
-def filter_by_model(df, selected_model):
-    # Filter the DataFrame based on the selected model
-    return df[df['solID'] == selected_model]
+@profiling.timed('transform')
+def filter_by_model(index, selected_model):
+    # Slice the selected model's rows out of the partitioned data
+    return index.get(selected_model)
 
+@profiling.timed('transform')
 def aggregate_website_visits(df):
-    # Initialize dictionary to store the total visits by each channel
-    channel_data = {}
-    
-    # Iterate through columns, aggregating by channel only for "spend" columns
-    for col in df.columns:
-        # Skip columns that do not contain "spend" and the KPI_Website_Sessions column
-        if 'spend' not in col.lower() or col == 'KPI_Website_Sessions':
-            continue
-            
-        # Extract the channel name (e.g., "TikTok" from "TikTok_Spend")
-        channel = re.match(r'([A-Za-z]+)', col)
-        if channel:
-            channel_name = channel.group(1)
-            
-            # Initialize channel sum if not already in dictionary
-            if channel_name not in channel_data:
-                channel_data[channel_name] = 0
-                
-            # Convert column to numeric, forcing non-numeric values to NaN, then sum
-            column_sum = pd.to_numeric(df[col], errors='coerce').sum()
-            channel_data[channel_name] += column_sum
-    
-    # Convert channel_data dictionary to a DataFrame for display
-    channel_df = pd.DataFrame(list(channel_data.items()), columns=['Channel', 'Visits'])
-    
-    # Convert Visits to whole numbers (integers)
-    channel_df['Visits'] = channel_df['Visits'].round(0).astype(int)
-    
-    # Calculate the total visits across all channels
-    total_visits = channel_df['Visits'].sum()
-    
-    # Append a row for total visits to the DataFrame
-    total_row = pd.DataFrame([{'Channel': 'Total', 'Visits': total_visits}])
-    channel_df = pd.concat([channel_df, total_row], ignore_index=True)
-    
-    return channel_df
+    # Whole-number visits by channel (e.g. "TikTok" from "TikTok_Spend") with a Total row
+    return aggregates.channel_totals(df, 'Visits', exclude=aggregates.SESSIONS_KPI)
+
+@profiling.timed('transform')
+def aggregate_all_models(index):
+    # Channel totals for every model at once (one row per solID, one column per channel)
+    return aggregates.channel_totals_all_models(index, exclude=aggregates.SESSIONS_KPI)
 
 def download_excel(df, sheet_name='Sheet1'):
     output = BytesIO()
@@ -65,14 +39,14 @@ def main():
     
     if uploaded_file is not None:
         # Load data
-        df = load_data(uploaded_file)
+        index = load_data(uploaded_file)
 
         # Model (solID) selection
-        models = df['solID'].unique()
+        models = index.models
         selected_model = st.selectbox("Select Model (solID)", options=models)
 
         # Filter data by selected model
-        filtered_df = filter_by_model(df, selected_model)
+        filtered_df = filter_by_model(index, selected_model)
         st.write(f"Data for Model {selected_model}:", filtered_df)
 
         # Aggregate website visits by channel, including the Total row
@@ -84,7 +58,7 @@ def main():
         channel_visits_df_without_total = channel_visits_df_with_total[channel_visits_df_with_total['Channel'] != 'Total']
 
         # Download aggregated data as Excel, without the Total row
-        excel_data = download_excel(channel_visits_df_without_total, sheet_name='Channel Visits')
+        excel_data = exports.deferred(download_excel, channel_visits_df_without_total, sheet_name='Channel Visits')
         st.download_button(
             label="Download Channel Visits as Excel (without Total)",
             data=excel_data,
@@ -92,5 +66,19 @@ def main():
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
+        # Compare every model side by side
+        if st.checkbox("Compare all models (solID x Channel)"):
+            all_models_df = aggregate_all_models(index)
+            st.subheader("Website Visits by Channel for All Models")
+            st.write(all_models_df)
+
+            excel_data = exports.deferred(download_excel, all_models_df.reset_index(), sheet_name='All Models')
+            st.download_button(
+                label="Download All Models as Excel",
+                data=excel_data,
+                file_name="channel_visits_all_models.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
 if __name__ == "__main__":
     main()
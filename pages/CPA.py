@@ -1,100 +1,10 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import re
-from io import BytesIO
-from openpyxl import load_workbook
-
-# --- Helper Functions for Data Processing ---
-
-def convert_csv_to_excel(csv_file):
-    """Convert CSV to Excel format (in-memory) to standardize file handling."""
-    try:
-        # csv_file is an UploadedFile object. Read its content directly.
-        csv_file.seek(0)
-        df = pd.read_csv(csv_file)
-    except Exception as e:
-        # Use st.exception for better error display in Streamlit
-        st.exception(f"Error reading CSV file during conversion: {e}")
-        return None
-        
-    excel_file = BytesIO()
-    # Ensure pandas can write to the BytesIO object
-    df.to_excel(excel_file, index=False, engine='openpyxl', sheet_name='Sheet1')
-    excel_file.seek(0)
-    return excel_file
-
-def standardize_channel_name(name):
-    """
-    Transforms names like 'Media_Digital_..._1_Impressions' to 'Media Digital ... Impressions'.
-    """
-    if pd.isna(name):
-        return name
-    
-    # 1. Remove '_N' at the end of the name (e.g., _1, _2, _3)
-    name_no_adstock = re.sub(r'_\d+($|_)', '', name)
-    
-    # 2. Replace remaining underscores with spaces, then strip any extra whitespace
-    name_standardized = name_no_adstock.replace('_', ' ').strip()
-    
-    return name_standardized
-
-def calculate_max_channel_cpa(df):
-    """
-    Calculates the max 'own_' channel CPA for each model (solID), EXCLUDING 
-    variables with a zero coefficient.
-    """
-    # 1. Filter out non-channel variables
-    ignore_vars = ['(Intercept)', 'trend', 'season', 'weekday', 'monthly', 'holiday']
-    df_channels = df[~df['rn'].isin(ignore_vars)].copy()
-    
-    # 2. CRUCIAL STEP: Filter to only include variables containing 'own_' AND coef != 0
-    OWN_PREFIX = 'own_'
-    df_channels = df_channels[
-        (df_channels['rn'].str.contains(OWN_PREFIX, case=False, na=False)) &
-        (df_channels['coef'] != 0)
-    ].copy()
-
-    if df_channels.empty:
-        metric_cols = ['solID', 'Max_Channel_CPA', 'rsq_train', 'rsq_val', 'rsq_test', 'nrmse', 'decomp.rssd']
-        return pd.DataFrame(columns=metric_cols)
-        
-    # 3. Apply the standardization function to group adstock/saturation variants
-    df_channels['Channel_Name_Std'] = df_channels['rn'].apply(standardize_channel_name)
-    
-    # 4. Aggregate by model (solID) and standardized channel name
-    channel_agg = df_channels.groupby(['solID', 'Channel_Name_Std']).agg(
-        total_spend=('total_spend', 'sum'),
-        total_effect=('xDecompAgg', 'sum'),
-    ).reset_index()
-
-    # 5. Calculate Channel CPA: Spend / Effect. Handle division by zero/near zero.
-    channel_agg['Channel_CPA'] = np.divide(
-        channel_agg['total_spend'],
-        channel_agg['total_effect'],
-        out=np.full_like(channel_agg['total_spend'], np.nan),
-        where=channel_agg['total_effect'] > 1e-6
-    )
-    
-    # 6. Find the maximum CPA across all *filtered 'own_'* channels for each model
-    max_cpa_summary = channel_agg.groupby('solID').agg(
-        Max_Channel_CPA=('Channel_CPA', 'max'),
-    ).reset_index()
-    
-    # 7. Merge model-level metrics for R-squared as a tie-breaker
-    metric_cols = ['rsq_train', 'rsq_val', 'rsq_test', 'nrmse', 'decomp.rssd']
-    model_metrics = df[df['rn'] == '(Intercept)'][['solID'] + metric_cols].copy()
-    if model_metrics.empty:
-        model_metrics = df.groupby('solID')[['solID'] + metric_cols].first().reset_index()
-    
-    # Merge and replace inf/-inf with NaN before ranking
-    final_ranking_df = pd.merge(max_cpa_summary, model_metrics, on='solID', how='left')
-    final_ranking_df = final_ranking_df.replace([np.inf, -np.inf], np.nan)
-    
-    return final_ranking_df
+from attribution import charts, ingest, models, profiling
+import ui
 
 # *** Core Ranking and Display Function ***
-def rank_and_display_models_by_max_cpa(df):
+def rank_and_display_models_by_max_cpa(catalog):
     """
     Calculates and displays models ranked by the Max 'Own_' Channel CPA.
     """
@@ -104,28 +14,20 @@ def rank_and_display_models_by_max_cpa(df):
         This approach prioritizes channel stability by selecting models where the most inefficient *effective* paid channel still has a relatively low CPA.
     """)
     
-    ranking_df = calculate_max_channel_cpa(df.copy())
+    # A view of the model catalog (built once per upload)
+    ranking_df = models.max_channel_cpa(catalog)
     
     if ranking_df.empty:
         st.warning("No models contained effective (non-zero coefficient) 'own\_' variables. Cannot perform this ranking.")
         return
 
-    # Drop rows where Max_Channel_CPA is NaN
-    ranking_df = ranking_df.dropna(subset=['Max_Channel_CPA'])
+    # Rank the models with a calculated Max_Channel_CPA (lowest first, ties by rsq_train)
+    ranking_df = models.rank_by_max_cpa(ranking_df)
 
     if ranking_df.empty:
         st.warning("No models with calculated Max 'Own\_' Channel CPA were found after excluding zero effect channels.")
         return
 
-    # 1. Rank the models
-    ranking_df = ranking_df.sort_values(
-        by=['Max_Channel_CPA', 'rsq_train'],
-        ascending=[True, False]
-    ).reset_index(drop=True)
-
-    # 2. Add a Rank column
-    ranking_df['Rank'] = ranking_df.index + 1
-
     # 3. Format columns
     ranking_df['Max Channel CPA'] = ranking_df['Max_Channel_CPA'].apply(lambda x: f"${x:,.4f}" if x is not None else "N/A")
     ranking_df['R-Squared (Train)'] = ranking_df['rsq_train'].apply(lambda x: f"{x*100:.2f}%" if pd.notna(x) else "N/A")
@@ -142,21 +44,84 @@ def rank_and_display_models_by_max_cpa(df):
     st.dataframe(ranking_df_display, use_container_width=True, hide_index=True)
 
 
+# *** Multi-Objective (Pareto Front) Ranking ***
+OBJECTIVE_LABELS = {
+    'Max_Channel_CPA': 'Max Channel CPA',
+    'rsq_train': 'R-Squared (Train)',
+    'nrmse': 'NRMSE',
+    'decomp.rssd': 'Decomp RSSD',
+    'pct_spend_on_own_zeros': 'Pct Spend on Own Zeros',
+}
+
+def display_pareto_fronts(catalog):
+    """
+    Ranks models into Pareto fronts over the chosen metrics: a model is on the first front
+    when no other model is at least as good on every metric and better on one.
+    """
+    st.subheader("Pareto-Front Ranking: CPA vs. Fit vs. RSSD")
+    st.markdown("""
+        Sorting by CPA first hides models that give up a little CPA for a much better fit or decomposition.
+        Here a model is on **Front 1** when no other model is at least as good on **every** chosen metric and better on one;
+        Front 2 is the same over the models left, and so on.
+    """)
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        objectives = st.multiselect(
+            "Metrics to trade off", list(models.OBJECTIVES), default=models.DEFAULT_OBJECTIVES,
+            format_func=lambda col: f"{OBJECTIVE_LABELS[col]} ({'higher' if models.OBJECTIVES[col] == 'max' else 'lower'} is better)",
+            key="pareto_objectives",
+        )
+    with col2:
+        max_fronts = st.number_input("Fronts", min_value=1, max_value=50, value=3, key="pareto_fronts")
+
+    if len(objectives) < 2:
+        st.info("Choose at least two metrics to trade off.")
+        return
+
+    with profiling.span('transform', step='pareto_ranking') as record:
+        ranking_df = models.pareto_ranking(catalog, objectives, int(max_fronts))
+        profiling.note(record, ranking_df)
+    fronts_df = ranking_df.dropna(subset=['Front'])
+    if fronts_df.empty:
+        st.warning("No models have all of the chosen metrics.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        x = st.selectbox("X axis", objectives, index=0, format_func=OBJECTIVE_LABELS.get, key="pareto_x")
+    with col2:
+        y = st.selectbox("Y axis", objectives, index=1, format_func=OBJECTIVE_LABELS.get, key="pareto_y")
+    st.plotly_chart(charts.pareto_front(ranking_df, x, y, connect=len(objectives) == 2), use_container_width=True)
+
+    st.caption(f"{(fronts_df['Front'] == 1).sum()} models on the first front, {len(fronts_df)} on the first {int(max_fronts)} fronts.")
+    st.dataframe(
+        fronts_df[['Front', 'solID'] + objectives].rename(columns={'solID': 'Model ID', **OBJECTIVE_LABELS}),
+        use_container_width=True, hide_index=True,
+        column_config={
+            'Max Channel CPA': st.column_config.NumberColumn(format="$%.4f"),
+            'R-Squared (Train)': st.column_config.NumberColumn(format="%.4f"),
+            'NRMSE': st.column_config.NumberColumn(format="%.4f"),
+            'Decomp RSSD': st.column_config.NumberColumn(format="%.4f"),
+            'Pct Spend on Own Zeros': st.column_config.NumberColumn(format="%.2f%%"),
+        },
+    )
+
+
 # --- Analysis Orchestration Function ---
 def analyze_file(file_object, is_csv):
     """
     Analyzes the uploaded pareto_aggregated file.
-    Takes a file object (UploadedFile or BytesIO) and a flag indicating if it was a CSV.
+    Takes a file object (UploadedFile or BytesIO) and a flag indicating if it is a CSV.
     """
-    # Load the file into a DataFrame
+    # Load the file into a DataFrame with the native CSV or Excel parser
     try:
-        file_object.seek(0)
-        # Attempt to read as Excel first, then CSV
-        # This logic is more robust because it doesn't rely on the file's .name attribute
-        if is_csv:
-             df = pd.read_csv(file_object)
-        else:
-             df = pd.read_excel(file_object, engine='openpyxl')
+        with profiling.span('load', file=file_object) as record:
+            if is_csv:
+                 df = ingest.read_csv(file_object, copy=False)
+            else:
+                 df = ingest.read_excel(file_object, copy=False, engine='openpyxl')
+            profiling.note(record, df)
     except Exception as e:
         st.error(f"Error loading file. Could not read: {e}")
         return
@@ -166,54 +131,39 @@ def analyze_file(file_object, is_csv):
     if not all(col in df.columns for col in required_cols):
         st.error(f"Missing one or more required columns: {', '.join(required_cols)}. Cannot proceed with analysis.")
         return
+
+    # Every per-model statistic below comes from one pass over the table
+    with profiling.span('transform', step='model_catalog') as record:
+        catalog = models.load_catalog(file_object, df)
+        profiling.note(record, catalog)
         
     # --- 1. Max Channel CPA Ranking and Display ---
     with st.container():
-        rank_and_display_models_by_max_cpa(df.copy())
+        rank_and_display_models_by_max_cpa(catalog)
     
     st.markdown("---")
-    
-    # --- 2. Zero-Coefficient Analysis (for ineffective paid media) ---
-    st.subheader("Submodels with Ineffective Paid Media ('own\_' Zero-Coefficient Variables)")
-    
-    ignore_vars = ['(Intercept)', 'trend', 'season', 'weekday', 'monthly', 'holiday']
-    df_filtered = df[~df['rn'].isin(ignore_vars)].copy()
-    OWN_PREFIX = 'own_'
-    
-    df_own_vars = df_filtered[df_filtered['rn'].str.contains(OWN_PREFIX, case=False, na=False)].copy()
-    total_own_spend = df_own_vars.groupby('solID')['total_spend'].sum().reset_index()
-    total_own_spend.rename(columns={'total_spend': 'total_spend_on_all_own'}, inplace=True)
-
-    submodels_with_own_zeros = df_filtered[
-        (df_filtered['coef'] == 0) & 
-        (df_filtered['rn'].str.contains(OWN_PREFIX, case=False, na=False))
-    ].copy()
 
-    if submodels_with_own_zeros.empty:
-        summary = pd.DataFrame()
-    else:
-        summary_own_zeros = submodels_with_own_zeros.groupby('solID').agg(
-            own_zero_count=('rn', 'count'), 
-            total_spend_on_own_zeros=('total_spend', 'sum'), 
-            own_zero_vars=('rn', lambda x: list(x)), 
-            rsq_train_avg=('rsq_train', 'mean'),
-            decomp_rssd_avg=('decomp.rssd', 'mean')
-        ).reset_index()
+    # --- 2. Pareto-Front Ranking over several metrics ---
+    with st.container():
+        display_pareto_fronts(catalog)
 
-        summary = pd.merge(summary_own_zeros, total_own_spend, on='solID', how='left')
-        summary['total_spend_on_all_own'] = summary['total_spend_on_all_own'].fillna(0)
+    st.markdown("---")
 
-        summary['pct_spend_on_own_zeros'] = np.divide(
-            summary['total_spend_on_own_zeros'] * 100,
-            summary['total_spend_on_all_own'],
-            out=np.zeros_like(summary['total_spend_on_own_zeros'], dtype=float),
-            where=summary['total_spend_on_all_own'] != 0
-        )
-        
-        summary = summary[['solID', 'rsq_train_avg', 'decomp_rssd_avg',
-                            'own_zero_count', 'total_spend_on_own_zeros', 'total_spend_on_all_own',
-                            'pct_spend_on_own_zeros', 'own_zero_vars']]
+    # --- 3. Weighted Model Score ---
+    st.subheader("Weighted Model Score")
+    st.markdown("""
+        Each metric is turned into a percentile across all models (**1 = best**), and a model's score is
+        the weighted mean of its percentiles. Set a weight to 0 to leave a metric out.
+    """)
+    ui.model_scores(file_object, catalog, OBJECTIVE_LABELS, key="cpa")
 
+    st.markdown("---")
+    
+    # --- 4. Zero-Coefficient Analysis (for ineffective paid media) ---
+    st.subheader("Submodels with Ineffective Paid Media ('own\_' Zero-Coefficient Variables)")
+    
+    summary = models.own_zero_summary(catalog)
+    if not summary.empty:
         summary['total_spend_on_own_zeros'] = summary['total_spend_on_own_zeros'].apply(lambda x: f"${x:,.2f}")
         summary['total_spend_on_all_own'] = summary['total_spend_on_all_own'].apply(lambda x: f"${x:,.2f}")
         summary['pct_spend_on_own_zeros'] = summary['pct_spend_on_own_zeros'].apply(lambda x: f"{x:.2f}%")
@@ -247,22 +197,10 @@ def main_page_func():
     uploaded_file = st.file_uploader("Upload pareto_aggregated Excel or CSV file", type=["xlsx", "csv"])
 
     if uploaded_file:
-        file_to_analyze = uploaded_file
         is_csv = uploaded_file.name.endswith(".csv")
-        
-        if is_csv:
-            with st.spinner('Converting CSV to Excel format...'):
-                # Call conversion and get the BytesIO object
-                excel_file_buffer = convert_csv_to_excel(uploaded_file)
-                if excel_file_buffer:
-                    # Pass the BytesIO object and set is_csv to False for the final read
-                    file_to_analyze = excel_file_buffer
-                    is_csv = False # Set flag for the analyze_file function's final read
-                else:
-                    return # Stop if conversion failed
 
         with st.spinner('Analyzing file and calculating metrics...'):
-            analyze_file(file_to_analyze, is_csv)
+            analyze_file(uploaded_file, is_csv)
             
 if __name__ == '__main__':
     main_page_func()
@@ -1,44 +1,18 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import columns, exports, ingest, profiling
 from io import BytesIO
 
-def consolidate_columns(df, filter_option):
-    # Get initial column names and filter based on selected option
-    columns = df.columns
-    filtered_columns = []
-
-    for col in columns:
-        # Check the filter option and match keywords accordingly
-        if filter_option == "Spend Variables" and "spend" not in col.lower():
-            continue
-        elif filter_option == "Impression Variables" and "impressions" not in col.lower():
-            continue
-        filtered_columns.append(col)
+FILTER_KEYWORDS = {
+    "All Variables": None,
+    "Spend Variables": "spend",
+    "Impression Variables": "impressions",
+}
 
+@profiling.timed('transform')
+def consolidate_columns(df, filter_option):
     # Consolidate column names by removing trailing numbers (e.g., "_1", "_2", etc.)
-    consolidated_columns = []
-    seen_columns = set()
-    ordered_unique_columns = []
-
-    for col in filtered_columns:
-        new_col = re.sub(r'(_\d+)', '', col)
-        consolidated_columns.append(new_col)
-
-        # Preserve order of first occurrences only
-        if new_col not in seen_columns:
-            ordered_unique_columns.append(new_col)
-            seen_columns.add(new_col)
-
-    # Create a DataFrame to show old and new column names for filtered columns only
-    consolidated_df = pd.DataFrame({
-        'Original Column Name': filtered_columns,
-        'Consolidated Column Name': consolidated_columns
-    })
-
-    # Convert ordered unique columns to DataFrame for download
-    unique_columns_df = pd.DataFrame({'Consolidated Column Names': ordered_unique_columns})
-    return consolidated_df, unique_columns_df
+    return columns.consolidate_columns(df.columns, columns.UNDERSCORE_ADSTOCK_PATTERN, FILTER_KEYWORDS.get(filter_option))
 
 def download_excel(df):
     # Save DataFrame to an Excel file in memory
@@ -58,7 +32,9 @@ def main():
     
     if uploaded_file is not None:
         # Load the Excel file
-        df = pd.read_excel(uploaded_file)
+        with profiling.span('load', file=uploaded_file) as record:
+            df = ingest.read_excel(uploaded_file)
+            profiling.note(record, df)
 
         # Filter options for selecting columns
         filter_option = st.selectbox("Select Variable Type to Consolidate", 
@@ -79,7 +55,7 @@ def main():
             st.write(unique_columns_df)
 
         # Provide a download button for Excel
-        excel_data = download_excel(unique_columns_df)
+        excel_data = exports.deferred(download_excel, unique_columns_df)
         st.download_button(
             label="Download Ordered Consolidated Column Names as Excel",
             data=excel_data,
@@ -1,43 +1,17 @@
 import streamlit as st
 import pandas as pd
+from attribution import exports, ingest, profiling, ratios
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(spend_file, conversions_file):
-    spend_df = pd.read_excel(spend_file)
-    conversions_df = pd.read_excel(conversions_file)
+    spend_df = ingest.read_excel(spend_file)
+    conversions_df = ingest.read_excel(conversions_file)
     return spend_df, conversions_df
 
+@profiling.timed('transform')
 def clean_and_merge(spend_df, conversions_df):
-    spend_df['Channel'] = spend_df['Channel'].str.lower().str.strip()
-    spend_df['Creative'] = spend_df['Creative'].str.lower().str.strip()
-    conversions_df['Channel'] = conversions_df['Channel'].str.lower().str.strip()
-    conversions_df['Creative'] = conversions_df['Creative'].str.lower().str.strip()
-    
-    merged_df = pd.merge(spend_df, conversions_df, on=["Channel", "Creative"], how="outer")
-    
-    merged_df['Spend'] = pd.to_numeric(merged_df['Spend'], errors='coerce').fillna(0)
-    merged_df['Conversions'] = pd.to_numeric(merged_df['Conversions'], errors='coerce').fillna(0)
-    
-    merged_df['Cost per Conversion'] = merged_df.apply(
-        lambda row: round(row['Spend'] / row['Conversions'], 2) if row['Conversions'] > 0 else 0, axis=1
-    )
-    
-    total_rows = []
-    for channel in merged_df['Channel'].unique():
-        channel_data = merged_df[merged_df['Channel'] == channel]
-        total_spend = channel_data['Spend'].sum()
-        total_conversions = channel_data['Conversions'].sum()
-        avg_cost_per_conversion = round(total_spend / total_conversions, 2) if total_conversions > 0 else 0
-        total_rows.append({'Channel': channel.title(), 'Creative': 'Total', 'Spend': total_spend, 'Conversions': total_conversions, 'Cost per Conversion': avg_cost_per_conversion})
-    
-    overall_spend = merged_df['Spend'].sum()
-    overall_conversions = merged_df['Conversions'].sum()
-    overall_cost_per_conversion = round(overall_spend / overall_conversions, 2) if overall_conversions > 0 else 0
-    total_rows.append({'Channel': 'Total', 'Creative': '-', 'Spend': overall_spend, 'Conversions': overall_conversions, 'Cost per Conversion': overall_cost_per_conversion})
-    
-    merged_with_totals = pd.concat([merged_df, pd.DataFrame(total_rows)], ignore_index=True)
-    
-    return merged_with_totals
+    return ratios.creative_cost_table(spend_df, conversions_df, 'Spend', 'Conversions', 'Cost per Conversion')
 
 def download_excel_with_formatting(df, sheet_name='Formatted Data'):
     output = BytesIO()
@@ -78,7 +52,7 @@ def main():
             "Cost per Conversion": "${:,.2f}"
         }))
 
-        excel_data = download_excel_with_formatting(formatted_df, sheet_name='Formatted Data')
+        excel_data = exports.deferred(download_excel_with_formatting, formatted_df, sheet_name='Formatted Data')
         st.download_button(
             label="Download Formatted Data as Excel",
             data=excel_data,
@@ -1,40 +1,18 @@
 import streamlit as st
 import pandas as pd
+from attribution import exports, ingest, profiling, ratios
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(spend_file, conversions_file):
-    spend_df = pd.read_excel(spend_file)
-    conversions_df = pd.read_excel(conversions_file)
+    spend_df = ingest.read_excel(spend_file)
+    conversions_df = ingest.read_excel(conversions_file)
     return spend_df, conversions_df
 
+@profiling.timed('transform')
 def clean_and_merge(spend_df, conversions_df):
-    merged_df = pd.merge(spend_df, conversions_df, on="Channel", how="inner")
-
-    merged_df['Spend'] = pd.to_numeric(merged_df['Spend'], errors='coerce').fillna(0)
-    merged_df['Conversions'] = pd.to_numeric(merged_df['Conversions'], errors='coerce').fillna(0)
-
-    merged_df['Cost per Conversion'] = merged_df.apply(
-        lambda row: round(row['Spend'] / row['Conversions'], 2) if row['Conversions'] > 0 else 0, axis=1
-    )
-
-    total_spend = merged_df['Spend'].sum()
-    total_conversions = merged_df['Conversions'].sum()
-    avg_cost_per_conversion = round(total_spend / total_conversions, 2) if total_conversions > 0 else 0
-
-    total_row = pd.DataFrame([{
-        'Channel': 'TOTAL',
-        'Spend': total_spend,
-        'Conversions': total_conversions,
-        'Cost per Conversion': avg_cost_per_conversion
-    }])
-
-    merged_df = pd.concat([merged_df, total_row], ignore_index=True)
-    merged_df_no_total = merged_df[merged_df['Channel'] != 'TOTAL']
-    total_row_df = merged_df[merged_df['Channel'] == 'TOTAL']
-    
-    merged_df_sorted = pd.concat([merged_df_no_total.sort_values(by="Cost per Conversion"), total_row_df], ignore_index=True)
-
-    return merged_df_sorted
+    # Merge on "Channel", add Cost per Conversion and a TOTAL row, sorted by Cost per Conversion
+    return ratios.cost_table(spend_df, conversions_df, 'Spend', 'Conversions', 'Cost per Conversion')
 
 def download_excel(df, sheet_name='Merged Data'):
     output = BytesIO()
@@ -72,7 +50,7 @@ def main():
             "Cost per Conversion": "${:,.2f}"
         }))
 
-        excel_data = download_excel(merged_df, sheet_name='Merged Data')
+        excel_data = exports.deferred(download_excel, merged_df, sheet_name='Merged Data')
         st.download_button(
             label="Download Merged Data as Excel",
             data=excel_data,
@@ -1,51 +1,19 @@
 import streamlit as st
 import pandas as pd
+from attribution import exports, ingest, profiling, ratios
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(spend_file, visits_file):
     # Load the uploaded files
-    spend_df = pd.read_excel(spend_file)
-    visits_df = pd.read_excel(visits_file)
+    spend_df = ingest.read_excel(spend_file)
+    visits_df = ingest.read_excel(visits_file)
     return spend_df, visits_df
 
+@profiling.timed('transform')
 def clean_and_merge(spend_df, visits_df):
-    # Standardize channel and format names by converting to lowercase and stripping whitespace
-    spend_df['Channel'] = spend_df['Channel'].str.lower().str.strip()
-    spend_df['Creative'] = spend_df['Creative'].str.lower().str.strip()
-    visits_df['Channel'] = visits_df['Channel'].str.lower().str.strip()
-    visits_df['Creative'] = visits_df['Creative'].str.lower().str.strip()
-    
-    # Merge the two DataFrames on the standardized "Channel" and "Creative" columns
-    merged_df = pd.merge(spend_df, visits_df, on=["Channel", "Creative"], how="outer")
-
-    # Ensure Spend and Visits columns are numeric; convert non-numeric to NaN
-    merged_df['Spend'] = pd.to_numeric(merged_df['Spend'], errors='coerce').fillna(0)
-    merged_df['Visits'] = pd.to_numeric(merged_df['Visits'], errors='coerce').fillna(0)
-
-    # Calculate Cost per Visit (CPV) for each row
-    merged_df['CPV'] = merged_df.apply(
-        lambda row: round(row['Spend'] / row['Visits'], 2) if row['Visits'] > 0 else 0, axis=1
-    )
-
-    # Calculate totals for each channel
-    total_rows = []
-    for channel in merged_df['Channel'].unique():
-        channel_data = merged_df[merged_df['Channel'] == channel]
-        total_spend = channel_data['Spend'].sum()
-        total_visits = channel_data['Visits'].sum()
-        avg_cpv = round(total_spend / total_visits, 2) if total_visits > 0 else 0
-        total_rows.append({'Channel': channel.title(), 'Creative': 'Total', 'Spend': total_spend, 'Visits': total_visits, 'CPV': avg_cpv})
-    
-    # Add an overall total row
-    overall_spend = merged_df['Spend'].sum()
-    overall_visits = merged_df['Visits'].sum()
-    overall_cpv = round(overall_spend / overall_visits, 2) if overall_visits > 0 else 0
-    total_rows.append({'Channel': 'Total', 'Creative': '-', 'Spend': overall_spend, 'Visits': overall_visits, 'CPV': overall_cpv})
-    
-    # Combine the total rows with the original data
-    merged_with_totals = pd.concat([merged_df, pd.DataFrame(total_rows)], ignore_index=True)
-    
-    return merged_with_totals
+    # Merge on the standardized Channel and Creative names, with CPV, channel totals and an overall total
+    return ratios.creative_cost_table(spend_df, visits_df, 'Spend', 'Visits', 'CPV')
 
 def download_excel_with_formatting(df, sheet_name='Formatted Data'):
     output = BytesIO()
@@ -94,7 +62,7 @@ def main():
         }))
 
         # Download button for the formatted Excel file
-        excel_data = download_excel_with_formatting(formatted_df, sheet_name='Formatted Data')
+        excel_data = exports.deferred(download_excel_with_formatting, formatted_df, sheet_name='Formatted Data')
         st.download_button(
             label="Download Formatted Data as Excel",
             data=excel_data,
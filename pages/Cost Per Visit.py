@@ -1,48 +1,19 @@
 import streamlit as st
 import pandas as pd
+from attribution import exports, ingest, profiling, ratios
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(spend_file, visits_file):
     # Load the uploaded files
-    spend_df = pd.read_excel(spend_file)
-    visits_df = pd.read_excel(visits_file)
+    spend_df = ingest.read_excel(spend_file)
+    visits_df = ingest.read_excel(visits_file)
     return spend_df, visits_df
 
+@profiling.timed('transform')
 def clean_and_merge(spend_df, visits_df):
-    # Merge the two DataFrames on the "Channel" column
-    merged_df = pd.merge(spend_df, visits_df, on="Channel", how="inner")
-
-    # Ensure Spend and Visits columns are numeric; convert non-numeric to NaN
-    merged_df['Spend'] = pd.to_numeric(merged_df['Spend'], errors='coerce').fillna(0)
-    merged_df['Visits'] = pd.to_numeric(merged_df['Visits'], errors='coerce').fillna(0)
-
-    # Calculate Cost per Visit for each row
-    merged_df['Cost per Visit'] = merged_df.apply(
-        lambda row: round(row['Spend'] / row['Visits'], 2) if row['Visits'] > 0 else 0, axis=1
-    )
-
-    # Calculate Totals for Spend and Visits, and Average for Cost per Visit
-    total_spend = merged_df['Spend'].sum()
-    total_visits = merged_df['Visits'].sum()
-    avg_cost_per_visit = round(total_spend / total_visits, 2) if total_visits > 0 else 0
-
-    # Add a total row to the DataFrame
-    total_row = pd.DataFrame([{
-        'Channel': 'TOTAL',
-        'Spend': total_spend,
-        'Visits': total_visits,
-        'Cost per Visit': avg_cost_per_visit
-    }])
-
-    # Remove the TOTAL row, sort by 'Cost per Visit', then re-attach TOTAL row at the end
-    merged_df = pd.concat([merged_df, total_row], ignore_index=True)
-    merged_df_no_total = merged_df[merged_df['Channel'] != 'TOTAL']
-    total_row_df = merged_df[merged_df['Channel'] == 'TOTAL']
-    
-    # Sort merged_df_no_total by 'Cost per Visit' in ascending order
-    merged_df_sorted = pd.concat([merged_df_no_total.sort_values(by="Cost per Visit"), total_row_df], ignore_index=True)
-
-    return merged_df_sorted
+    # Merge on "Channel", add Cost per Visit and a TOTAL row, sorted by Cost per Visit
+    return ratios.cost_table(spend_df, visits_df, 'Spend', 'Visits', 'Cost per Visit')
 
 def download_excel(df, sheet_name='Merged Data'):
     # Convert the DataFrame to an Excel file in memory
@@ -87,7 +58,7 @@ def main():
         }))
 
         # Download button for the merged Excel file
-        excel_data = download_excel(merged_df, sheet_name='Merged Data')
+        excel_data = exports.deferred(download_excel, merged_df, sheet_name='Merged Data')
         st.download_button(
             label="Download Merged Data as Excel",
             data=excel_data,
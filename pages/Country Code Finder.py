@@ -1,62 +1,39 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-
-# Function to scrape the country codes
-def scrape_country_codes():
-    url = "https://github.com/vacanza/holidays"
-    response = requests.get(url)
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    heading = soup.find("h2", string="Available Countries")
-
-    if not heading:
-        st.error("Could not find 'Available Countries' section.")
-        return pd.DataFrame()
-
-    table = heading.find_next("table")
-    if not table:
-        st.error("Table not found after 'Available Countries' heading.")
-        return pd.DataFrame()
-
-    # Extract data from the table
-    rows = table.find_all("tr")
-    countries = []
-    codes = []
-
-    for row in rows[1:]:
-        columns = row.find_all("td")
-        if len(columns) >= 2:
-            country = columns[0].get_text(strip=True)
-            code = columns[1].get_text(strip=True)
-            countries.append(country)
-            codes.append(code)
-
-    # Create a DataFrame
-    return pd.DataFrame({"Country": countries, "Code": codes})
-
+from attribution import countries, profiling
 
 # Title and Description
-st.write("This app dynamically fetches the ISO 3166-1 alpha-2 country codes. Enter a country name to filter the results.")
-
-# Scrape the data
-with st.spinner("Fetching country codes..."):
-    df = scrape_country_codes()
+st.write("This app looks up the ISO 3166-1 alpha-2 country codes supported by the holidays package. Enter a country name or code to filter the results.")
 
-# Check if the DataFrame is empty
-if df.empty:
+# Optional refresh from GitHub; the bundled snapshot is used otherwise
+with st.expander("Data source"):
+    source = countries.source_path()
+    if source == countries.SNAPSHOT_PATH:
+        st.caption("Using the bundled snapshot of the country table.")
+    else:
+        st.caption("Using the copy refreshed from GitHub.")
+    if st.button("Refresh from GitHub"):
+        try:
+            with st.spinner("Fetching country codes..."):
+                countries.refresh()
+            st.success("Country codes refreshed.")
+        except Exception as e:
+            st.error(f"Could not refresh the country codes, keeping the current table: {e}")
+
+with profiling.span('load', step='get_index'):
+    index = countries.get_index()
+
+# Check if the table is empty
+if not len(index):
     st.warning("No data available. Please try again later.")
 else:
     # Search Input
-    query = st.text_input("🔍 Enter Country Name", "").strip().lower()
+    query = st.text_input("🔍 Enter Country Name", "").strip()
 
-    # Filter the DataFrame based on user input
-    if query:
-        filtered_df = df[df["Country"].str.lower().str.contains(query)]
-    else:
-        filtered_df = df
+    # Filter the table with the prebuilt search index
+    with profiling.span('transform', step='search') as record:
+        filtered_df = index.search(query)
+        profiling.note(record, filtered_df)
 
     # Display the filtered DataFrame
     st.write(f"Showing {len(filtered_df)} result(s):")
@@ -1,30 +1,27 @@
 import streamlit as st
 import pandas as pd
+from attribution import datasets, profiling
 
 # Streamlit app
 st.title("Date Range Finder")
 
-# File uploader - no session state used
+# File uploader - the upload is registered so other pages reuse the parsed data
 uploaded_file = st.file_uploader("Upload your Processed Data Excel file", type=["xlsx"])
 
 if uploaded_file:
-    # Display the uploaded file preview
-    df = pd.read_excel(uploaded_file)
+    with profiling.span('load', file=uploaded_file, step='register'):
+        dataset = datasets.from_session(st.session_state).register(uploaded_file, slot="processed_data")
+
+    # Display the uploaded file preview (first rows only)
     st.write("File preview:")
-    st.write(df.head())
+    st.write(dataset.preview())
 
     try:
-        # Read the Excel file again for processing (or you could reuse df)
-        data = pd.read_excel(uploaded_file)
-
-        # Ensure there's a 'Date' column and parse dates
-        if 'Date' in data.columns:
-            data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
-            data = data.dropna(subset=['Date'])  # Drop rows with invalid dates
-            
+        # Ensure there's a 'Date' column; the window ignores invalid dates
+        if dataset.date_bounds is not None:
             # Get the start and end dates
-            window_start = data['Date'].min().strftime('%Y-%m-%d')
-            window_end = data['Date'].max().strftime('%Y-%m-%d')
+            window_start = dataset.date_bounds[0].strftime('%Y-%m-%d')
+            window_end = dataset.date_bounds[1].strftime('%Y-%m-%d')
 
             # Display the output code block
             st.code(f'window_start = "{window_start}"\nwindow_end = "{window_end}"', language='r')
@@ -1,42 +1,12 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import decomp, exports, ingest, models, profiling
 from io import BytesIO
 
-# Helper function to consolidate and analyze based on 'rn' column for Spend variables only
+# Consolidate and analyze based on 'rn' column for Spend variables only
+@profiling.timed('transform')
 def consolidate_by_rn_spend(df):
-    # Filter rows where 'rn' column contains "Spend"
-    df = df[df['rn'].str.contains("Spend", case=False)]
-    
-    # Create a function to standardize the names
-    def standardize_name(name):
-        # Remove "_Spend" suffix
-        name = re.sub(r'_Spend$', '', name)
-        # Remove any trailing numbers (with optional underscore)
-        name = re.sub(r'(_\d+|\d+)$', '', name)
-        # Replace underscores with spaces
-        name = name.replace('_', ' ')
-        return name.strip()
-    
-    # Apply standardization
-    df['rn'] = df['rn'].apply(standardize_name)
-    
-    # Group by standardized 'rn' and sum 'spend_share' and 'effect_share'
-    consolidated_df = df.groupby('rn').agg({
-        'spend_share': 'sum',
-        'effect_share': 'sum'
-    }).reset_index()
-    
-    # Calculate 'difference' column
-    consolidated_df['difference'] = consolidated_df['effect_share'] - consolidated_df['spend_share']
-    
-    # Reorder columns
-    consolidated_df = consolidated_df[['rn', 'effect_share', 'spend_share', 'difference']]
-    
-    # Sort by 'effect_share' in descending order (highest at bottom)
-    consolidated_df = consolidated_df.sort_values(by='effect_share', ascending=True).reset_index(drop=True)
-    
-    return consolidated_df
+    return models.effect_spend_share(df)
 
 # Function to create a downloadable Excel file
 def download_excel(df, sheet_name='Sheet1'):
@@ -55,7 +25,9 @@ def main():
     
     if uploaded_file is not None:
         # Load CSV file
-        df = pd.read_csv(uploaded_file)
+        with profiling.span('load', file=uploaded_file) as record:
+            df = ingest.read_csv(uploaded_file, copy=False)
+            profiling.note(record, df)
 
         # Ensure required columns are present
         if 'solID' not in df.columns or 'rn' not in df.columns or 'spend_share' not in df.columns or 'effect_share' not in df.columns:
@@ -63,11 +35,13 @@ def main():
             return
 
         # Select solID to filter models
-        unique_sol_ids = df['solID'].unique()
-        selected_model = st.selectbox("Select Model (solID) to Analyze", options=unique_sol_ids)
+        with profiling.span('load', file=uploaded_file, step='load_partitioned') as record:
+            index = decomp.load_partitioned(uploaded_file)
+            profiling.note(record, index)
+        selected_model = st.selectbox("Select Model (solID) to Analyze", options=index.models)
         
-        # Filter DataFrame based on the selected solID model
-        filtered_df = df[df['solID'] == selected_model]
+        # Slice the selected solID model out of the partitioned data
+        filtered_df = index.get(selected_model)
 
         # Consolidate by 'rn' for Spend variables and calculate required fields
         consolidated_df = consolidate_by_rn_spend(filtered_df)
@@ -77,7 +51,7 @@ def main():
         st.write(consolidated_df)
 
         # Download option for consolidated data
-        excel_data = download_excel(consolidated_df, sheet_name='Consolidated Data')
+        excel_data = exports.deferred(download_excel, consolidated_df, sheet_name='Consolidated Data')
         st.download_button(
             label="Download Consolidated Data as Excel",
             data=excel_data,
@@ -1,50 +1,53 @@
 import streamlit as st
 import pandas as pd
+from attribution import datasets, profiling
 
 # Streamlit app
 st.title("Hyperparameters Generator")
 
-# Initialize session state for uploaded file if it doesn't exist
-if "uploaded_file" not in st.session_state:
-    st.session_state["uploaded_file"] = None
+# Dataset registry shared with the other pages of this session
+registry = datasets.from_session(st.session_state)
 
 # Use the uploaded file from session state if available
-if st.session_state["uploaded_file"] is None:
+if registry.get("processed_data") is None:
     uploaded_file = st.file_uploader("Upload your Processed Data Excel file", type=["xlsx"])
     if uploaded_file:
-        st.session_state["uploaded_file"] = uploaded_file
+        with profiling.span('load', file=uploaded_file, step='register'):
+            registry.register(uploaded_file, slot="processed_data")
 else:
     st.success("Using previously uploaded file.")
 
-# Access the uploaded file from session state
-uploaded_file = st.session_state["uploaded_file"]
+# Access the dataset from session state
+dataset = registry.get("processed_data")
 
-if uploaded_file:
+if dataset:
     try:
-        # Read Excel file
-        df = pd.read_excel(uploaded_file)
-        st.write(df.head())  # Example to display data
-
-        # Extract relevant spend variable names (columns containing 'Spend')
-        spend_variables = [col for col in df.columns if "Spend" in col]
-
-        # Define hyperparameter ranges
-        alpha_range = "c(0.5,3)"
-        gamma_range = "c(0.15,1)"
-        theta_range = "c(0.01, 0.9)"
-
-        # Build hyperparameters list
-        hyperparameters = "hyperparameters <- list(\n"
-        lines = []
-
-        for var in spend_variables:
-            lines.append(f"  {var}_alphas = {alpha_range},")
-            lines.append(f"  {var}_gammas = {gamma_range},")
-            lines.append(f"  {var}_thetas = {theta_range},")
-
-        # Combine all lines into a single string
-        hyperparameters += "\n".join(lines).rstrip(",")  # Remove trailing comma
-        hyperparameters += "\n)"
+        # Only the first rows and the header of the Excel file are read
+        with profiling.span('load', file=dataset.file, step='preview') as record:
+            preview = dataset.preview()
+            # Extract relevant spend variable names (columns containing 'Spend')
+            spend_variables = dataset.spend_columns
+            profiling.note(record, preview)
+        st.write(preview)  # Example to display data
+
+        with profiling.span('transform', step='hyperparameters'):
+            # Define hyperparameter ranges
+            alpha_range = "c(0.5,3)"
+            gamma_range = "c(0.15,1)"
+            theta_range = "c(0.01, 0.9)"
+
+            # Build hyperparameters list
+            hyperparameters = "hyperparameters <- list(\n"
+            lines = []
+
+            for var in spend_variables:
+                lines.append(f"  {var}_alphas = {alpha_range},")
+                lines.append(f"  {var}_gammas = {gamma_range},")
+                lines.append(f"  {var}_thetas = {theta_range},")
+
+            # Combine all lines into a single string
+            hyperparameters += "\n".join(lines).rstrip(",")  # Remove trailing comma
+            hyperparameters += "\n)"
 
         # Display the generated code block
         st.code(hyperparameters, language='r')
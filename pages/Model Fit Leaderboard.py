@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+from attribution import exports, fit, profiling
+from io import BytesIO
+
+def download_excel(df, sheet_name='Sheet1'):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    output.seek(0)
+    return output
+
+SORT_OPTIONS = {
+    'RMSE': True,
+    'MAPE': True,
+    'R2': False,
+    'Bias': True,
+    'Residual_Autocorr': True,
+}
+
+@profiling.timed('transform')
+def filter_leaderboard(leaderboard, min_r2, max_mape, search):
+    mask = pd.Series(True, index=leaderboard.index)
+    if min_r2 is not None:
+        mask &= leaderboard['R2'] >= min_r2
+    if max_mape is not None:
+        mask &= leaderboard['MAPE'] <= max_mape
+    if search:
+        mask &= leaderboard['solID'].astype(str).str.contains(search, case=False, regex=False)
+    return leaderboard[mask]
+
+@profiling.timed('transform')
+def sort_leaderboard(leaderboard, sort_by):
+    # Bias and autocorrelation are best when closest to zero
+    if sort_by in ('Bias', 'Residual_Autocorr'):
+        return leaderboard.sort_values(by=sort_by, key=lambda col: col.abs())
+    return leaderboard.sort_values(by=sort_by, ascending=SORT_OPTIONS[sort_by])
+
+def main():
+    st.title("Model Fit Leaderboard")
+    st.write("Fit metrics of every model (solID) in the decomposition matrix, computed from `dep_var` and `depVarHat`.")
+
+    uploaded_file = st.file_uploader("Upload the pareto_alldecomp_matrix.csv file", type=["csv"])
+
+    if uploaded_file:
+        try:
+            with profiling.span('transform', file=uploaded_file, step='leaderboard') as record:
+                leaderboard = fit.leaderboard(uploaded_file)
+                profiling.note(record, leaderboard)
+        except ValueError as e:
+            st.error(f"The file must contain 'solID', 'ds', 'dep_var' and 'depVarHat' columns: {e}")
+            return
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sort_by = st.selectbox("Sort by", options=list(SORT_OPTIONS))
+        with col2:
+            min_r2 = st.number_input("Minimum R²", value=None, step=0.05, format="%.2f")
+        with col3:
+            max_mape = st.number_input("Maximum MAPE (%)", value=None, min_value=0.0, step=1.0)
+        search = st.text_input("Filter solIDs containing:")
+
+        ranked = sort_leaderboard(filter_leaderboard(leaderboard, min_r2, max_mape, search), sort_by)
+        ranked = ranked.reset_index(drop=True)
+        ranked.insert(0, 'Rank', ranked.index + 1)
+
+        st.metric("Models shown", f"{len(ranked):,} of {len(leaderboard):,}")
+        # Column formats instead of a Styler, which does not scale to large Pareto sets
+        st.dataframe(
+            ranked,
+            column_config={
+                'RMSE': st.column_config.NumberColumn(format="%.2f"),
+                'MAPE': st.column_config.NumberColumn(format="%.2f%%"),
+                'R2': st.column_config.NumberColumn("R²", format="%.4f"),
+                'Bias': st.column_config.NumberColumn(format="%.2f"),
+                'Residual_Autocorr': st.column_config.NumberColumn("Residual Autocorr (lag 1)", format="%.3f"),
+            },
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        st.download_button(
+            label="📥 Download Leaderboard",
+            data=exports.deferred(download_excel, ranked, sheet_name='Fit Leaderboard'),
+            file_name="model_fit_leaderboard.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+if __name__ == "__main__":
+    main()
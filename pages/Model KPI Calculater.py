@@ -1,72 +1,31 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import aggregates, columns, decomp, exports, ingest, profiling, taxonomy
 from io import BytesIO
 
 # Helper function to consolidate columns
+@profiling.timed('transform')
 def consolidate_columns(df):
-    filtered_columns = [col for col in df.columns if "spend" in col.lower()]
-    
-    consolidated_columns = []
-    seen_columns = set()
-    ordered_unique_columns = []
-    
-    for col in filtered_columns:
-        new_col = re.sub(r'([_-]\d+|_Spend)', '', col, flags=re.IGNORECASE)
-        consolidated_columns.append(new_col)
-        
-        if new_col not in seen_columns:
-            ordered_unique_columns.append(new_col)
-            seen_columns.add(new_col)
-    
-    consolidated_df = pd.DataFrame({
-        'Original Column Name': filtered_columns,
-        'Consolidated Column Name': consolidated_columns
-    })
-    
-    unique_columns_df = pd.DataFrame({'Consolidated Column Names': ordered_unique_columns})
-    return consolidated_df, unique_columns_df
+    return columns.consolidate_columns(df.columns, columns.CREATIVE_PATTERN)
 
 # Function to aggregate visits data
+@profiling.timed('transform')
 def aggregate_visits(df, consolidated_df):
-    visits_data = []
-    
-    for consolidated_name in consolidated_df['Consolidated Column Name'].unique():
-        match = re.match(r'([A-Za-z]+)_(.*)', consolidated_name)
-        if match:
-            channel = match.group(1)
-            creative = match.group(2)
-            
-            # Standardize creative names by removing numeric identifiers and trailing '_Spend'
-            creative = re.sub(r'\d+|_Spend', '', creative, flags=re.IGNORECASE)
-            
-            matching_columns = [col for col in df.columns if re.sub(r'([_-]\d+|_Spend)', '', col, flags=re.IGNORECASE) == consolidated_name]
-            visits_sum = df[matching_columns].sum(axis=1).sum()
-            visits_data.append({'Channel': channel, 'Creative': creative, 'Visits': visits_sum})
-    
-    visits_df = pd.DataFrame(visits_data).groupby(['Channel', 'Creative'], as_index=False).sum()
+    # Map every spend column to its (channel, creative) once, then sum the columns per group
+    creative_map = taxonomy.channel_creative_groups(consolidated_df['Original Column Name'])
+    visits_df = taxonomy.aggregate(df, creative_map, ['Channel', 'Creative'], 'Visits')
     return visits_df
 
 # Function to summarize channel visits
+@profiling.timed('transform')
 def summarize_channel_visits(visits_df):
-    channel_summary = visits_df.groupby('Channel')['Visits'].sum().reset_index()
-    total_visits = channel_summary['Visits'].sum()
-    channel_summary['Percentage Contribution'] = ((channel_summary['Visits'] / total_visits) * 100).round(0).astype(int)
-    total_row = pd.DataFrame([{'Channel': 'Total', 'Visits': total_visits, 'Percentage Contribution': 100}])
-    channel_summary = pd.concat([channel_summary, total_row], ignore_index=True)
-    return channel_summary
+    return aggregates.channel_contribution(visits_df, 'Visits')
 
 # Function to create the final output table
+@profiling.timed('transform')
 def create_final_output_table(visits_df, channel_summary_df):
     final_df = visits_df.copy()
-    final_df['Channel - Contribution'] = final_df['Channel']
-    
-    for _, row in channel_summary_df.iterrows():
-        channel = row['Channel']
-        if channel != 'Total':
-            contribution_percentage = int(row['Percentage Contribution'])
-            final_df.loc[final_df['Channel'] == channel, 'Channel - Contribution'] = f"{channel} - {contribution_percentage}%"
-    
+    final_df['Channel - Contribution'] = aggregates.contribution_labels(final_df, channel_summary_df)
     final_df['Visits'] = final_df['Visits'].astype(int)
     final_df = final_df[['Channel - Contribution', 'Creative', 'Visits']]
     return final_df
@@ -87,15 +46,19 @@ def main():
     uploaded_file = st.file_uploader("Choose pareto_alldecomp_matrix Excel or CSV file", type=["xlsx", "csv"])
     
     if uploaded_file is not None:
-        if uploaded_file.name.endswith('.xlsx'):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
+        with profiling.span('load', file=uploaded_file) as record:
+            if uploaded_file.name.endswith('.xlsx'):
+                df = ingest.read_excel(uploaded_file, copy=False)
+            elif uploaded_file.name.endswith('.csv'):
+                df = ingest.read_csv(uploaded_file, copy=False)
+            profiling.note(record, df)
 
         if 'solID' in df.columns:
-            unique_sol_ids = df['solID'].unique()
-            selected_model = st.selectbox("Select Model (solID) to Analyze", options=unique_sol_ids)
-            df = df[df['solID'] == selected_model]
+            with profiling.span('load', file=uploaded_file, step='load_partitioned') as record:
+                index = decomp.load_partitioned(uploaded_file)
+                profiling.note(record, index)
+            selected_model = st.selectbox("Select Model (solID) to Analyze", options=index.models)
+            df = index.get(selected_model)
         else:
             st.warning("The uploaded file does not contain a 'solID' column.")
 
@@ -107,7 +70,7 @@ def main():
         st.subheader("Final Output Table")
         st.write(final_output_df)
 
-        excel_data_final_output = download_excel(final_output_df, sheet_name='Final Output')
+        excel_data_final_output = exports.deferred(download_excel, final_output_df, sheet_name='Final Output')
         st.download_button(
             label="Download Final Output Table as Excel",
             data=excel_data_final_output,
@@ -1,100 +1,42 @@
 import streamlit as st
 import pandas as pd
-import re
-from openpyxl import load_workbook
+from attribution import charts, decomp, exports, optimization, profiling
 from io import BytesIO
 
+@profiling.timed('load')
 def load_conversions(file_path, solID_value):
     """Load and process the conversions data filtered by solID."""
     try:
-        df = pd.read_csv(file_path)
+        header = decomp.read_header(file_path)
     except FileNotFoundError:
         st.error(f"Error: Conversion file not found at {file_path}")
         return None
 
-    if 'solID' not in df.columns:
+    if 'solID' not in header:
         st.error("Error: The 'solID' column is missing from the conversion file.")
         return None
 
-    df = df[df['solID'] == solID_value]  # Filter by solID
-
-    channel_data = {}
-    for col in df.columns:
-        if 'spend' not in col.lower() or col == 'KPI_Website_Conversions':
-            continue
-        match = re.match(r'([A-Za-z]+)', col)
-        if match:
-            channel = match.group(1)
-            channel_data[channel] = channel_data.get(channel, 0) + pd.to_numeric(df[col], errors='coerce').sum()
-
-    conversions_df = pd.DataFrame(list(channel_data.items()), columns=['Channel', 'Conversions'])
-    return conversions_df
+    return optimization.load_conversions(file_path, solID_value)
 
 
+@profiling.timed('load')
 def load_spends(file_path):
     """Load and process the spends data."""
     try:
-        df = pd.read_excel(file_path)
+        return optimization.load_spends(file_path)
     except FileNotFoundError:
         st.error(f"Error: Spends file not found at {file_path}")
         return None
 
-    spend_columns = [col for col in df.columns if "spend" in col.lower()]
-    consolidated_columns = [re.sub(r'([_-]\d+)', '', col) for col in spend_columns]
-    channel_data = {}
-    for original_col, consolidated_col in zip(spend_columns, consolidated_columns):
-        match = re.match(r'([A-Za-z]+)', consolidated_col)
-        if match:
-            channel = match.group(1)
-            channel_data[channel] = channel_data.get(channel, 0) + pd.to_numeric(df[original_col], errors='coerce').sum()
-    spends_df = pd.DataFrame(list(channel_data.items()), columns=['Channel', 'Spend'])
-    return spends_df
-
+@profiling.timed('load')
 def load_preprocessed(file_path):
     """Load and process the preprocessed data."""
     try:
-        df = pd.read_csv(file_path)
+        return optimization.load_preprocessed(file_path)
     except FileNotFoundError:
         st.error(f"Error: Preprocessed file not found at {file_path}")
         return None
 
-    df['period_number'] = df['periods'].apply(lambda x: int(re.search(r'\d+', str(x)).group()) if pd.notnull(x) else None)
-    channel_split = df['channels'].str.extract(r'([^_]+)_([^_]+)_(.+)')
-    channel_split.columns = ['Channel', 'channel_type', 'channel_metric']
-    df = pd.concat([df, channel_split], axis=1)
-    groupby_fields = ['Channel']
-    aggregation_dict = {
-        'initSpendUnit': 'sum',
-        'optmSpendUnit': 'sum',
-        'initResponseTotal': 'min',
-        'optmResponseTotal': 'min',
-        'initResponseUnit': 'sum',
-        'optmResponseUnit': 'sum',
-        'period_number': 'mean'
-    }
-    grouped_df = df.groupby(groupby_fields).agg(aggregation_dict).reset_index()
-    if 'initSpendUnit' in grouped_df.columns and 'period_number' in grouped_df.columns:
-        grouped_df['Sum_initSpendUnit'] = (grouped_df['initSpendUnit'] * grouped_df['period_number']).round(1)
-    if 'optmSpendUnit' in grouped_df.columns and 'period_number' in grouped_df.columns:
-        grouped_df['Sum_optmSpendUnit'] = (grouped_df['optmSpendUnit'] * grouped_df['period_number']).round(1)
-    if 'initResponseUnit' in grouped_df.columns and 'period_number' in grouped_df.columns:
-        grouped_df['Sum_initResponseUnit'] = (grouped_df['initResponseUnit'] * grouped_df['period_number']).round(1)
-    if 'optmResponseUnit' in grouped_df.columns and 'period_number' in grouped_df.columns:
-        grouped_df['Sum_optmResponseUnit'] = (grouped_df['optmResponseUnit'] * grouped_df['period_number']).round(1)
-    if 'Sum_optmSpendUnit' in grouped_df.columns and 'Sum_initSpendUnit' in grouped_df.columns:
-        grouped_df['Change'] = round((grouped_df['Sum_optmSpendUnit'] - grouped_df['Sum_initSpendUnit']) / grouped_df['Sum_initSpendUnit'], 3)
-    if 'Sum_optmResponseUnit' in grouped_df.columns and 'Sum_initResponseUnit' in grouped_df.columns:
-        grouped_df['Response_Change'] = round(grouped_df['Sum_optmResponseUnit'] / grouped_df['Sum_initResponseUnit'], 3)
-    columns_to_drop = ['initSpendUnit', 'optmSpendUnit', 'initResponseUnit', 'optmResponseUnit']
-    grouped_df = grouped_df.drop(columns=[col for col in columns_to_drop if col in grouped_df.columns])
-    return grouped_df
-
-def merge_data(conversions_df, spends_df, preprocessed_df):
-    """Merge the three DataFrames on the 'Channel' column."""
-    merged_df = pd.merge(conversions_df, spends_df, on='Channel', how='outer')
-    merged_df = pd.merge(merged_df, preprocessed_df, on='Channel', how='outer')
-    return merged_df
-
 def format_number(number, is_currency=False, is_percentage=False, decimals=0):
     """Format a number as currency, percentage, or with specified decimals."""
     if pd.isna(number):
@@ -179,7 +121,8 @@ def display_dashboard(final_df, budget_change_kpi, response_change_kpi, cpa_chan
     with col2:
         st.metric("Response Change:", f"{response_change_kpi:.1f}%")
 
-    excel_file = to_excel(final_df, budget_change_kpi, response_change_kpi, cpa_change)
+    # The workbook is only written when the user downloads it
+    excel_file = exports.deferred(to_excel, final_df, budget_change_kpi, response_change_kpi, cpa_change)
 
     st.download_button(
         label="Download as Excel",
@@ -188,12 +131,116 @@ def display_dashboard(final_df, budget_change_kpi, response_change_kpi, cpa_chan
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
+@profiling.timed('transform')
+def scenario_sweep(conversions_df, spends_df, preprocessed_df, factors, caps):
+    """Budget, response and CPA change for every total budget factor."""
+    return optimization.scenario_sweep(conversions_df, spends_df, preprocessed_df, factors, caps)
+
+def display_scenarios(conversions_df, spends_df, preprocessed_df):
+    """Sweep the optimized allocation over total budgets and plot the KPIs as curves."""
+    st.subheader("Budget Scenarios")
+    st.write("Scales the optimized budget and splits it in the optimized proportions. Each channel's response follows "
+             "a constant-elasticity curve through the allocator's optimized point, with the elasticity estimated "
+             "from its initial and optimized points.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        low, high = st.slider("Total budget (× optimized budget)", 0.1, 3.0, (0.5, 2.0), step=0.05)
+    with col2:
+        points = st.number_input("Number of scenarios", min_value=2, max_value=2000, value=301, step=50)
+
+    # Optional per-channel caps, as a multiple of the channel's initial spend
+    channels = preprocessed_df['Channel'].tolist()
+    caps_df = st.data_editor(
+        pd.DataFrame({'Channel': channels, 'Max spend (× initial)': [float('nan')] * len(channels)}),
+        disabled=['Channel'], hide_index=True, use_container_width=True, key="scenario_caps",
+        column_config={'Max spend (× initial)': st.column_config.NumberColumn(min_value=0.0, step=0.05, format="%.2f")},
+    )
+    caps = {channel: cap for channel, cap in zip(caps_df['Channel'], caps_df['Max spend (× initial)']) if pd.notna(cap)}
+
+    factors = optimization.budget_factors(low, high, points)
+    sweep = scenario_sweep(conversions_df, spends_df, preprocessed_df, factors, caps)
+    st.plotly_chart(charts.budget_scenarios(sweep), use_container_width=True)
+
+    with st.expander("Scenario table"):
+        st.dataframe(sweep.style.format({
+            'factor': '{:.2f}', 'budget': '${:,.0f}', 'response': '{:,.0f}',
+            'budget_change': '{:.1f}%', 'response_change': '{:.1f}%', 'cpa_change': '{:.1f}%',
+        }), use_container_width=True, hide_index=True)
+
+@profiling.timed('transform')
+def compare_reallocations(conversions_file, spends_file, reallocation_files):
+    """Budget, response and CPA change of every uploaded model reallocation."""
+    return optimization.compare_reallocations(conversions_file, spends_file, reallocation_files)
+
+def download_comparison(df, sheet_name='Model Comparison'):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    output.seek(0)
+    return output
+
+def display_comparison(comparison):
+    """Show the per-model comparison, lowest CPA change first."""
+    for _, row in comparison[comparison['error'].notna()].iterrows():
+        st.warning(f"{row['solID']}: {row['error']}")
+
+    comparison = comparison[comparison['error'].isna()].drop(columns='error')
+    comparison = comparison.sort_values('cpa_change').reset_index(drop=True)
+    st.subheader("Model Comparison")
+    # Column formats instead of a Styler
+    st.dataframe(
+        comparison,
+        column_config={
+            'old_budget': st.column_config.NumberColumn(format="dollar"),
+            'new_budget': st.column_config.NumberColumn(format="dollar"),
+            'old_response': st.column_config.NumberColumn(format="localized"),
+            'new_response': st.column_config.NumberColumn(format="localized"),
+            'budget_change': st.column_config.NumberColumn("budget change", format="%.1f%%"),
+            'response_change': st.column_config.NumberColumn("response change", format="%.1f%%"),
+            'cpa_change': st.column_config.NumberColumn("CPA change", format="%.1f%%"),
+        },
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    st.download_button(
+        label="Download as Excel",
+        data=exports.deferred(download_comparison, comparison),
+        file_name="optimization_comparison.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+def compare_models(conversions_file, spends_file):
+    """Compare the allocator's reallocations of several models (one CSV per solID)."""
+    reallocation_uploads = st.file_uploader("Upload reallocation CSV Files (one per model)", type=["csv"],
+                                            accept_multiple_files=True)
+
+    if conversions_file and spends_file and reallocation_uploads:
+        # Files are keyed by the solID they hold (or their <solID>_reallocated.csv name)
+        reallocation_files = {}
+        for uploaded_file in reallocation_uploads:
+            solID = optimization.reallocation_solID(uploaded_file)
+            if solID in reallocation_files:
+                st.warning(f"Several reallocation files for solID {solID}; using {uploaded_file.name}.")
+            reallocation_files[solID] = uploaded_file
+
+        with st.spinner(f"Comparing {len(reallocation_files)} models..."):
+            comparison = compare_reallocations(conversions_file, spends_file, reallocation_files)
+        display_comparison(comparison)
+
 def main():
     st.title("Budget Optimization Analysis")
 
     # File uploaders
     conversions_file = st.file_uploader("Upload pareto_alldecomp_matrix CSV File", type=["csv"])
     spends_file = st.file_uploader("Upload Raw Data Excel File", type=["xlsx"])
+
+    mode = st.radio("Mode", ["Single model", "Compare models"], horizontal=True)
+    if mode == "Compare models":
+        compare_models(conversions_file, spends_file)
+        return
+
     preprocessed_file = st.file_uploader("Upload reallocation CSV File", type=["csv"])
 
     sol_id_to_filter = st.text_input("Enter solID to filter:")
@@ -206,47 +253,15 @@ def main():
             preprocessed_df = load_preprocessed(preprocessed_file)
 
             if conversions_df is not None and spends_df is not None and preprocessed_df is not None:
-                # Merge dataframes
-                final_df = merge_data(conversions_df, spends_df, preprocessed_df)
-
-                # Compute new metrics
-                final_df['New Response'] = final_df['Conversions'] * final_df['Response_Change']
-                final_df['Budget Change'] = ((final_df['Sum_optmSpendUnit'] - final_df['Spend']) / final_df['Spend'])
-                final_df['Absolute Budget Change'] = (final_df['Sum_optmSpendUnit'] - final_df['Spend']).round(1)
-
-                # Compute overall KPIs
-                total_new_response = final_df['New Response'].sum()
-                total_old_response = final_df['Conversions'].sum()
-                total_new_budget = final_df['Sum_optmSpendUnit'].sum()
-                total_old_budget = final_df['Spend'].sum()
-
-                # Avoid division by zero
-                response_change_kpi = ((total_new_response / total_old_response) - 1) * 100 if total_old_response != 0 else 0
-                budget_change_kpi = ((total_new_budget - total_old_budget) / total_old_budget) * 100 if total_old_budget != 0 else 0
-                cpa_change = ((total_new_budget / total_new_response) / (total_old_budget / total_old_response) - 1) * 100 if total_new_response != 0 and total_old_response != 0 and total_old_budget != 0 else 0
-
-                # Rename and select desired columns
-                final_df = final_df.rename(columns={
-                    'Channel': 'channel',
-                    'Spend': 'old_budget',
-                    'Sum_optmSpendUnit': 'new_budget',
-                    'Conversions': 'old_response',
-                    'New Response': 'new_response',
-                    'Change': 'budget change',
-                    'Response_Change': 'resp change',
-                    'Absolute Budget Change': 'abs budg change'
-                })
-
-                final_df = final_df[[
-                    'channel', 'old_budget', 'new_budget', 'old_response', 'new_response',
-                    'budget change', 'resp change', 'abs budg change'
-                ]]
-
-                # Fill NaN values with 0 before converting to integer
-                final_df['old_response'] = final_df['old_response'].fillna(0)
-                final_df['new_response'] = final_df['new_response'].fillna(0)
+                with profiling.span('transform', step='reallocation') as record:
+                    final_df, kpis = optimization.reallocation(conversions_df, spends_df, preprocessed_df)
+                    profiling.note(record, final_df)
+                budget_change_kpi = kpis['budget_change']
+                response_change_kpi = kpis['response_change']
+                cpa_change = kpis['cpa_change']
 
                 display_dashboard(final_df, budget_change_kpi, response_change_kpi, cpa_change)
+                display_scenarios(conversions_df, spends_df, preprocessed_df)
 
 if __name__ == "__main__":
     main()
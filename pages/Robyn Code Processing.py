@@ -1,9 +1,9 @@
 import streamlit as st
 import pandas as pd
+from attribution import datasets, profiling
 
-# Initialize session state for uploaded file
-if "uploaded_file" not in st.session_state:
-    st.session_state.uploaded_file = None
+# Parsed uploads are shared across tabs and pages through the session's dataset registry
+registry = datasets.from_session(st.session_state)
 
 # Main app title
 st.title("Robyn Data Processing Toolkit")
@@ -11,23 +11,22 @@ st.title("Robyn Data Processing Toolkit")
 # File uploader - shared across all tabs
 uploaded_file = st.file_uploader("📤 Upload your Processed Data Excel file", type=["xlsx"])
 if uploaded_file:
-    st.session_state.uploaded_file = uploaded_file
+    with profiling.span('load', file=uploaded_file, step='register'):
+        registry.register(uploaded_file, slot="processed_data")
+dataset = registry.get("processed_data")
 
 # Create tabs for different functionalities
 tab1, tab2, tab3 = st.tabs(["📅 Date Range Finder", "💰 Paid Media Vars", "⚙️ Hyperparameters"])
 
 with tab1:
     st.header("Date Range Finder")
-    if st.session_state.uploaded_file:
+    if dataset:
         try:
-            data = pd.read_excel(st.session_state.uploaded_file)
-            
-            if 'Date' in data.columns:
-                data['Date'] = pd.to_datetime(data['Date'], errors='coerce')
-                data = data.dropna(subset=['Date'])
-                
-                window_start = data['Date'].min().strftime('%Y-%m-%d')
-                window_end = data['Date'].max().strftime('%Y-%m-%d')
+            with profiling.span('load', file=dataset.file, step='date_bounds'):
+                date_bounds = dataset.date_bounds
+            if date_bounds is not None:
+                window_start = date_bounds[0].strftime('%Y-%m-%d')
+                window_end = date_bounds[1].strftime('%Y-%m-%d')
 
                 st.code(f'window_start = "{window_start}"\nwindow_end = "{window_end}"', language='r')
             else:
@@ -39,15 +38,15 @@ with tab1:
 
 with tab2:
     st.header("Paid Media Variables Extractor")
-    if st.session_state.uploaded_file:
+    if dataset:
         try:
-            df = pd.read_excel(st.session_state.uploaded_file)
-            
-            spend_columns = [col for col in df.columns if 'Spend' in col]
-            impression_columns = [col for col in df.columns if 'Impressions' in col]
+            with profiling.span('load', file=dataset.file, step='columns'):
+                spend_columns = dataset.spend_columns
+                impression_columns = dataset.impression_columns
 
-            spend_output = 'paid_media_spends = c(\n    "' + '",\n    "'.join(spend_columns) + '")'
-            impression_output = 'paid_media_vars = c(\n    "' + '",\n    "'.join(impression_columns) + '")'
+            with profiling.span('transform', step='paid_media_vars'):
+                spend_output = 'paid_media_spends = c(\n    "' + '",\n    "'.join(spend_columns) + '")'
+                impression_output = 'paid_media_vars = c(\n    "' + '",\n    "'.join(impression_columns) + '")'
 
             st.code(spend_output, language='r')
             st.code(impression_output, language='r')
@@ -62,10 +61,10 @@ with tab2:
 
 with tab3:
     st.header("Hyperparameters Generator")
-    if st.session_state.uploaded_file:
+    if dataset:
         try:
-            df = pd.read_excel(st.session_state.uploaded_file)
-            spend_variables = [col for col in df.columns if "Spend" in col]
+            with profiling.span('load', file=dataset.file, step='columns'):
+                spend_variables = dataset.spend_columns
 
             # Configuration options
             with st.expander("⚙️ Hyperparameter Ranges"):
@@ -77,14 +76,15 @@ with tab3:
             gamma_range = f"c({gamma_min},{gamma_max})"
             theta_range = f"c({theta_min},{theta_max})"
 
-            hyperparameters = "hyperparameters <- list(\n"
-            lines = []
-            for var in spend_variables:
-                lines.append(f"  {var}_alphas = {alpha_range},")
-                lines.append(f"  {var}_gammas = {gamma_range},")
-                lines.append(f"  {var}_thetas = {theta_range},")
+            with profiling.span('transform', step='hyperparameters'):
+                hyperparameters = "hyperparameters <- list(\n"
+                lines = []
+                for var in spend_variables:
+                    lines.append(f"  {var}_alphas = {alpha_range},")
+                    lines.append(f"  {var}_gammas = {gamma_range},")
+                    lines.append(f"  {var}_thetas = {theta_range},")
 
-            hyperparameters += "\n".join(lines).rstrip(",") + "\n)"
+                hyperparameters += "\n".join(lines).rstrip(",") + "\n)"
             
             st.code(hyperparameters, language='r')
             
@@ -1,34 +1,15 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import columns, exports, ingest, precompute, profiling, taxonomy
+import ui
 from io import BytesIO
 
 # Shared utility functions
+@profiling.timed('transform')
 def consolidate_columns(df, by_channel_only=False):
-    columns = df.columns
-    filtered_columns = [col for col in columns if "spend" in col.lower()]
-    
-    consolidated_columns = []
-    seen_columns = set()
-    ordered_unique_columns = []
-    
-    for col in filtered_columns:
-        if by_channel_only:
-            new_col = re.sub(r'([_-]\d+)', '', col)
-        else:
-            new_col = re.sub(r'([_-]\d+|_Spend|^\d+_)', '', col, flags=re.IGNORECASE)
-        consolidated_columns.append(new_col)
-        if new_col not in seen_columns:
-            ordered_unique_columns.append(new_col)
-            seen_columns.add(new_col)
-    
-    consolidated_df = pd.DataFrame({
-        'Original Column Name': filtered_columns,
-        'Consolidated Column Name': consolidated_columns
-    })
-    
-    unique_columns_df = pd.DataFrame({'Consolidated Column Names': ordered_unique_columns})
-    return consolidated_df, unique_columns_df
+    if by_channel_only:
+        return columns.consolidate_columns(df.columns, columns.ADSTOCK_PATTERN)
+    return columns.consolidate_columns(df.columns, columns.CREATIVE_PREFIX_PATTERN)
 
 def download_excel(df, sheet_name='Sheet1'):
     output = BytesIO()
@@ -37,26 +18,35 @@ def download_excel(df, sheet_name='Sheet1'):
     output.seek(0)
     return output
 
-# Tab 1: By Channel Only
-def channel_tab(df):
-    st.subheader("Aggregated Spend Data by Channel")
-    
+@profiling.timed('transform')
+def channel_table(df):
     consolidated_df, unique_columns_df = consolidate_columns(df, by_channel_only=True)
     
     #with st.expander("🔍 View Column Consolidation Mapping"):
         #st.write(consolidated_df)
     
     # Aggregate spend by channel
-    spend_data = []
-    for consolidated_name in consolidated_df['Consolidated Column Name'].unique():
-        match = re.match(r'([A-Za-z]+)', consolidated_name)
-        if match:
-            channel = match.group(1)
-            matching_columns = [col for col in df.columns if re.sub(r'([_-]\d+)', '', col) == consolidated_name]
-            spend_sum = df[matching_columns].sum(axis=1).sum()
-            spend_data.append({'Channel': channel, 'Spend': spend_sum})
+    channel_map = taxonomy.channel_groups(consolidated_df['Original Column Name'])
+    return taxonomy.aggregate(df, channel_map, 'Channel', 'Spend')
+
+@profiling.timed('transform')
+def creative_table(df):
+    consolidated_df, unique_columns_df = consolidate_columns(df)
     
-    spend_df = pd.DataFrame(spend_data).groupby('Channel', as_index=False).sum()
+    # Aggregate spend by channel and creative
+    creative_map = taxonomy.channel_creative_groups(consolidated_df['Original Column Name'])
+    return taxonomy.aggregate(df, creative_map, ['Channel', 'Creative'], 'Spend')
+
+def precompute_tables(uploaded_file, df):
+    # Every table the dashboard offers, computed concurrently in the background
+    return precompute.submit(uploaded_file, {
+        'spend_by_channel': lambda: channel_table(df),
+        'spend_by_channel_creative': lambda: creative_table(df),
+    })
+
+# Tab 1: By Channel Only
+def channel_tab(spend_df):
+    st.subheader("Aggregated Spend Data by Channel")
     
     # Add total row
     total_spend = spend_df['Spend'].sum()
@@ -72,35 +62,15 @@ def channel_tab(df):
     
     st.download_button(
         label="📥 Download Channel Spend Data",
-        data=download_excel(spend_df, sheet_name='Channel Spend'),
+        data=exports.deferred(download_excel, spend_df, sheet_name='Channel Spend'),
         file_name="channel_spend.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
 # Tab 2: By Channel and Creative
-def creative_tab(df):
+def creative_tab(spend_df):
     st.subheader("Spend Data by Channel and Creative")
     
-    consolidated_df, unique_columns_df = consolidate_columns(df)
-    
-    #with st.expander("🔍 View Column Consolidation Mapping"):
-        #st.write(consolidated_df)
-    
-    # Aggregate spend by channel and creative
-    spend_data = []
-    for consolidated_name in consolidated_df['Consolidated Column Name'].unique():
-        match = re.match(r'([A-Za-z]+)_(.*)', consolidated_name)
-        if match:
-            channel = match.group(1)
-            creative = match.group(2) if match.group(2) else "General"
-            creative = re.sub(r'\d+', '', creative)
-            
-            matching_columns = [col for col in df.columns if re.sub(r'([_-]\d+|_Spend|^\d+_)', '', col, flags=re.IGNORECASE) == consolidated_name]
-            spend_sum = df[matching_columns].sum(axis=1).sum()
-            spend_data.append({'Channel': channel, 'Creative': creative, 'Spend': spend_sum})
-    
-    spend_df = pd.DataFrame(spend_data).groupby(['Channel', 'Creative'], as_index=False).sum()
-    
     # Add total row
     total_spend = spend_df['Spend'].sum()
     display_df = pd.concat([spend_df, pd.DataFrame([{'Channel': 'Total', 'Creative': '', 'Spend': total_spend}])], ignore_index=True)
@@ -115,7 +85,7 @@ def creative_tab(df):
     
     st.download_button(
         label="📥 Download Channel-Creative Spend Data",
-        data=download_excel(spend_df, sheet_name='Channel-Creative Spend'),
+        data=exports.deferred(download_excel, spend_df, sheet_name='Channel-Creative Spend'),
         file_name="channel_creative_spend.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
@@ -129,16 +99,20 @@ def main():
     
     if uploaded_file:
         try:
-            df = pd.read_excel(uploaded_file)
+            with profiling.span('load', file=uploaded_file) as record:
+                df = ingest.read_excel(uploaded_file, copy=False)
+                profiling.note(record, df)
+            # Submits both tables, but only the first tab's table is waited for
+            job = precompute_tables(uploaded_file, df)
             st.success("File successfully loaded!")
             
             tab1, tab2 = st.tabs(["By Channel", "By Channel & Creative"])
             
             with tab1:
-                channel_tab(df)
+                channel_tab(ui.precomputed(job, 'spend_by_channel'))
                 
             with tab2:
-                creative_tab(df)
+                ui.when_ready(job, 'spend_by_channel_creative', creative_tab, message="Computing spend by channel & creative...")
                 
         except Exception as e:
             st.error(f"Error loading file: {str(e)}")
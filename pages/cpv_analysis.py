@@ -1,91 +1,19 @@
 import streamlit as st
 import pandas as pd
+from attribution import exports, ingest, profiling, ratios
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(file):
-    return pd.read_excel(file) if file.name.endswith('.xlsx') else pd.read_csv(file)
+    return ingest.read_excel(file) if file.name.endswith('.xlsx') else ingest.read_csv(file)
 
 def standardize_names(df):
     """Standardize channel and creative names to lowercase for consistent matching"""
-    if 'Channel' in df.columns:
-        df['Channel'] = df['Channel'].str.lower().str.strip()
-    if 'Creative' in df.columns:
-        df['Creative'] = df['Creative'].str.lower().str.strip()
-    return df
+    return ratios.standardize_names(df)
 
+@profiling.timed('transform')
 def calculate_cpv(spend_df, visits_df, by_creative=False):
-    # Standardize column names first
-    spend_df = spend_df.rename(columns={
-        'Creation': 'Spend',
-        'Spend': 'Spend',
-        'Vista': 'Visits',
-        'Visits': 'Visits'
-    })
-    visits_df = visits_df.rename(columns={
-        'Speed': 'Visits',
-        'Visits': 'Visits',
-        'Vista': 'Visits'
-    })
-    
-    # Standardize names for consistent merging
-    spend_df = standardize_names(spend_df)
-    visits_df = standardize_names(visits_df)
-    
-    merge_cols = ['Channel'] if not by_creative else ['Channel', 'Creative']
-    
-    # Merge dataframes
-    merged = pd.merge(
-        spend_df,
-        visits_df,
-        on=merge_cols,
-        how='outer'
-    ).fillna(0)
-    
-    # Calculate CPV
-    merged['CPV'] = merged.apply(
-        lambda r: round(r['Spend']/r['Visits'], 2) if r['Visits'] > 0 else 0, 
-        axis=1
-    )
-    
-    # Capitalize first letters for presentation
-    merged['Channel'] = merged['Channel'].str.title()
-    if 'Creative' in merged.columns:
-        merged['Creative'] = merged['Creative'].str.title()
-    
-    # Add totals
-    if by_creative:
-        # Channel totals
-        channel_totals = merged.groupby('Channel').agg({
-            'Spend': 'sum',
-            'Visits': 'sum'
-        }).reset_index()
-        channel_totals['CPV'] = channel_totals.apply(
-            lambda r: round(r['Spend']/r['Visits'], 2) if r['Visits'] > 0 else 0,
-            axis=1
-        )
-        channel_totals['Creative'] = 'Total'
-        
-        # Grand total
-        grand_total = pd.DataFrame([{
-            'Channel': 'Total',
-            'Creative': '-',
-            'Spend': merged['Spend'].sum(),
-            'Visits': merged['Visits'].sum(),
-            'CPV': round(merged['Spend'].sum()/merged['Visits'].sum(), 2) if merged['Visits'].sum() > 0 else 0
-        }])
-        
-        final_df = pd.concat([merged, channel_totals, grand_total], ignore_index=True)
-    else:
-        # Just add grand total
-        total = pd.DataFrame([{
-            'Channel': 'Total',
-            'Spend': merged['Spend'].sum(),
-            'Visits': merged['Visits'].sum(),
-            'CPV': round(merged['Spend'].sum()/merged['Visits'].sum(), 2) if merged['Visits'].sum() > 0 else 0
-        }])
-        final_df = pd.concat([merged, total], ignore_index=True)
-    
-    return final_df.sort_values(by='Channel')
+    return ratios.calculate_cpv(spend_df, visits_df, by_creative)
 
 def download_excel(df, sheet_name='Sheet1'):
     output = BytesIO()
@@ -147,7 +75,7 @@ def main():
                 'CPV': '${:,.2f}'
             }))
             
-            excel_data = download_excel(result, sheet_name='CPV by Channel')
+            excel_data = exports.deferred(download_excel, result, sheet_name='CPV by Channel')
             st.download_button(
                 label="📥 Download CPV by Channel",
                 data=excel_data,
@@ -184,7 +112,7 @@ def main():
                 'CPV': '${:,.2f}'
             }))
             
-            excel_data = download_excel(result, sheet_name='CPV by Channel-Creative')
+            excel_data = exports.deferred(download_excel, result, sheet_name='CPV by Channel-Creative')
             st.download_button(
                 label="📥 Download CPV by Channel-Creative",
                 data=excel_data,
@@ -1,71 +1,43 @@
 import streamlit as st
 import pandas as pd
-import re
+from attribution import aggregates, decomp, exports, precompute, profiling
+import ui
 from io import BytesIO
 
+@profiling.timed('load')
 def load_data(uploaded_file):
-    return pd.read_csv(uploaded_file) if uploaded_file.name.endswith('.csv') else pd.read_excel(uploaded_file)
+    return decomp.load_partitioned(uploaded_file)
 
-def filter_by_model(df, selected_model):
-    return df[df['solID'] == selected_model]
+@profiling.timed('transform')
+def filter_by_model(index, selected_model):
+    return index.get(selected_model)
 
-def standardize_column_name(col_name):
-    col_name = re.sub(r'_Spend$', '', col_name, flags=re.IGNORECASE)
-    col_name = re.sub(r'([_-]?\d+)$', '', col_name)
-    col_name = re.sub(r'(\D)\d+(\D)', r'\1\2', col_name)
-    col_name = col_name.replace('_', ' ').title()
-    return col_name.strip()
+def column_groups(columns, by_channel_only=False):
+    return aggregates.column_groups(columns, by_channel_only)
 
+@profiling.timed('transform')
 def aggregate_visits(df, by_channel_only=False):
-    results = {}
-    
-    for col in df.columns:
-        if 'spend' not in col.lower() or col == 'KPI_Website_Sessions':
-            continue
-            
-        standardized = standardize_column_name(col)
-        parts = standardized.split()
-        
-        if by_channel_only:
-            key = parts[0]  # Just use channel name
-        else:
-            key = (parts[0], ' '.join(parts[1:])) if len(parts) >= 2 else (parts[0], 'General')
-        
-        if key not in results:
-            results[key] = 0
-            
-        results[key] += pd.to_numeric(df[col], errors='coerce').fillna(0).sum()
-    
-    return results
+    return aggregates.group_totals(df, by_channel_only)
+
+@profiling.timed('transform')
+def aggregate_all_models(index, by_channel_only=False):
+    # Visits for every model at once (one row per solID, one column per group)
+    return aggregates.group_totals_all_models(index, by_channel_only)
 
 def create_visits_df(results, include_total=True):
-    if isinstance(next(iter(results.keys())), tuple):
-        # Channel-Creative view
-        df = pd.DataFrame(
-            [{'Channel': k[0], 'Creative': k[1], 'Visits': int(round(v))} 
-             for k, v in results.items()]
-        )
-        if include_total:
-            total = pd.DataFrame([{
-                'Channel': 'Total', 
-                'Creative': '', 
-                'Visits': df['Visits'].sum()
-            }])
-            df = pd.concat([df, total], ignore_index=True)
-    else:
-        # Channel-only view
-        df = pd.DataFrame(
-            [{'Channel': k, 'Visits': int(round(v))} 
-             for k, v in results.items()]
-        )
-        if include_total:
-            total = pd.DataFrame([{
-                'Channel': 'Total', 
-                'Visits': df['Visits'].sum()
-            }])
-            df = pd.concat([df, total], ignore_index=True)
-    
-    return df
+    return aggregates.totals_frame(results, 'Visits', include_total)
+
+def precompute_tables(uploaded_file, index, selected_model=None):
+    # Every table the page offers, computed concurrently in the background
+    # (the selected model's tables first, so they are not queued behind the all-models ones)
+    tasks = {}
+    if selected_model is not None:
+        filtered_df = filter_by_model(index, selected_model)
+        tasks[f'visits_by_channel:{selected_model}'] = lambda: aggregate_visits(filtered_df, by_channel_only=True)
+        tasks[f'visits_by_channel_creative:{selected_model}'] = lambda: aggregate_visits(filtered_df, by_channel_only=False)
+    tasks['visits_by_channel_all_models'] = lambda: aggregate_all_models(index, by_channel_only=True)
+    tasks['visits_by_channel_creative_all_models'] = lambda: aggregate_all_models(index, by_channel_only=False)
+    return precompute.submit(uploaded_file, tasks)
 
 def download_excel(df, sheet_name='Sheet1'):
     output = BytesIO()
@@ -74,54 +46,75 @@ def download_excel(df, sheet_name='Sheet1'):
     output.seek(0)
     return output
 
+def channel_tab(table, all_models):
+    if all_models:
+        st.subheader("Visits by Channel for All Models")
+        st.dataframe(table)
+        excel_data = exports.deferred(download_excel, table.reset_index(), sheet_name='Visits by Channel')
+    else:
+        st.subheader("Aggregated Visits by Channel")
+        st.dataframe(create_visits_df(table))
+        excel_data = exports.deferred(
+            download_excel,
+            create_visits_df(table, include_total=False),
+            sheet_name='Visits by Channel'
+        )
+    
+    # Download button for channel data
+    st.download_button(
+        label="📥 Download Channel Visits",
+        data=excel_data,
+        file_name="visits_by_channel_all_models.xlsx" if all_models else "visits_by_channel.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+def creative_tab(table, all_models):
+    if all_models:
+        st.subheader("Visits by Channel & Creative for All Models")
+        st.dataframe(table)
+        excel_data = exports.deferred(download_excel, table.reset_index(), sheet_name='Visits by Channel-Creative')
+    else:
+        st.subheader("Aggregated Visits by Channel & Creative")
+        st.dataframe(create_visits_df(table))
+        excel_data = exports.deferred(
+            download_excel,
+            create_visits_df(table, include_total=False),
+            sheet_name='Visits by Channel-Creative'
+        )
+    
+    # Download button for creative data
+    st.download_button(
+        label="📥 Download Channel-Creative Visits",
+        data=excel_data,
+        file_name="visits_by_channel_creative_all_models.xlsx" if all_models else "visits_by_channel_creative.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
 def main():
     st.title("Website Visits Analysis")
     
     uploaded_file = st.file_uploader("📤 Upload pareto_alldecomp_matrix.csv", type=["csv", "xlsx"])
     
     if uploaded_file:
-        df = load_data(uploaded_file)
-        models = df['solID'].unique()
-        selected_model = st.selectbox("Select Model (solID)", options=models)
-        filtered_df = filter_by_model(df, selected_model)
+        index = load_data(uploaded_file)
+        all_models = st.toggle("All models", help="Aggregate every solID at once instead of a single model")
+        selected_model = None
+        if not all_models:
+            models = index.models
+            selected_model = st.selectbox("Select Model (solID)", options=models)
+        
+        # Submits every table, but only the first tab's table is waited for
+        job = precompute_tables(uploaded_file, index, selected_model)
         
         tab1, tab2 = st.tabs(["By Channel", "By Channel & Creative"])
         
+        suffix = '_all_models' if all_models else f':{selected_model}'
         with tab1:
-            st.subheader("Aggregated Visits by Channel")
-            channel_results = aggregate_visits(filtered_df, by_channel_only=True)
-            channel_df = create_visits_df(channel_results)
-            st.dataframe(channel_df)
-            
-            # Download button for channel data
-            excel_data = download_excel(
-                create_visits_df(channel_results, include_total=False),
-                sheet_name='Visits by Channel'
-            )
-            st.download_button(
-                label="📥 Download Channel Visits",
-                data=excel_data,
-                file_name="visits_by_channel.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
+            channel_tab(ui.precomputed(job, f'visits_by_channel{suffix}'), all_models)
             
         with tab2:
-            st.subheader("Aggregated Visits by Channel & Creative")
-            creative_results = aggregate_visits(filtered_df, by_channel_only=False)
-            creative_df = create_visits_df(creative_results)
-            st.dataframe(creative_df)
-            
-            # Download button for creative data
-            excel_data = download_excel(
-                create_visits_df(creative_results, include_total=False),
-                sheet_name='Visits by Channel-Creative'
-            )
-            st.download_button(
-                label="📥 Download Channel-Creative Visits",
-                data=excel_data,
-                file_name="visits_by_channel_creative.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
+            ui.when_ready(job, f'visits_by_channel_creative{suffix}', lambda table: creative_tab(table, all_models),
+                          message="Computing visits by channel & creative...")
 
 if __name__ == "__main__":
     main()
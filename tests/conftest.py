@@ -0,0 +1,28 @@
+from io import BytesIO
+
+import pytest
+
+from attribution import ingest
+
+
+@pytest.fixture
+def upload():
+    """upload(df, name, excel=False): an in-memory upload of df, like Streamlit's UploadedFile."""
+    def make(df, name, excel=False):
+        buffer = BytesIO()
+        if excel:
+            df.to_excel(buffer, index=False)
+        else:
+            df.to_csv(buffer, index=False)
+        buffer.name = name
+        buffer.seek(0)
+        return buffer
+    return make
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    # Every test parses its uploads afresh
+    ingest.CACHE.clear()
+    yield
+    ingest.CACHE.clear()
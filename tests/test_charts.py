@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attribution import charts
+
+
+@pytest.mark.parametrize('n, threshold', [(1000, 100), (365, 3), (5000, 1500), (101, 100)])
+def test_lttb_keeps_the_endpoints_and_the_point_count(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.arange(n, dtype=float)
+    y = rng.normal(size=n).cumsum()
+    keep = charts.lttb(x, y, threshold)
+
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert (np.diff(keep) > 0).all()
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1000)
+    y[437] = 50.0
+    assert 437 in charts.lttb(np.arange(1000), y, 50)
+
+
+def test_lttb_leaves_short_series_alone():
+    np.testing.assert_array_equal(charts.lttb(np.arange(10), np.arange(10), 20), np.arange(10))
+    np.testing.assert_array_equal(charts.lttb(np.arange(10), np.arange(10), 2), np.arange(10))
+
+
+def test_actual_vs_predicted_is_downsampled():
+    pytest.importorskip('plotly')
+    df = pd.DataFrame({'ds': pd.date_range('2022-01-01', periods=3000), 'dep_var': np.arange(3000.0),
+                       'depVarHat': np.arange(3000.0) + 1})
+    fig = charts.actual_vs_predicted(df, 'fit', max_points=500)
+    assert [len(trace.x) for trace in fig.data] == [500, 500]
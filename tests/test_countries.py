@@ -0,0 +1,46 @@
+import pandas as pd
+
+from attribution import countries
+
+
+def test_snapshot_records_the_holidays_version():
+    with open(countries.SNAPSHOT_PATH, encoding="utf-8") as f:
+        assert f.readline().startswith("# holidays ")
+    df = pd.read_csv(countries.SNAPSHOT_PATH, keep_default_na=False, comment="#")
+    assert list(df.columns) == ["Country", "Code"]
+    assert df["Code"].is_unique and "NA" in set(df["Code"])
+
+
+def _scan(index, query):
+    # Reference: rank every row with the same rules
+    query = countries.normalize(query)
+    words = query.split()
+    ranked = []
+    for row, (name, code) in enumerate(zip(index.names, index.codes)):
+        tokens = name.split() + [code]
+        if code == query:
+            rank = 0
+        elif name.startswith(query):
+            rank = 1
+        elif all(any(token.startswith(word) for token in tokens) for word in words):
+            rank = 2
+        elif query in name:
+            rank = 3
+        else:
+            continue
+        ranked.append((rank, row))
+    return [row for _, row in sorted(ranked)]
+
+
+def test_search_matches_a_full_scan():
+    index = countries.get_index()
+    queries = ["fr", "us", "united", "uni sta", "ted sta", "d s", "south k", "island", "zz", "a", "(the)"]
+    queries += [name[i:i + 4] for name in index.names[:40] for i in (0, 3)]
+    for query in queries:
+        assert list(index.search(query).index) == _scan(index, query), query
+
+
+def test_search_ranks_the_exact_code_first():
+    index = countries.get_index()
+    assert index.search("de")["Code"].iloc[0] == "DE"
+    assert index.search("")["Code"].tolist() == index.frame["Code"].tolist()
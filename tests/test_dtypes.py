@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attribution import aggregates, decomp, dtypes, ingest, optimization, synthetic
+
+
+def exported_tables(file, solID):
+    index = decomp.load_partitioned(file)
+    model = index.get(solID)
+    return {
+        'channel_totals': aggregates.channel_totals(model, 'Conversions', exclude=aggregates.CONVERSIONS_KPI),
+        'creative_conversions': aggregates.creative_conversions(model),
+        'group_totals': aggregates.totals_frame(aggregates.group_totals(model, exclude=aggregates.CONVERSIONS_KPI)),
+        'channel_totals_all_models': aggregates.channel_totals_all_models(index, exclude=aggregates.CONVERSIONS_KPI),
+        'conversions': optimization.load_conversions(file, solID),
+    }
+
+
+def test_exported_totals_match_uncompacted(upload, monkeypatch):
+    df = synthetic.decomp_matrix(40, n_dates=365, channels=4, creatives=2, adstocks=2)
+    # Large contributions on some channels, whose float32 per-model sums would be off by more than a unit
+    large = [col for col in df.columns if col.startswith(('Meta_', 'Google_'))]
+    df[large] = df[large] * 4000.0
+    file = upload(df, 'pareto_alldecomp_matrix.csv')
+    solID = synthetic.model_ids(40)[7]
+
+    monkeypatch.setattr(dtypes, 'ENABLED', False)
+    expected = exported_tables(file, solID)
+    ingest.CACHE.clear()
+    monkeypatch.setattr(dtypes, 'ENABLED', True)
+    compacted = exported_tables(file, solID)
+
+    assert (decomp.load_partitioned(file).frame.dtypes == np.float32).sum() > 0
+    for name, table in expected.items():
+        pd.testing.assert_frame_equal(compacted[name], table, check_dtype=False, obj=name)
+
+
+def test_columns_whose_sums_would_move_stay_float64():
+    df = synthetic.decomp_matrix(20, n_dates=365, channels=2, creatives=1)
+    df['Meta_Video_1_Spend'] = np.random.default_rng(0).uniform(1e5, 1e6, len(df))
+    compacted = dtypes.compact(df)
+    assert compacted['Meta_Video_1_Spend'].dtype == np.float64
+    assert compacted['Google_Video_1_Spend'].dtype == np.float32
+    assert compacted['dep_var'].dtype == np.float64
+    assert isinstance(compacted['solID'].dtype, pd.CategoricalDtype)
+
+
+def test_only_decomposition_matrices_get_float32():
+    df = synthetic.aggregated(20)
+    compacted = dtypes.compact(df)
+    assert (compacted.dtypes == np.float32).sum() == 0
+    assert compacted['rn'].astype(str).tolist() == df['rn'].tolist()
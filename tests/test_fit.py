@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attribution import decomp, fit, synthetic
+
+
+def reference(model):
+    model = model.sort_values('ds')
+    y, y_hat = model['dep_var'].to_numpy(dtype=float), model['depVarHat'].to_numpy(dtype=float)
+    ok = np.isfinite(y) & np.isfinite(y_hat)
+    # Lag-1 pairs of consecutive dates where both rows have values
+    residual = np.where(ok, y_hat - y - np.nanmean((y_hat - y)[ok]), 0)
+    lagged = (residual[1:] * residual[:-1])[ok[1:] & ok[:-1]].sum()
+    y, y_hat = y[ok], y_hat[ok]
+    error = y_hat - y
+    return {
+        'n': len(y),
+        'RMSE': np.sqrt((error ** 2).mean()),
+        'MAPE': (np.abs(error[y != 0]) / np.abs(y[y != 0])).mean() * 100,
+        'R2': 1 - (error ** 2).sum() / ((y - y.mean()) ** 2).sum(),
+        'Bias': error.mean(),
+        'Residual_Autocorr': lagged / (residual ** 2).sum(),
+    }
+
+
+def test_fit_metrics_match_per_model_numpy():
+    df = synthetic.decomp_matrix(12, n_dates=90, channels=2, creatives=1)
+    # Shuffled rows and a few missing values
+    df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+    df.loc[df.index[::37], 'depVarHat'] = np.nan
+
+    metrics = fit.fit_metrics(decomp.SolIDIndex(df)).set_index('solID')
+    assert sorted(metrics.index) == sorted(df['solID'].unique())
+    for solID, model in df.groupby('solID'):
+        assert metrics.loc[solID].to_dict() == pytest.approx(reference(model))
+
+
+def test_fit_metrics_of_a_perfect_fit():
+    df = pd.DataFrame({'solID': ['a'] * 5, 'ds': pd.date_range('2022-01-01', periods=5),
+                       'dep_var': [1.0, 2, 3, 4, 5], 'depVarHat': [1.0, 2, 3, 4, 5]})
+    row = fit.fit_metrics(decomp.SolIDIndex(df)).iloc[0]
+    assert (row['RMSE'], row['MAPE'], row['R2'], row['Bias']) == (0, 0, 1, 0)
+    assert np.isnan(row['Residual_Autocorr'])
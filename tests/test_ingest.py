@@ -0,0 +1,98 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attribution import ingest, synthetic
+
+
+def frame(rows):
+    return pd.DataFrame({'value': np.arange(rows, dtype=float)})
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    size = ingest._sizeof(frame(1000))
+    cache = ingest.ParseCache(max_bytes=int(size * 2.5))
+    for key in 'abc':
+        cache.get_or_compute(key, lambda: frame(1000))
+        if key == 'b':
+            # a is used again, so b is now the least recently used
+            cache.get_or_compute('a', lambda: pytest.fail('a should be cached'))
+
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['entries'] == 2
+    assert cache.current_bytes <= cache.max_bytes
+    computed = []
+    cache.get_or_compute('b', lambda: computed.append('b') or frame(1000))
+    assert computed == ['b']
+
+
+def test_cache_skips_values_larger_than_the_budget():
+    cache = ingest.ParseCache(max_bytes=1000)
+    cache.get_or_compute('big', lambda: frame(10000))
+    assert cache.stats()['entries'] == 0 and cache.current_bytes == 0
+
+
+def test_sizeof_is_deep():
+    arrays = {'a': np.zeros(1000), 'b': [np.zeros(500), 'x' * 1000]}
+    assert ingest._sizeof(arrays) > 8000 + 4000 + 1000
+    assert ingest._sizeof(frame(1000)) >= 8000
+
+
+def test_concurrent_misses_compute_once():
+    cache = ingest.ParseCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return frame(10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()['misses'] == 1
+
+
+def test_concurrent_misses_share_the_error():
+    cache = ingest.ParseCache()
+
+    def compute():
+        time.sleep(0.2)
+        raise ValueError('bad file')
+
+    errors = []
+
+    def get():
+        try:
+            cache.get_or_compute('k', compute)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=get) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    # A failed computation is not cached
+    assert cache.get_or_compute('k', lambda: 'ok') == 'ok'
+
+
+def test_read_csv_parses_once_and_shares_the_frame(upload):
+    file = upload(synthetic.processed_data(n_dates=30), 'data.csv')
+    misses = ingest.stats()['misses']
+    first = ingest.read_table(file)
+    assert ingest.read_table(file) is first
+    assert ingest.stats()['misses'] == misses + 1
+
+    copy = ingest.read_table(file, copy=True)
+    copy.iloc[0, 1] = -1
+    assert ingest.read_table(file).iloc[0, 1] != -1
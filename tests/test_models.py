@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from attribution import dtypes, models, parallel, synthetic
+
+
+@pytest.fixture(scope='module', params=['plain', 'compacted'])
+def aggregated(request):
+    df = synthetic.aggregated(120, channels=4, creatives=2, adstocks=2)
+    return dtypes.compact(df) if request.param == 'compacted' else df
+
+
+def groupby_reference(df):
+    # The per-model tables as the pages computed them before the catalog, with pandas groupbys
+    df = df.assign(solID=df['solID'].astype(str), rn=df['rn'].astype(str))
+    relevant = df[~df['rn'].isin(models.IGNORE_VARS)]
+    zeros = relevant[relevant['coef'] == 0]
+    zero = zeros.groupby('solID').agg(zero_count=('rn', 'count'), total_spend_on_zeros=('total_spend', 'sum'),
+                                      zero_vars=('rn', list))
+
+    own = relevant[relevant['rn'].str.contains(models.OWN_PREFIX, case=False)]
+    own_spend = own.groupby('solID')['total_spend'].sum()
+    own_zero_spend = own[own['coef'] == 0].groupby('solID')['total_spend'].sum()
+
+    channels = own[own['coef'] != 0].assign(channel=lambda d: models.standardize_channel_names(d['rn']))
+    pairs = channels.groupby(['solID', 'channel'])[['total_spend', 'xDecompAgg']].sum()
+    cpa = (pairs['total_spend'] / pairs['xDecompAgg'].where(pairs['xDecompAgg'] > models.MIN_EFFECT))
+    return zero, own_spend, own_zero_spend, cpa.groupby(level='solID').max()
+
+
+def test_catalog_matches_groupbys(aggregated):
+    catalog = models.catalog(aggregated).set_index('solID')
+    zero, own_spend, own_zero_spend, max_cpa = groupby_reference(aggregated)
+
+    assert list(catalog.index) == sorted(aggregated['solID'].astype(str).unique())
+    with_zeros = catalog[catalog['zero_count'] > 0]
+    pd.testing.assert_series_equal(with_zeros['zero_count'], zero['zero_count'], check_names=False, check_dtype=False)
+    pd.testing.assert_series_equal(with_zeros['total_spend_on_zeros'], zero['total_spend_on_zeros'], check_names=False)
+    assert with_zeros['zero_vars'].tolist() == zero['zero_vars'].tolist()
+
+    pd.testing.assert_series_equal(catalog['total_spend_on_all_own'], own_spend, check_names=False)
+    pd.testing.assert_series_equal(catalog['total_spend_on_own_zeros'],
+                                   own_zero_spend.reindex(catalog.index, fill_value=0.0), check_names=False)
+    pd.testing.assert_series_equal(catalog['Max_Channel_CPA'], max_cpa.reindex(catalog.index), check_names=False)
+
+
+def test_catalog_is_the_same_in_the_process_pool(aggregated):
+    in_process = models.catalog(aggregated, processes=1)
+    pooled = parallel.map_partitions(models._catalog, aggregated, processes=2, min_rows=0)
+    pd.testing.assert_frame_equal(pooled, in_process)
+
+
+def brute_force_skyline(points):
+    return np.array([
+        i for i, p in enumerate(points)
+        if not any((q <= p).all() and (q < p).any() for q in points)
+    ])
+
+
+@pytest.mark.parametrize('n_objectives', [2, 3, 4])
+def test_skyline_matches_brute_force(n_objectives, monkeypatch):
+    rng = np.random.default_rng(n_objectives)
+    # Rounded values, so there are ties and duplicate points
+    points = rng.normal(size=(700, n_objectives)).round(1)
+    # Small blocks, so the pruning between blocks is exercised
+    monkeypatch.setattr(models, 'SKYLINE_BLOCK', 64)
+    np.testing.assert_array_equal(models.skyline(points), brute_force_skyline(points))
+
+
+def brute_force_fronts(points):
+    fronts = np.zeros(len(points), dtype=int)
+    remaining = np.arange(len(points))
+    front = 1
+    while len(remaining):
+        members = remaining[brute_force_skyline(points[remaining])]
+        fronts[members] = front
+        remaining = np.setdiff1d(remaining, members)
+        front += 1
+    return fronts
+
+
+@pytest.mark.parametrize('objectives', [
+    ['Max_Channel_CPA', 'rsq_train'],
+    ['Max_Channel_CPA', 'rsq_train', 'decomp.rssd'],
+])
+def test_pareto_fronts_match_brute_force(objectives):
+    catalog = models.catalog(synthetic.aggregated(300, channels=3, creatives=2))
+    catalog = catalog.round({'Max_Channel_CPA': 0, 'rsq_train': 2, 'decomp.rssd': 2})
+    fronts = models.pareto_fronts(catalog, objectives)
+    points = np.column_stack([
+        catalog[col] * (-1 if models.OBJECTIVES[col] == 'max' else 1) for col in objectives
+    ])
+    np.testing.assert_array_equal(fronts.to_numpy(dtype=int), brute_force_fronts(points))
+
+
+def test_pareto_fronts_leave_out_missing_and_late_models():
+    catalog = pd.DataFrame({'Max_Channel_CPA': [1.0, 2.0, np.nan, 3.0], 'rsq_train': [0.5, 0.6, 0.9, 0.4]})
+    fronts = models.pareto_fronts(catalog, ['Max_Channel_CPA', 'rsq_train'], max_fronts=1)
+    assert fronts.tolist()[:2] == [1.0, 1.0]
+    assert np.isnan(fronts.tolist()[2:]).all()
+
+
+def test_top_models_match_a_full_sort():
+    catalog = models.catalog(synthetic.aggregated(500, channels=3, creatives=2))
+    scores = models.ModelScores(catalog)
+    weights = {'Max_Channel_CPA': 1.0, 'rsq_train': 0.5}
+    expected = np.argsort(-scores.scores(weights), kind='stable')[:25]
+
+    top = scores.top(weights, 25)
+    assert top['solID'].tolist() == catalog['solID'].iloc[expected].tolist()
+    assert top['Rank'].tolist() == list(range(1, 26))
+    assert top['Score'].between(0, 1).all() and top['Score'].is_monotonic_decreasing
+
+
+def test_top_models_break_ties_in_catalog_order():
+    catalog = pd.DataFrame({'solID': list('abcdef'), **{col: 1.0 for col in models.OBJECTIVES}})
+    top = models.ModelScores(catalog).top(models.SCORE_WEIGHTS, 3)
+    assert top['solID'].tolist() == ['a', 'b', 'c']
+    assert models.ModelScores(catalog).top({}, 3)['Score'].eq(0).all()
+
+
+def test_partitions_keep_every_model_in_one_part():
+    df = synthetic.aggregated(50)
+    parts = parallel.partitions(df, 3)
+    owners = {solID: i for i, part in enumerate(parts) for solID in part['solID'].unique()}
+    assert sum(len(part) for part in parts) == len(df)
+    assert sum(part['solID'].nunique() for part in parts) == len(owners) == df['solID'].nunique()
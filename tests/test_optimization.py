@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from attribution import optimization, synthetic
+
+SHAPE = dict(channels=4, creatives=2, adstocks=1)
+
+
+@pytest.fixture
+def sources(upload):
+    solID = synthetic.model_ids(10)[3]
+    decomp_file = upload(synthetic.decomp_matrix(10, n_dates=60, **SHAPE), 'pareto_alldecomp_matrix.csv')
+    spends_file = upload(synthetic.processed_data(n_dates=60, **SHAPE), 'Processed Data.csv')
+    reallocated_file = upload(synthetic.reallocation(solID, **SHAPE), f'{solID}_reallocated.csv')
+    return (optimization.load_conversions(decomp_file, solID), optimization.load_spends(spends_file),
+            optimization.load_preprocessed(reallocated_file))
+
+
+def test_sweep_at_the_optimized_budget_gives_the_reallocation_kpis(sources):
+    _, kpis = optimization.reallocation(*sources)
+    sweep = optimization.scenario_sweep(*sources, factors=[0.5, 1.0, 1.5])
+    at_one = sweep.set_index('factor').loc[1.0]
+    for kpi in ['budget_change', 'response_change', 'cpa_change']:
+        assert at_one[kpi] == pytest.approx(kpis[kpi])
+
+
+def test_sweep_is_monotonic_in_the_budget(sources):
+    sweep = optimization.scenario_sweep(*sources, factors=np.linspace(0.5, 2.0, 31))
+    assert sweep['budget'].is_monotonic_increasing
+    assert sweep['response'].is_monotonic_increasing
+
+
+def test_sweep_respects_the_caps(sources):
+    merged = optimization.merge_data(*sources)
+    caps = {channel: 1.0 for channel in merged['Channel']}
+    sweep = optimization.scenario_sweep(*sources, factors=[1.0, 5.0], caps=caps)
+    # With every channel capped at its initial spend the budget stops growing
+    assert sweep['budget'].iloc[1] <= merged['Sum_initSpendUnit'].sum() + 1e-6
+
+
+def test_allocate_water_fills_around_the_caps():
+    spend = optimization.allocate([1.0, 1.0, 2.0], [100.0, 1000.0], np.array([30.0, np.inf, 40.0]))
+    np.testing.assert_allclose(spend.sum(axis=1), [100.0, 1000.0])
+    assert (spend <= [30.0, np.inf, 40.0]).all()
+    # Capped channels sit at their cap; the others split the rest in proportion
+    np.testing.assert_allclose(spend[1], [30.0, 930.0, 40.0])
+    np.testing.assert_allclose(spend[0], [30.0, 30.0, 40.0])
+
+
+def test_allocate_stops_at_the_caps_when_every_channel_is_capped():
+    spend = optimization.allocate([1.0, 1.0], [100.0], np.array([10.0, 20.0]))
+    np.testing.assert_allclose(spend, [[10.0, 20.0]])
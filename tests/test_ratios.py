@@ -0,0 +1,31 @@
+import pandas as pd
+
+from attribution import ratios
+
+
+def test_unit_cost_is_zero_without_units():
+    assert ratios.unit_cost([10.0, 5.0, 3.0], [4.0, 0.0, -1.0]).tolist() == [2.5, 0.0, 0.0]
+
+
+def test_creative_cost_table():
+    spend = pd.DataFrame({'Channel': ['Meta ', 'meta', 'Google'], 'Creative': ['Video', 'Static ', 'Search'],
+                          'Spend': [100.0, 50.0, 'n/a']})
+    visits = pd.DataFrame({'Channel': ['META', 'google', 'Snap'], 'Creative': ['video', 'SEARCH', 'Story'],
+                           'Visits': [10, 7, 3]})
+    table = ratios.creative_cost_table(spend, visits, 'Spend', 'Visits', 'CPV')
+
+    rows = table.set_index(['Channel', 'Creative'])
+    assert rows.loc[('meta', 'video')].tolist() == [100.0, 10.0, 10.0]
+    assert rows.loc[('meta', 'static')].tolist() == [50.0, 0.0, 0.0]
+    assert rows.loc[('Meta', 'Total')].tolist() == [150.0, 10.0, 15.0]
+    assert rows.loc[('Total', '-')].tolist() == [150.0, 20.0, 7.5]
+    # The inputs keep their names
+    assert spend['Channel'].tolist() == ['Meta ', 'meta', 'Google']
+
+
+def test_cost_table_puts_the_cheapest_first_and_the_total_last():
+    cost = pd.DataFrame({'Channel': ['Meta', 'Google'], 'Spend': [100.0, 30.0]})
+    units = pd.DataFrame({'Channel': ['Meta', 'Google'], 'Conversions': [10, 10]})
+    table = ratios.cost_table(cost, units, 'Spend', 'Conversions', 'Cost per Conversion')
+    assert table['Channel'].tolist() == ['Google', 'Meta', 'TOTAL']
+    assert table['Cost per Conversion'].tolist() == [3.0, 10.0, 6.5]
@@ -0,0 +1,58 @@
+import re
+
+import pandas as pd
+import pytest
+
+from attribution import synthetic, taxonomy
+
+
+def baseline_channel_spend(df):
+    # The channel totals of the Aggregated Spend page before the taxonomy: leading letters of the name
+    totals = {}
+    for col in df.columns:
+        match = re.match(r'([A-Za-z]+)', re.sub(r'([_-]\d+)', '', col))
+        if 'spend' in col.lower() and match:
+            totals[match.group(1)] = totals.get(match.group(1), 0) + df[col].sum()
+    return pd.Series(totals, name='Spend').sort_index()
+
+
+@pytest.fixture
+def processed():
+    df = synthetic.processed_data(n_dates=60, channels=3, creatives=2, adstocks=2)
+    df['1_Meta_Video_1_Spend'] = 125.0
+    df['Google_Search_Clicks_Spend'] = 10.0
+    return df
+
+
+def test_parse_column():
+    assert taxonomy.parse_column('1_Meta_Video_2_Spend')[1:] == ('Meta', 'Video', None, 'Spend', 2)
+    assert taxonomy.parse_column('Meta_Banner1_Feed_3_Spend')[1:] == ('Meta', 'Banner', 'Feed', 'Spend', 3)
+    assert taxonomy.parse_column('Meta__Spend').creative == 'General'
+    assert taxonomy.parse_column('Meta_Spend').creative is None
+
+
+def test_only_the_last_metric_token_is_the_metric():
+    record = taxonomy.parse_column('Google_Search_Clicks_Spend')
+    assert record.metric == 'Spend'
+    assert taxonomy.creative_label(record) == 'Search_Clicks'
+
+
+def test_channel_spend_against_baseline(processed):
+    spend = taxonomy.aggregate(processed, taxonomy.channel_groups(processed.columns), 'Channel', 'Spend')
+    spend = spend.set_index('Channel')['Spend']
+    before = baseline_channel_spend(processed)
+
+    # Numerically prefixed columns used to be dropped from the channel totals; now they count under their channel
+    prefixed = processed['1_Meta_Video_1_Spend'].sum()
+    assert spend['Meta'] == pytest.approx(before['Meta'] + prefixed)
+    pd.testing.assert_series_equal(spend.drop('Meta'), before.drop('Meta'), check_names=False)
+    assert spend.sum() == pytest.approx(processed.filter(like='Spend').sum().sum())
+
+
+def test_creative_totals_add_up_to_channel_totals(processed):
+    by_channel = taxonomy.aggregate(processed, taxonomy.channel_groups(processed.columns), 'Channel', 'Spend')
+    by_creative = taxonomy.aggregate(processed, taxonomy.channel_creative_groups(processed.columns),
+                                     ['Channel', 'Creative'], 'Spend')
+    pd.testing.assert_series_equal(by_creative.groupby('Channel')['Spend'].sum(),
+                                   by_channel.set_index('Channel')['Spend'])
+    assert ('Google', 'Search_Clicks') in set(zip(by_creative['Channel'], by_creative['Creative']))
@@ -0,0 +1,85 @@
+"""
+Streamlit pieces shared by several pages.
+
+The attribution package does not import Streamlit, so the widgets and layout
+helpers that more than one page needs live here, next to home.py.
+"""
+import streamlit as st
+
+from attribution import models, profiling
+
+# Seconds between checks for a table that is still being computed in the background
+POLL_SECONDS = 1.0
+
+
+def precomputed(job, name):
+    """
+    The table name of a precompute job, waiting for it if it is still being
+    computed. The tasks run on worker threads, outside the page's profiling
+    Run, so the wait is what the page's transform step is timed by.
+    """
+    if job.ready(name):
+        return job.result(name)
+    with profiling.span('transform', step='precompute', table=name):
+        return job.result(name)
+
+
+def when_ready(job, name, render, message="Computing..."):
+    """
+    Call render(table) with the table name of a precompute job once it is
+    computed, without holding up the rest of the page: until then a fragment
+    polls for it and reruns the page when it lands.
+    """
+    if job.ready(name):
+        render(precomputed(job, name))
+        return
+
+    @st.fragment(run_every=POLL_SECONDS)
+    def poll():
+        if job.ready(name):
+            st.rerun()
+        st.info(message)
+
+    poll()
+
+
+# Display formats of the score metrics in the top-k table
+SCORE_FORMATS = {
+    'Max_Channel_CPA': "$%.4f",
+    'rsq_train': "%.4f",
+    'nrmse': "%.4f",
+    'decomp.rssd': "%.4f",
+    'pct_spend_on_own_zeros': "%.2f%%",
+}
+
+
+@st.fragment
+def model_scores(file, catalog, labels, key):
+    """
+    Weight sliders for models.SCORE_WEIGHTS (labels: metric -> label) and the
+    best models for those weights. A fragment, so moving a slider reruns only
+    this section, re-scoring the percentiles cached for the upload; key
+    prefixes the widget keys.
+    """
+    scores = models.load_scores(file, catalog)
+    columns = st.columns(len(models.SCORE_WEIGHTS) + 1)
+    weights = {}
+    for column, (metric, default) in zip(columns, models.SCORE_WEIGHTS.items()):
+        with column:
+            weights[metric] = st.slider(labels[metric], 0.0, 1.0, default, step=0.05, key=f"{key}_weight_{metric}")
+    with columns[-1]:
+        k = st.number_input("Top models", min_value=1, max_value=max(1, len(scores)), value=min(20, max(1, len(scores))),
+                            key=f"{key}_top_k")
+
+    if sum(weights.values()) == 0:
+        st.info("Give at least one metric a weight above 0.")
+        return
+
+    st.dataframe(
+        scores.top(weights, int(k)).rename(columns={'solID': 'Model ID', **labels}),
+        use_container_width=True, hide_index=True,
+        column_config={
+            'Score': st.column_config.ProgressColumn(format="%.3f", min_value=0.0, max_value=1.0),
+            **{labels[metric]: st.column_config.NumberColumn(format=fmt) for metric, fmt in SCORE_FORMATS.items()},
+        },
+    )